@@ -13,894 +13,5655 @@ Pendientes:
 #----------------------------------------------------------------------------------------------
 # MÓDULOS
 #----------------------------------------------------------------------------------------------
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, unquote, urlsplit
+import array
+import asyncio
+import atexit
+import bisect
+import copy
+import cProfile
+import csv
+import functools
+import heapq
+import io
+import itertools
 import json
+import math
+import mmap
+import os
+import platform
+import pstats
+import random
 import re
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import unicodedata
+
+try:
+    import fcntl
+except ImportError: # En Windows no existe fcntl, los bloqueos se hacen con msvcrt
+    fcntl = None
+    import msvcrt
+
+try:
+    import numpy
+except ImportError: # numpy es opcional: sin él los informes se calculan con los índices en memoria
+    numpy = None
 
 #----------------------------------------------------------------------------------------------
 # FUNCIONES
 #----------------------------------------------------------------------------------------------
 
-#FUNCIONES DE VALIDACION
+#FUNCIONES DE METRICAS
 
-def validarEmail(_email):
+# Con la variable BIBLIOTECA_METRICAS (ruta de un archivo) se mide cada lectura y escritura de los archivos, las
+# funciones marcadas con @medirTiempo y cada operación del menú o del servidor: cantidad, bytes leídos y escritos e
+# histograma de duración (con p50, p95 y p99). Al terminar el programa se guardan en ese archivo, en formato JSON
+# si termina en .json o en el formato de texto de Prometheus si no. Sin la variable, @medirTiempo deja las funciones
+# tal cual y las mediciones de lectura y escritura se reducen a comparar METRICAS_ACTIVAS.
+ARCHIVO_METRICAS = os.environ.get("BIBLIOTECA_METRICAS", "")
+METRICAS_ACTIVAS = ARCHIVO_METRICAS != ""
+# Límites superiores (en segundos) de los intervalos del histograma: de 50 µs a unos 26 s, duplicándose
+LIMITES_LATENCIA = [0.00005 * 2 ** i for i in range(20)]
+PERCENTILES_METRICAS = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+# {operación: {"cantidad", "segundos", "bytesLeidos", "bytesEscritos", "histograma": cantidad por intervalo (el último, sin límite)}}
+_metricas = {}
+_bloqueoMetricas = threading.Lock() # El escritor del servidor registra desde otro hilo
+
+def registrarMetrica(operacion, segundos, bytesLeidos=0, bytesEscritos=0):
     '''
-    Valida si el formato del email ingresado es correcto mediante una expresión regular.
-    
+    Suma una ejecución de una operación a las métricas.
+
     PARAMETROS:
-    _email: cadena de texto que representa el email a validar.
-    
+    operacion: nombre de la operación (por ejemplo "carga Alumnos.json" o "menu listarAlumnos").
+    segundos: duración de la ejecución.
+    bytesLeidos, bytesEscritos: bytes leídos y escritos en disco.
+
     SALIDA:
-    Devuelve True si el email tiene un formato válido, False en caso contrario.
     '''
-    pat = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-    return bool(re.match(pat, _email))
+    with _bloqueoMetricas:
+        metrica = _metricas.get(operacion)
+        if metrica is None:
+            metrica = {"cantidad": 0, "segundos": 0.0, "bytesLeidos": 0, "bytesEscritos": 0, "histograma": [0] * (len(LIMITES_LATENCIA) + 1)}
+            _metricas[operacion] = metrica
+        metrica["cantidad"] += 1
+        metrica["segundos"] += segundos
+        metrica["bytesLeidos"] += bytesLeidos
+        metrica["bytesEscritos"] += bytesEscritos
+        metrica["histograma"][bisect.bisect_left(LIMITES_LATENCIA, segundos)] += 1
+
+def medirTiempo(funcion):
+    '''
+    Marca una función para medir su duración (con el nombre de la función como operación).
+    Si las métricas no están activas devuelve la misma función, sin ningún costo agregado.
 
+    PARAMETROS:
+    funcion: función a medir.
 
+    SALIDA:
+    Devuelve la función a usar en su lugar.
+    '''
+    if not METRICAS_ACTIVAS:
+        return funcion
 
+    @functools.wraps(funcion)
+    def funcionMedida(*argumentos, **opciones):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*argumentos, **opciones)
+        finally:
+            registrarMetrica(funcion.__name__, time.perf_counter() - inicio)
+    return funcionMedida
 
-def pedirMail():
+def ejecutarOperacion(operacion, funcion, *argumentos):
     '''
-    Solicita al usuario que ingrese un email y valida su formato.
-    
+    Ejecuta una operación del menú, del servidor o de la línea de órdenes midiendo su duración si las métricas
+    están activas y con perfil si está indicado en el archivo de control de los perfiles.
+
     PARAMETROS:
+    operacion: nombre con el que se registra (por ejemplo "menu ingresoAlumno").
+    funcion: función a ejecutar.
+    argumentos: argumentos de la función.
+
     SALIDA:
-    Devuelve el email ingresado una vez que cumple con el formato válido.
+    Devuelve lo que devuelva la función.
     '''
-    email = input("Ingrese un email:").strip()
-    while not validarEmail(email):
-        print("Email inválido. Intente nuevamente.")
-        email = input("Ingrese un email válido: ").strip()
-    return email
+    if operacionPerfilada(operacion):
+        funcion = functools.partial(ejecutarConPerfil, operacion, funcion)
+    if not METRICAS_ACTIVAS:
+        return funcion(*argumentos)
+    inicio = time.perf_counter()
+    try:
+        return funcion(*argumentos)
+    finally:
+        registrarMetrica(operacion, time.perf_counter() - inicio)
+
+def percentilHistograma(histograma, percentil):
+    '''
+    Estima un percentil a partir del histograma, interpolando dentro del intervalo donde cae.
 
-def pedirMailOpcional(email_actual):
-    """
-    Pide un nuevo email. Si se deja vacío, conserva el actual.
-    
     PARAMETROS:
-    email_actual: string con el email que ya tiene el alumno
-    
+    histograma: cantidad de ejecuciones por intervalo de LIMITES_LATENCIA.
+    percentil: valor entre 0 y 1.
+
     SALIDA:
-    - Nuevo email validado si se ingresa uno.
-    - El mismo email si se deja vacío.
-    """
-    entrada = input(f"Ingrese nuevo email (actual: {email_actual}, Enter para mantenerlo): ").strip()
-    if entrada == "":
-        return email_actual
+    Devuelve la duración estimada en segundos (0 si no hay ejecuciones).
+    '''
+    objetivo = percentil * sum(histograma)
+    acumulado = 0
+    for posicion, cantidad in enumerate(histograma):
+        if cantidad and acumulado + cantidad >= objetivo:
+            inferior = LIMITES_LATENCIA[posicion - 1] if posicion > 0 else 0.0
+            if posicion == len(LIMITES_LATENCIA):
+                return inferior # Intervalo sin límite superior
+            return inferior + (LIMITES_LATENCIA[posicion] - inferior) * (objetivo - acumulado) / cantidad
+        acumulado += cantidad
+    return 0.0
+
+def instantaneaMetricas():
+    '''
+    Arma una copia de las métricas con los percentiles calculados.
 
-    while not validarEmail(entrada):
-        print("Email inválido. Intente nuevamente o presione Enter para dejar el actual.")
-        entrada = input("Ingrese un email válido: ").strip()
-        if entrada == "":
-            return email_actual
+    PARAMETROS:
+    SALIDA:
+    Devuelve {operación: {"cantidad", "segundos", "bytesLeidos", "bytesEscritos", "p50", "p95", "p99",
+    "histograma": {límite: cantidad acumulada}}}, ordenado por operación.
+    '''
+    with _bloqueoMetricas:
+        copia = copy.deepcopy(_metricas)
+    instantanea = {}
+    for operacion, metrica in sorted(copia.items()):
+        histograma = metrica.pop("histograma")
+        for nombre, percentil in PERCENTILES_METRICAS.items():
+            metrica[nombre] = percentilHistograma(histograma, percentil)
+        metrica["histograma"] = dict(zip([str(limite) for limite in LIMITES_LATENCIA] + ["+Inf"], itertools.accumulate(histograma)))
+        instantanea[operacion] = metrica
+    return instantanea
+
+def consultaMetricas():
+    '''
+    Devuelve las métricas tomadas hasta el momento (por ejemplo, para consultarlas en el servidor con GET /metricas).
 
-    return entrada
+    PARAMETROS:
+    SALIDA:
+    Devuelve {"ok": True, "activas": si se están tomando métricas, "metricas": métricas de instantaneaMetricas}.
+    '''
+    return {"ok": True, "activas": METRICAS_ACTIVAS, "metricas": instantaneaMetricas()}
 
-def pedirTelefono(nro="Telefono"):
+def textoPrometheus(instantanea):
     '''
-    Solicita al usuario que ingrese un número de teléfono válido, con opción a dejarlo vacío.
-    
+    Convierte las métricas al formato de texto de Prometheus.
+
     PARAMETROS:
-    nro: etiqueta opcional que indica qué tipo de número se solicita (por defecto "Telefono").
-    
+    instantanea: métricas devueltas por instantaneaMetricas.
+
     SALIDA:
-    Devuelve el número de teléfono ingresado si es válido, o una cadena vacía si el usuario lo omite.
+    Devuelve el texto.
     '''
-    while True:
-        telefono = input(f"Ingrese {nro} (Enter para dejar vacío): ").strip()
-        
-        if telefono == "":
-            return ""  # Permite dejar vacío
-        
-        if validarTelefono(telefono):
-            return telefono
-        else:
-            print("Número inválido. Debe contener solo dígitos y tener entre 10 y 12 caracteres.")
-        
-
-def validarTelefono(_telefono):
+    lineas = ["# HELP biblioteca_operacion_segundos Duración de cada operación.",
+              "# TYPE biblioteca_operacion_segundos histogram"]
+    etiquetas = {operacion: operacion.replace("\\", "\\\\").replace('"', '\\"') for operacion in instantanea}
+    for operacion, metrica in instantanea.items():
+        for limite, cantidad in metrica["histograma"].items():
+            lineas.append(f'biblioteca_operacion_segundos_bucket{{operacion="{etiquetas[operacion]}",le="{limite}"}} {cantidad}')
+        lineas.append(f'biblioteca_operacion_segundos_sum{{operacion="{etiquetas[operacion]}"}} {metrica["segundos"]}')
+        lineas.append(f'biblioteca_operacion_segundos_count{{operacion="{etiquetas[operacion]}"}} {metrica["cantidad"]}')
+    lineas.append("# HELP biblioteca_operacion_percentil_segundos Percentiles estimados de la duración de cada operación.")
+    lineas.append("# TYPE biblioteca_operacion_percentil_segundos gauge")
+    for operacion, metrica in instantanea.items():
+        for nombre, percentil in PERCENTILES_METRICAS.items():
+            lineas.append(f'biblioteca_operacion_percentil_segundos{{operacion="{etiquetas[operacion]}",percentil="{percentil}"}} {metrica[nombre]}')
+    for campo, nombreMetrica, descripcion in (("bytesLeidos", "biblioteca_bytes_leidos_total", "Bytes leídos del disco."),
+                                              ("bytesEscritos", "biblioteca_bytes_escritos_total", "Bytes escritos en disco.")):
+        lineas.append(f"# HELP {nombreMetrica} {descripcion}")
+        lineas.append(f"# TYPE {nombreMetrica} counter")
+        for operacion, metrica in instantanea.items():
+            if metrica[campo]:
+                lineas.append(f'{nombreMetrica}{{operacion="{etiquetas[operacion]}"}} {metrica[campo]}')
+    return "\n".join(lineas) + "\n"
+
+def guardarMetricas(nombreArchivo=None):
     '''
-    Valida que el número de teléfono contenga solo dígitos y tenga entre 10 y 12 caracteres.
-    
+    Guarda las métricas en un archivo: JSON si el nombre termina en .json, o texto de Prometheus si no.
+    Se llama sola al terminar el programa cuando las métricas están activas.
+
     PARAMETROS:
-    _telefono: cadena de texto que representa el número a validar.
-    
+    nombreArchivo: archivo a escribir (por defecto, el de BIBLIOTECA_METRICAS).
+
     SALIDA:
-    Devuelve True si el número es válido (solo dígitos, largo adecuado y mayor a 0), False en caso contrario.
     '''
-    _telefono = _telefono.strip()
-    if _telefono.isdigit() and 10 <= len(_telefono) <= 12:
-        return int(_telefono) > 0
+    nombreArchivo = nombreArchivo or ARCHIVO_METRICAS
+    instantanea = instantaneaMetricas()
+    if nombreArchivo.endswith(".json"):
+        contenido = json.dumps(instantanea, ensure_ascii=False, indent=4)
     else:
-        return False
-    
-def validarNombre(_nombre):
+        contenido = textoPrometheus(instantanea)
+    reemplazarArchivo(nombreArchivo, contenido.encode("utf-8"))
+
+if METRICAS_ACTIVAS:
+    atexit.register(guardarMetricas)
+
+#FUNCIONES DE PERFILES
+
+# Mientras exista el archivo de control Biblioteca.perfilar, cada operación que pasa por ejecutarOperacion (opciones
+# del menú, rutas del servidor y comandos de la línea de órdenes) se ejecuta con cProfile y tracemalloc, y deja en el
+# directorio BIBLIOTECA_PERFILES (por defecto "perfiles") un .prof para pstats y un .txt con el resumen de tiempo y
+# memoria. El archivo puede listar, una por línea, las operaciones a perfilar (por ejemplo "menu listarPrestamosAtrasados");
+# si está vacío se perfilan todas. Se crea o se borra con --perfiles activar / desactivar, con PUT /perfiles en el
+# servidor o a mano, y los programas en curso lo notan en el segundo siguiente, sin reiniciarlos.
+ARCHIVO_CONTROL_PERFILES = "Biblioteca.perfilar"
+DIRECTORIO_PERFILES = os.environ.get("BIBLIOTECA_PERFILES", "perfiles")
+SEGUNDOS_REVISION_PERFILES = 1.0 # Cada cuánto se vuelve a mirar el archivo de control
+FUNCIONES_EN_PERFIL = 30 # Funciones con más tiempo acumulado que se listan en el resumen
+ASIGNACIONES_EN_PERFIL = 10 # Líneas con más memoria asignada que se listan en el resumen
+
+# Estado leído del archivo de control: si se perfila, qué operaciones (None: todas) y cuándo se miró por última vez
+_perfiles = {"activos": False, "operaciones": None, "revisado": -math.inf}
+_bloqueoPerfiles = threading.Lock() # cProfile y tracemalloc no admiten dos perfiles a la vez (por ejemplo, en el servidor)
+
+def leerControlPerfiles():
     '''
-    Valida que el nombre ingresado contenga solo letras (permitiendo espacios).
-    
+    Lee el archivo de control de los perfiles y actualiza _perfiles.
+
     PARAMETROS:
-    _nombre: cadena de texto que representa el nombre a validar.
-    
     SALIDA:
-    Devuelve True si el nombre contiene únicamente letras y espacios, False en caso contrario.
     '''
-    nombreSinEspacios= _nombre.replace(" ", "")
-    return nombreSinEspacios.isalpha()
+    try:
+        Archivo = open(ARCHIVO_CONTROL_PERFILES, mode="r", encoding="utf-8")
+    except FileNotFoundError:
+        _perfiles["activos"] = False
+        _perfiles["operaciones"] = None
+        return
+    lineas = [linea.strip() for linea in Archivo.read().splitlines()]
+    Archivo.close()
+    operaciones = {linea for linea in lineas if linea}
+    _perfiles["activos"] = True
+    _perfiles["operaciones"] = operaciones or None
 
-def pedirNombre():
+def operacionPerfilada(operacion):
     '''
-    Solicita al usuario que ingrese un nombre y valida que contenga solo letras y espacios.
-    
+    Indica si una operación debe ejecutarse con perfil. El archivo de control se vuelve a leer como mucho
+    una vez cada SEGUNDOS_REVISION_PERFILES, así que sin perfiles el costo por operación es casi nulo.
+
     PARAMETROS:
+    operacion: nombre de la operación (por ejemplo "menu listarAlumnos").
+
     SALIDA:
-    Devuelve el nombre ingresado si es válido. Muestra un mensaje de error si el formato es incorrecto.
+    Devuelve True si hay que perfilarla.
     '''
-    while True:
-        try:
-            nombre = input("Nombre: ").strip()
-            if not validarNombre(nombre):
-                raise ValueError
-            return nombre
-        except ValueError:
-            print("Error: El nombre solo debe contener letras y espacios")
-            
-def pedirNombreOpcional(nombreActual):
+    ahora = time.monotonic()
+    if ahora - _perfiles["revisado"] >= SEGUNDOS_REVISION_PERFILES:
+        _perfiles["revisado"] = ahora
+        leerControlPerfiles()
+    return _perfiles["activos"] and (_perfiles["operaciones"] is None or operacion in _perfiles["operaciones"])
+
+def textoPerfil(operacion, inicio, segundos, perfil, memoriaInicial, memoriaPico, asignaciones):
     '''
-    Solicita un nuevo nombre o permite mantener el actual si se deja vacío.
-    
-    PARÁMETROS:
-    nombreActual: El nombre que ya tiene el alumno.
+    Arma el resumen de texto de una operación perfilada.
+
+    PARAMETROS:
+    operacion: nombre de la operación.
+    inicio: datetime en que empezó.
+    segundos: duración.
+    perfil: cProfile.Profile ya detenido.
+    memoriaInicial, memoriaPico: bytes asignados al empezar y como máximo durante la operación, según tracemalloc.
+    asignaciones: estadísticas de tracemalloc por línea de la memoria que seguía asignada al terminar.
 
     SALIDA:
-    Devuelve el nuevo nombre si es válido o el actual si se deja vacío.
+    Devuelve el texto.
     '''
-    while True:
-        try:
-            nombre = input(f"Ingrese nuevo nombre (actual: {nombreActual}, Enter para mantenerlo): ").strip()
-            if nombre == "":
-                return nombreActual
-            if not validarNombre(nombre):
-                raise ValueError
-            return nombre
-        except ValueError:
-            print("Error: El nombre solo debe contener letras y espacios.")
-            
-
-def pedirApellido():
+    texto = io.StringIO()
+    texto.write(f"Operación: {operacion}\n")
+    texto.write(f"Inicio: {inicio.strftime('%Y.%m.%d %H.%M.%S')}\n")
+    texto.write(f"Duración: {segundos:.3f} s\n")
+    texto.write(f"Memoria: pico de {(memoriaPico - memoriaInicial) / 1024:.1f} KB por encima de los "
+                f"{memoriaInicial / 1024:.1f} KB que ya estaban asignados al empezar\n\n")
+    texto.write("Líneas con más memoria asignada al terminar:\n")
+    for estadistica in asignaciones[:ASIGNACIONES_EN_PERFIL]:
+        texto.write(f"  {estadistica}\n")
+    texto.write("\nFunciones con más tiempo acumulado:\n")
+    pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(FUNCIONES_EN_PERFIL)
+    return texto.getvalue()
+
+def ejecutarConPerfil(operacion, funcion, *argumentos):
     '''
-    Solicita al usuario que ingrese un apellido y valida que contenga solo letras y espacios.
-    
+    Ejecuta una función con cProfile y tracemalloc y guarda en DIRECTORIO_PERFILES el perfil (.prof) y el resumen (.txt),
+    con la fecha y la operación en el nombre. Si ya se está perfilando otra operación (en otro hilo), se ejecuta sin perfil.
+
     PARAMETROS:
+    operacion: nombre de la operación.
+    funcion: función a ejecutar.
+    argumentos: argumentos de la función.
+
     SALIDA:
-    Devuelve el apellido ingresado si es válido. Muestra un mensaje de error si el formato es incorrecto.
+    Devuelve lo que devuelva la función. El perfil se guarda aunque la función termine con una excepción.
     '''
-    while True:
+    if not _bloqueoPerfiles.acquire(blocking=False):
+        return funcion(*argumentos)
+    try:
+        # Si tracemalloc ya estaba activo (por ejemplo, con python -X tracemalloc) se deja como estaba
+        memoriaYaRastreada = tracemalloc.is_tracing()
+        if memoriaYaRastreada:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+        memoriaInicial = tracemalloc.get_traced_memory()[0]
+        inicio = datetime.now()
+        perfil = cProfile.Profile()
+        comienzo = time.perf_counter()
+        perfil.enable()
         try:
-            apellido = input("Apellido: ").strip()
-            if not validarNombre(apellido):
-                raise ValueError
-            return apellido
-        except ValueError:
-            print("Error: El apellido solo debe contener letras y espacios")
-            
-def pedirApellidoOpcional(apellidoActual):
+            return funcion(*argumentos)
+        finally:
+            perfil.disable()
+            segundos = time.perf_counter() - comienzo
+            memoriaPico = tracemalloc.get_traced_memory()[1]
+            asignaciones = tracemalloc.take_snapshot().statistics("lineno")
+            if not memoriaYaRastreada:
+                tracemalloc.stop()
+            nombre = os.path.join(DIRECTORIO_PERFILES, inicio.strftime("%Y.%m.%d_%H.%M.%S.%f_") + re.sub(r"[^\w.-]+", "_", operacion))
+            try:
+                os.makedirs(DIRECTORIO_PERFILES, exist_ok=True)
+                perfil.dump_stats(nombre + ".prof")
+                Texto = open(nombre + ".txt", mode="w", encoding="utf-8")
+                Texto.write(textoPerfil(operacion, inicio, segundos, perfil, memoriaInicial, memoriaPico, asignaciones))
+                Texto.close()
+            except OSError as detalle: # Un perfil que no se puede guardar no debe interrumpir la operación
+                print("No se pudo guardar el perfil de la operación:", detalle)
+    finally:
+        _bloqueoPerfiles.release()
+
+def activarPerfiles(operaciones=None):
     '''
-    Solicita un nuevo apellido o permite mantener el actual si se deja vacío.
-    
-    PARÁMETROS:
-    apellidoActual: El apellido que ya tiene el alumno.
+    Crea el archivo de control para que este programa y los demás que usan el mismo directorio perfilen sus operaciones.
+
+    PARAMETROS:
+    operaciones: lista de operaciones a perfilar; None o vacía, todas.
 
     SALIDA:
-    Devuelve el nuevo apellido si es válido o el actual si se deja vacío.
     '''
-    while True:
-        try:
-            apellido = input(f"Ingrese nuevo apellido (actual: {apellidoActual}, Enter para mantenerlo): ").strip()
-            if apellido == "":
-                return apellidoActual
-            if not validarNombre(apellido):
-                raise ValueError
-            return apellido
-        except ValueError:
-            print("Error: El apellido solo debe contener letras y espacios.")
+    contenido = "".join(operacion + "\n" for operacion in operaciones or [])
+    reemplazarArchivo(ARCHIVO_CONTROL_PERFILES, contenido.encode("utf-8"))
+    _perfiles["revisado"] = -math.inf
 
-def enteroPositivo(mensaje):
+def desactivarPerfiles():
     '''
-    Solicita al usuario que ingrese un número entero positivo o cero, y valida la entrada.
-    
+    Borra el archivo de control: las operaciones dejan de perfilarse.
+
     PARAMETROS:
-    mensaje: texto que se muestra al solicitar el valor al usuario.
-    
     SALIDA:
-    Devuelve el valor ingresado como entero si es válido (mayor o igual a 0). Muestra mensajes de error en caso de entrada inválida.
     '''
-    while True:
-        try:
-            valor = int(input(mensaje))
-            if valor >= 0:
-                return valor
-            print("Debe ser un número igual o mayor a 0.")
-        except ValueError:
-            print("Entrada inválida. Ingrese un número igual o mayor a 0.")
-            
-def enteroPositivoOpcional(mensaje):
-    """
-    Solicita un número entero mayor o igual a 0.
-    Permite dejar vacío (devuelve None si se presiona Enter).
-    """
-    while True:
-        entrada = input(mensaje).strip()
-        if entrada == "":
-            return None
-        if entrada.isdigit():
-            return int(entrada)
-        print("Error: debe ingresar un número entero positivo o dejar vacío.")
-            
-def validarEstado(actual):
-    """
-    Solicita el estado activo/inactivo del libro.
-    Permite ingresar 'si', 'no', o Enter para no modificar.
-    
-    Retorna:
-        - True si se ingresa 'si'
-        - False si se ingresa 'no'
-        - None si se deja vacío (no se modifica)
-    """
-    while True:
-        try:
-            entrada = input(f"¿Activo? (actual: {actual}, si/no, Enter para mantener): ").strip().lower()
-            if entrada == "":
-                return None
-            elif entrada == "si":
-                return True
-            elif entrada == "no":
-                return False
-            else:
-                raise ValueError
-        except ValueError:
-            print("Error: Debe ingresar 'si', 'no' o presionar Enter para no modificarlo.")
-
+    try:
+        os.remove(ARCHIVO_CONTROL_PERFILES)
+    except FileNotFoundError:
+        pass
+    _perfiles["revisado"] = -math.inf
 
-# FUNCIONES PARA GESTIONAR ALUMNOS
+def consultaPerfiles():
+    '''
+    Devuelve si se están perfilando las operaciones.
 
-def ingresoAlumno():
-    
-    """
-    Funcion para ingresar alumnos al sistema.
-    
-    PARÁMETROS:
+    PARAMETROS:
     SALIDA:
-            Mensaje informativo que el Alumno fue ingresado correctamente. Ademas se carga el Alumno ingresado en el diccionario "Alumnos".
-    """
-    try:
-                
-        #Leo archivo json de Alumnos y lo paso a un diccionario
-        Alumnos=open("Alumnos.json",mode="r",encoding="utf-8")
-        alumnos=json.load(Alumnos)
-        Alumnos.close()
-        print("---------------------------")
-        print("Ingreso de nuevo Alumno")
-        print("---------------------------")
-
-        nombre = pedirNombre()
-        apellido = pedirApellido()
-        direccion = input("Dirección: ").strip()
-        email = pedirMail()
-        carrera = input("Carrera de estudio: ").strip()
-        telefono1 = pedirTelefono("Telefono 1:")
-        telefono2 = pedirTelefono("Telefono 2:")
-        telefono3 = pedirTelefono("Telefono 3:")
+    Devuelve {"ok": True, "activos", "operaciones": lista ordenada o None si son todas, "directorio"}.
+    '''
+    leerControlPerfiles()
+    operaciones = _perfiles["operaciones"]
+    return {"ok": True, "activos": _perfiles["activos"], "operaciones": sorted(operaciones) if operaciones else None,
+            "directorio": os.path.abspath(DIRECTORIO_PERFILES)}
 
-        if not alumnos:
-            nuevoId = "1001"
-        else:
-            idExistentes = [int(k) for k in alumnos.keys()]
-            nuevoNum = max(idExistentes) + 1
-            nuevoId = str(nuevoNum)
+def cambioPerfiles(activos, operaciones=None):
+    '''
+    Activa o desactiva los perfiles (por ejemplo, desde el servidor con PUT /perfiles).
 
+    PARAMETROS:
+    activos: True para perfilar, False para dejar de hacerlo.
+    operaciones: lista de operaciones a perfilar; None o vacía, todas.
 
-        alumno = {
-            "IdAlumno": nuevoId,
-            "activo": True,
-            "nombre": nombre,
-            "apellido": apellido,
-            "direccion": direccion,
-            "email": email,
-            "carrera": carrera,
-            "telefonos":
-            {
-                "telefono1": telefono1,
-                "telefono2": telefono2,
-                "telefono3": telefono3
-            }
+    SALIDA:
+    Devuelve el estado resultante, como consultaPerfiles, o un resultado de error "datosInvalidos".
+    '''
+    if not isinstance(activos, bool) or not (operaciones is None or (isinstance(operaciones, list) and all(isinstance(operacion, str) for operacion in operaciones))):
+        return resultadoError("datosInvalidos", "Se espera \"activos\" verdadero o falso y \"operaciones\" como lista de textos.")
+    if activos:
+        activarPerfiles(operaciones)
+    else:
+        desactivarPerfiles()
+    return consultaPerfiles()
+
+#FUNCIONES DE ALMACENAMIENTO
+
+# Diccionarios ya leídos de cada archivo JSON, compartidos por todas las funciones del programa.
+# Cada entrada guarda la firma (fecha de modificación y tamaño) del archivo al momento de leerlo,
+# hasta qué byte del diario ya se aplicaron los cambios y la versión del último cambio aplicado.
+_cacheArchivos = {}
+
+# Diario de cambios: cada línea es un JSON con un número de versión creciente y la lista de registros
+# nuevos o modificados, así un préstamo nuevo escribe solo su registro en lugar de reescribir todo el archivo.
+DIARIO = "Biblioteca.diario"
+ARCHIVOS_CON_DIARIO = ["Alumnos.json", "Libros.json", "Prestamos.json"]
+# El diario se vuelca a los archivos JSON cuando supera TAMAÑO_MINIMO_COMPACTACION y, además, PROPORCION_COMPACTACION
+# del tamaño de los archivos: con historiales grandes se compacta cada vez menos seguido, en lugar de reescribir
+# Prestamos.json completo cada pocos cientos de préstamos.
+TAMAÑO_MINIMO_COMPACTACION = 256 * 1024
+PROPORCION_COMPACTACION = 0.25
+INTENTOS_TRANSACCION = 10 # Veces que se recalcula una modificación si otra terminal cambió los mismos registros
+
+# Lote abierto con iniciarLote: mientras exista, las escrituras se acumulan y se confirman juntas en confirmarLote
+_lote = None
+
+# Almacenamiento elegido: "json" (archivos JSON + diario) o "sqlite" (base Biblioteca.db con índices).
+# Los registros tienen la misma forma en ambos casos.
+ALMACENAMIENTO = os.environ.get("BIBLIOTECA_ALMACENAMIENTO", "json")
+BASE_SQLITE = "Biblioteca.db"
+TABLAS_SQLITE = {"Alumnos.json": "alumnos", "Libros.json": "libros", "Prestamos.json": "prestamos"}
+_conexionSqlite = None
+
+# Acceso a Alumnos y Libros en JSON: "completo" (se lee todo el archivo) o "mapeado" (el archivo se mapea en memoria
+# y cada registro se lee por su posición, buscándolo en un índice clave → posición guardado en Alumnos.pos / Libros.pos).
+# El acceso mapeado es solo para sistemas POSIX: en Windows no se puede reemplazar un archivo (al compactar el diario)
+# mientras otra terminal lo tiene mapeado, así que ahí siempre se usa "completo".
+ACCESO_REGISTROS = os.environ.get("BIBLIOTECA_ACCESO_REGISTROS", "completo")
+ARCHIVOS_MAPEADOS = ["Alumnos.json", "Libros.json"]
+_mapeados = {}
+
+# Motor de los informes: "indices" (índices en memoria / tablas de SQLite) o "columnar" (arreglos de numpy,
+# pensado para historiales de millones de préstamos). Si numpy no está instalado se usan los índices.
+MOTOR_INFORMES = os.environ.get("BIBLIOTECA_MOTOR_INFORMES", "indices")
+_columnasPrestamos = None
+
+# Índices en memoria armados a partir de los registros de un archivo (por ejemplo, autor → libros).
+# Se arman la primera vez que se usan y después se actualizan registro por registro con cada cambio.
+_indices = {}
+
+# Máscara de permisos del proceso, para que los archivos nuevos escritos con reemplazarArchivo tengan los mismos
+# permisos que si se crearan con open(). Solo se puede leer cambiándola, así que se lee una vez al iniciar.
+MASCARA_PERMISOS = os.umask(0)
+os.umask(MASCARA_PERMISOS)
+
+def firmaArchivo(nombreArchivo):
+    '''
+    Obtiene la firma actual de un archivo para saber si cambió desde la última lectura.
 
-        }
-        
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
 
-        alumnos[nuevoId] = alumno  # Se agrega al archivo original
-        
-        #Escribo el archivo json de alumnos con el diccionario de alumnos
-        Alumnos=open("Alumnos.json",mode="w",encoding="utf-8")
-        alumnos=json.dump(alumnos,Alumnos,ensure_ascii=False,indent=4)
-        Alumnos.close()
+    SALIDA:
+    Devuelve una tupla con la fecha de modificación (en nanosegundos), el tamaño y el número de inodo del archivo.
+    El inodo cambia cada vez que el archivo se reemplaza, aunque la fecha y el tamaño coincidan.
+    '''
+    estado = os.stat(nombreArchivo)
+    return (estado.st_mtime_ns, estado.st_size, estado.st_ino)
 
-        print(f"\n El alumno '{nombre}' (ID: {nuevoId}) fue agregado con éxito.\n")
-        
-    except(FileNotFoundError,OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        
-        return
+def sincronizarDirectorio(directorio):
+    '''
+    Fuerza a disco la entrada de directorio de un archivo recién creado o renombrado.
+    En sistemas que no lo permiten (Windows) no hace nada.
+
+    PARAMETROS:
+    directorio: ruta del directorio que contiene el archivo.
 
-def modificarAlumno():
-    """
-    Funcion para modificar alumnos al sistema.
-    
-    PARÁMETROS:
-            No recibe, busca el archivo Alumnos y lo convierte en diccionario
     SALIDA:
-            Mensaje informativo que el Alumno fue modificado correctamente junto con las modificaciones realizadas.
-            Ademas se actualiza el alumno ingresado en el diccionario "Alumnos".
-    """
+    '''
+    if os.name != "posix":
+        return
+    descriptor = os.open(directorio, os.O_RDONLY)
     try:
-        #Leo archivo json de Alumnos y lo paso a un diccionario
-        Alumnos=open("Alumnos.json",mode="r",encoding="utf-8")
-        alumnos=json.load(Alumnos)
-        Alumnos.close()
-        print("\n=== Modificar Alumno ===")
-        print("Alumnos disponibles:")
-        for idAl, datos in alumnos.items():
-            print(f"{idAl}: {datos['nombre']} {datos['apellido']}")
-        idAlumno = input("Ingrese el ID del alumno a modificar: ").strip()
-        if idAlumno not in alumnos:
-            print("ID de alumno no válido.")
-            return
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
 
-        alumno = alumnos[idAlumno]
-        print("\nDeje en blanco para no modificar ese campo.")
+def reemplazarArchivo(nombreArchivo, contenido):
+    '''
+    Escribe el contenido en un archivo temporal del mismo directorio, lo fuerza a disco y recién entonces
+    lo renombra sobre el archivo original. Un corte en cualquier momento deja el archivo anterior o el nuevo
+    completos, nunca uno truncado.
 
-        nombre=pedirNombreOpcional(alumno['nombre'])
-        apellido = pedirApellidoOpcional(alumno['apellido'])
-        direccion = input(f"Dirección actual ({alumno['direccion']}): ").strip()
-        print((f"Email actual ({alumno['email']}): "))
-        email = pedirMailOpcional(alumno['email'])
-        carrera = input(f"Carrera actual ({alumno['carrera']}): ").strip()
+    PARAMETROS:
+    nombreArchivo: nombre del archivo a reemplazar.
+    contenido: bytes con el contenido completo del archivo.
 
-        print(f"Teléfono 1 actual ({alumno['telefonos']['telefono1']}): ")
-        telefono1 = pedirTelefono("Telefono 1:")        
-        print(f"Teléfono 2 actual ({alumno['telefonos']['telefono2']}): ")
-        telefono2 = pedirTelefono("Telefono 2:")
-        print(f"Teléfono 3 actual ({alumno['telefonos']['telefono3']}): ")
-        telefono3 = pedirTelefono("Telefono 3:")
+    SALIDA:
+    Reemplaza el archivo. Si falla, elimina el temporal y propaga el error.
+    '''
+    reemplazarArchivoPorPartes(nombreArchivo, lambda Archivo: Archivo.write(contenido))
 
-        # Solo actualiza si el campo no está vacío
-        if nombre:
-            alumno['nombre'] = nombre
-        if apellido:
-            alumno['apellido'] = apellido
-        if direccion:
-            alumno['direccion'] = direccion
-        if email:
-            alumno['email'] = email
-        if carrera:
-            alumno['carrera'] = carrera
-        if telefono1:
-            alumno['telefonos']['telefono1'] = telefono1
-        if telefono2:
-            alumno['telefonos']['telefono2'] = telefono2
-        if telefono3:
-            alumno['telefonos']['telefono3'] = telefono3
-        
-        #Escribo el archivo json de alumnos con el diccionario de alumnos
-        Alumnos=open("Alumnos.json",mode="w",encoding="utf-8")
-        alumnos=json.dump(alumnos,Alumnos,ensure_ascii=False,indent=4)
-        Alumnos.close()
-        
-        print("\nAlumno modificado exitosamente.")
-        return
-    except(FileNotFoundError,OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+def reemplazarArchivoPorPartes(nombreArchivo, escribirContenido):
+    '''
+    Igual que reemplazarArchivo, pero el contenido lo escribe una función de a partes (por ejemplo, una exportación
+    que se genera de a una fila), sin tener que armarlo entero en memoria.
 
+    PARAMETROS:
+    nombreArchivo: nombre del archivo a reemplazar.
+    escribirContenido: función que recibe el archivo temporal abierto en modo binario y escribe el contenido.
 
-def eliminarAlumno():
-    """
-    Funcion para eliminar alumnos del sistema, lee un archivo y lo modifica.
     SALIDA:
-            Mensaje informativo que el Alumno fue eliminado correctamente. Ademas se elimina mediante baja logica el Alumno eliminado en el archivo "Alumnos".
-    """
+    Reemplaza el archivo. Si falla, elimina el temporal y propaga el error.
+    '''
+    inicio = time.perf_counter() if METRICAS_ACTIVAS else 0
+    directorio = os.path.dirname(os.path.abspath(nombreArchivo))
+    descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(nombreArchivo) + ".", suffix=".tmp", dir=directorio)
     try:
-        #Leo archivo json de Alumnos y lo paso a un diccionario
-        Alumnos=open("Alumnos.json",mode="r",encoding="utf-8")
-        alumnos=json.load(Alumnos)
-        Alumnos.close()
-        
+        Archivo = os.fdopen(descriptor, mode="wb")
+        try:
+            escribirContenido(Archivo)
+            Archivo.flush()
+            os.fsync(Archivo.fileno())
+            escritos = Archivo.tell()
+        finally:
+            Archivo.close()
+        if os.path.exists(nombreArchivo):
+            os.chmod(temporal, os.stat(nombreArchivo).st_mode & 0o777) # Conserva los permisos del archivo original
+        else:
+            os.chmod(temporal, 0o666 & ~MASCARA_PERMISOS) # mkstemp crea el temporal con 0600: un archivo nuevo lleva los de open()
+        os.replace(temporal, nombreArchivo)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    sincronizarDirectorio(directorio)
+    if METRICAS_ACTIVAS:
+        registrarMetrica("escritura " + os.path.basename(nombreArchivo), time.perf_counter() - inicio, bytesEscritos=escritos)
+
+def agregarAlDiario(lineas):
+    '''
+    Agrega líneas al final del diario y las fuerza a disco con un único fsync.
+
+    PARAMETROS:
+    lineas: lista de bytes, cada uno con una línea completa terminada en salto de línea.
+
+    SALIDA:
+    '''
+    inicio = time.perf_counter() if METRICAS_ACTIVAS else 0
+    nuevo = not os.path.exists(DIARIO)
+    Diario = open(DIARIO, mode="ab")
+    try:
+        escritos = Diario.write(b"".join(lineas))
+        Diario.flush()
+        os.fsync(Diario.fileno())
+    finally:
+        Diario.close()
+    if nuevo:
+        sincronizarDirectorio(os.path.dirname(os.path.abspath(DIARIO)))
+    if METRICAS_ACTIVAS:
+        registrarMetrica("escritura " + os.path.basename(DIARIO), time.perf_counter() - inicio, bytesEscritos=escritos)
+
+def bloquearArchivo(nombreArchivo):
+    '''
+    Toma un bloqueo exclusivo (advisory) sobre el archivo "<nombreArchivo>.lock", esperando si otra terminal lo tiene.
+    Solo lo usan quienes escriben; las lecturas nunca se bloquean.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo a bloquear.
+
+    SALIDA:
+    Devuelve el archivo de bloqueo abierto, que debe liberarse con desbloquearArchivo.
+    '''
+    Bloqueo = open(nombreArchivo + ".lock", mode="a+b")
+    if fcntl is not None:
+        fcntl.flock(Bloqueo.fileno(), fcntl.LOCK_EX)
+    else:
+        Bloqueo.seek(0)
         while True:
-            legajo = input("Ingrese el ID del alumno a eliminar (entre 1000 y 9999): ")
-            print()
+            try:
+                msvcrt.locking(Bloqueo.fileno(), msvcrt.LK_LOCK, 1)
+                break
+            except OSError: # LK_LOCK se rinde a los 10 segundos, se sigue esperando
+                pass
+    return Bloqueo
 
-            if not legajo.isdigit():
-                print("Error: Debe ingresar un número entero.")
-                continue
+def desbloquearArchivo(Bloqueo):
+    '''
+    Libera un bloqueo tomado con bloquearArchivo.
 
-            legajoInt = int(legajo)
-            if legajoInt < 1000 or legajoInt > 9999:
-                print("El ID ingresado está fuera del rango válido (1000 a 9999).")
-                continue
+    PARAMETROS:
+    Bloqueo: archivo de bloqueo devuelto por bloquearArchivo.
 
-            legajo = str(legajoInt)
-            break  # Si todo está OK, salimos del bucle
+    SALIDA:
+    '''
+    if fcntl is not None:
+        fcntl.flock(Bloqueo.fileno(), fcntl.LOCK_UN)
+    else:
+        Bloqueo.seek(0)
+        msvcrt.locking(Bloqueo.fileno(), msvcrt.LK_UNLCK, 1)
+    Bloqueo.close()
 
-        if legajo in alumnos:
-            if alumnos[legajo]["activo"]:
-                alumnos[legajo]["activo"] = False
-                print(f"El alumno con ID {legajo} fue dado de baja.")
-            else:
-                print(f"El alumno con ID {legajo} ya estaba dado de baja.")
-        else:
-            print(f"No se encontró ningún alumno con ID {legajo}.")
-            
-        #Escribo el archivo json de alumnos con el diccionario de alumnos
-        Alumnos=open("Alumnos.json",mode="w",encoding="utf-8")
-        alumnos=json.dump(alumnos,Alumnos,ensure_ascii=False,indent=4)
-        Alumnos.close()
-        
-        return alumnos
-    except(FileNotFoundError,OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+def bloquearVarios(nombresArchivos):
+    '''
+    Bloquea varios archivos siempre en el mismo orden (alfabético), para que dos terminales que
+    necesitan los mismos archivos no se queden esperándose mutuamente.
 
+    PARAMETROS:
+    nombresArchivos: nombres de los archivos a bloquear.
 
-def listarAlumnos():
-    """
-    Funcion para ingresar alumnos al sistema.
     SALIDA:
-            Listado de alumnos con campo "Activo" == True.
-    """
+    Devuelve la lista de bloqueos tomados.
+    '''
+    bloqueos = []
     try:
-        #Leo archivo json de Alumnos y lo paso a un diccionario
-        Alumnos=open("Alumnos.json",mode="r",encoding="utf-8")
-        alumnos=json.load(Alumnos)
-        Alumnos.close()        
-        encontrados = False
-        for legajo, datos in alumnos.items():
-            if datos["activo"]:
-                encontrados = True
-                print("-" * 30)
-                print(f"Legajo: {legajo}")
-                print(f"Nombre completo: {datos['nombre']} {datos['apellido']}")
-                print(f"Email: {datos['email']}")
-                print(f"Carrera: {datos['carrera']}")
-                print(f"Teléfono 1: {datos['telefonos']['telefono1']}")
-                print(f"Teléfono 2: {datos['telefonos']['telefono2']}")
-                print(f"Teléfono 3: {datos['telefonos']['telefono3']}")
-                print("-" * 30)
-        if not encontrados:
-            print("No hay alumnos activos para listar.")
+        for nombreArchivo in sorted(set(nombresArchivos)):
+            bloqueos.append(bloquearArchivo(nombreArchivo))
+    except BaseException:
+        desbloquearVarios(bloqueos)
+        raise
+    return bloqueos
+
+def desbloquearVarios(bloqueos):
+    '''
+    Libera los bloqueos tomados con bloquearVarios, en orden inverso.
+
+    PARAMETROS:
+    bloqueos: lista de bloqueos.
+
+    SALIDA:
+    '''
+    for Bloqueo in reversed(bloqueos):
+        desbloquearArchivo(Bloqueo)
+
+def identidadDiario():
+    '''
+    Identifica el archivo de diario actual. Al compactarse el diario se reemplaza por uno nuevo,
+    por lo que cambia su identidad aunque vuelva a crecer hasta el mismo tamaño.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve una tupla (identidad, tamaño) o (None, 0) si todavía no existe el diario.
+    '''
+    try:
+        estado = os.stat(DIARIO)
+    except FileNotFoundError:
+        return (None, 0)
+    return ((estado.st_dev, estado.st_ino), estado.st_size)
+
+def aplicarDiario(nombreArchivo, entrada):
+    '''
+    Aplica sobre el diccionario en memoria los cambios del diario que todavía no fueron aplicados.
+    Una línea incompleta al final (por ejemplo, por un corte durante la escritura) se ignora.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON al que pertenece la entrada.
+    entrada: entrada de _cacheArchivos con los datos y la posición ya leída del diario.
+
+    SALIDA:
+    Actualiza los datos y la posición del diario dentro de la entrada.
+    '''
+    identidad, tamaño = identidadDiario()
+    if identidad != entrada["diario"]:
+        # Es un diario nuevo (o se compactó): sus cambios son todos posteriores a los datos en memoria
+        entrada["diario"] = identidad
+        entrada["posicionDiario"] = 0
+    if tamaño <= entrada["posicionDiario"]:
         return
-    except(FileNotFoundError,OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
-        
-#FUNCIONES PARA GESTIONAR LIBROS
-def ingresoLibros():
 
-    """
-    Funcion para ingresar libros al sistema, guarda el libro en archivo "Libros"
-    
-    PARÁMETROS:
+    inicio = time.perf_counter() if METRICAS_ACTIVAS else 0
+    Diario = open(DIARIO, mode="rb")
+    Diario.seek(entrada["posicionDiario"])
+    contenido = Diario.read(tamaño - entrada["posicionDiario"])
+    Diario.close()
+    if METRICAS_ACTIVAS:
+        registrarMetrica("lectura " + os.path.basename(DIARIO), time.perf_counter() - inicio, bytesLeidos=len(contenido))
+
+    fin = contenido.rfind(b"\n") + 1
+    for linea in contenido[:fin].splitlines():
+        if not linea.strip():
+            continue
+        registroDiario = json.loads(linea.decode("utf-8"))
+        for archivo, clave, registro in registroDiario["cambios"]:
+            if archivo == nombreArchivo:
+                actualizarEnMemoria(entrada["datos"], clave, registro)
+        entrada["version"] = registroDiario.get("version", entrada["version"])
+    entrada["posicionDiario"] += fin
+
+def ultimaVersionDiario():
+    '''
+    Lee la versión de la última línea completa del diario, recorriéndolo desde el final.
+    Debe llamarse con el diario bloqueado para que nadie agregue una línea en el medio.
+
+    PARAMETROS:
     SALIDA:
-            Mensaje informativo que el libro fue ingresado correctamente. Ademas se carga el libro ingresado en el archivo "Libros".
-    """
+    Devuelve el número de la última versión confirmada (0 si el diario está vacío).
+    '''
+    tamaño = identidadDiario()[1]
+    if tamaño == 0:
+        return 0
+    Diario = open(DIARIO, mode="rb")
     try:
-        #Leo archivo json de Libros y lo paso a un diccionario
-        Libros=open("Libros.json",mode="r",encoding="utf-8")
-        libros=json.load(Libros)
-        Libros.close()    
-        print("---------------------------")
-        print("Ingreso de nuevo libro")
-        print("---------------------------")
+        bloque = 4096
+        while True:
+            inicio = max(0, tamaño - bloque)
+            Diario.seek(inicio)
+            contenido = Diario.read(tamaño - inicio)
+            fin = contenido.rfind(b"\n")
+            comienzo = contenido.rfind(b"\n", 0, max(fin, 0)) + 1
+            if fin >= 0 and (comienzo > 0 or inicio == 0):
+                return json.loads(contenido[comienzo:fin].decode("utf-8")).get("version", 0)
+            if inicio == 0:
+                return 0 # Solo hay una línea incompleta
+            bloque *= 2
+    finally:
+        Diario.close()
+
+def lineaDiario(version, cambios):
+    '''
+    Arma una línea del diario.
 
-        nombre = input("Nombre del libro: ").strip()
-        editorial = input("Editorial: ").strip()
-        categoria = input("Categoría: ").strip()
-        stock = enteroPositivo("Ingrese stock:") #Llamo a una funcion que valide que se ingrese un entero >=0
-        costo=enteroPositivo("Ingrese costo:")
-            
+    PARAMETROS:
+    version: número de versión de la línea.
+    cambios: lista de tuplas (nombreArchivo, clave, registro).
 
-        autor1 = input("Autor principal: ").strip()
-        autor2 = input("Segundo autor: ").strip()
-        autor3 = input("Tercer autor: ").strip()
+    SALIDA:
+    Devuelve la línea en bytes, terminada en salto de línea.
+    '''
+    linea = json.dumps({"version": version, "cambios": [[archivo, clave, registro] for archivo, clave, registro in cambios]}, ensure_ascii=False)
+    return linea.encode("utf-8") + b"\n"
 
-        # Generación del nuevo ID (extrae el número más alto y suma 1)
-        if not libros:
-            nuevoId = "L001"
-        else:
-            ultimoId = [int(clave[1:]) for clave in libros.keys()]
-            nuevoNum = max(ultimoId) + 1
-            nuevoId = f"L{nuevoNum:03d}"
+def leerArchivo(nombreArchivo):
+    '''
+    Devuelve el diccionario con el contenido de un archivo JSON. El archivo se lee del disco una sola vez
+    y queda en memoria; solo se vuelve a leer si otro proceso lo modificó (cambió su fecha o su tamaño).
+    Para los archivos con diario, además se aplican los cambios registrados en el diario.
 
-        if stock > 0:
-            activo = True
-        else:
-            activo = False
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON a leer.
 
-        libro = {
-            "activo": activo,
-            "stock": stock,
-            "nombre": nombre,
-            "editorial": editorial,
-            "categoria": categoria,
-            "autores": {
-                "autor1": autor1,
-                "autor2": autor2,
-                "autor3": autor3
-            },
-            "costo": costo
-        }
+    SALIDA:
+    Devuelve el diccionario compartido del archivo. No debe modificarse directamente: los cambios
+    se registran con confirmarCambios (o ejecutarTransaccion).
+    '''
+    firma = firmaArchivo(nombreArchivo)
+    entrada = _cacheArchivos.get(nombreArchivo)
+    if entrada is None or entrada["firma"] != firma:
+        inicio = time.perf_counter() if METRICAS_ACTIVAS else 0
+        Archivo = open(nombreArchivo, mode="r", encoding="utf-8")
+        datos = json.load(Archivo)
+        Archivo.close()
+        if METRICAS_ACTIVAS:
+            registrarMetrica("lectura " + os.path.basename(nombreArchivo), time.perf_counter() - inicio, bytesLeidos=firma[1])
+        entrada = {"firma": firma, "datos": datos, "diario": None, "posicionDiario": 0, "version": 0}
+        _cacheArchivos[nombreArchivo] = entrada
+        if _lote is not None:
+            aplicarLotePendiente(nombreArchivo, datos)
+    if nombreArchivo in ARCHIVOS_CON_DIARIO:
+        aplicarDiario(nombreArchivo, entrada)
+    return entrada["datos"]
+
+def versionArchivo(nombreArchivo):
+    '''
+    Devuelve la versión del último cambio del diario reflejado en el diccionario del archivo.
+    Si dos llamadas devuelven la misma versión, nadie confirmó cambios en el medio.
 
-        libros[nuevoId] = libro  # Se agrega al diccionario original
-        
-         #Escribo el archivo json de Libros con el diccionario de libros
-        Libros=open("Libros.json",mode="w",encoding="utf-8")
-        libros=json.dump(libros,Libros,ensure_ascii=False,indent=4)
-        Libros.close()
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
 
-        print(f"\n El libro '{nombre}' (ID: {nuevoId}) fue agregado con éxito.\n")
-        return
-    except(FileNotFoundError,OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    SALIDA:
+    Devuelve el número de versión.
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        return conexionSqlite().execute("SELECT valor FROM version").fetchone()[0]
+    leerArchivo(nombreArchivo)
+    return _cacheArchivos[nombreArchivo]["version"]
+
+def ponerAlDia(nombreArchivo):
+    '''
+    Aplica en memoria los cambios del diario de un archivo (por ejemplo, los recién confirmados).
+    Un archivo con acceso mapeado que nunca se leyó completo no se lee: solo se actualizan sus registros mapeados.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
 
-def modificarLibro():
-    """
-    Funcion para modificar libros al sistema.
-    
-    PARÁMETROS:
     SALIDA:
-            Mensaje informativo que el libro fue modificado correctamente. Ademas se carga el libro modificado en el archivo "Libros".
-    """
-    try:
-        #Leo archivo json de Libros y lo paso a un diccionario
-        Libros=open("Libros.json",mode="r",encoding="utf-8")
-        libros=json.load(Libros)
-        Libros.close() 
-        print("\n=== Modificar Libro ===")
-        print("Libros disponibles:")
-        for idLib, datos in libros.items():
-            print(f"{idLib}: {datos['nombre']}")
-        idLibro = input("Ingrese el ID del libro a modificar: ").strip()
-        if idLibro not in libros:
-            print("ID de libro no válido.")
+    '''
+    if archivoMapeado(nombreArchivo):
+        registrosMapeados(nombreArchivo)
+        if nombreArchivo not in _cacheArchivos:
             return
+    leerArchivo(nombreArchivo)
 
-        libro = libros[idLibro]
-        print("\nDeje en blanco para no modificar ese campo.")
+def guardarArchivo(nombreArchivo, datos):
+    '''
+    Escribe el diccionario completo en el archivo JSON de forma atómica y actualiza la copia en memoria.
+    Los archivos con diario solo se reescriben completos al compactar el diario.
 
-        nombre = input(f"Nombre actual ({libro['nombre']}): ").strip()
-        editorial = input(f"Editorial actual ({libro['editorial']}): ").strip()
-        categoria = input(f"Categoría actual ({libro['categoria']}): ").strip()
-        stock = enteroPositivoOpcional((f"Stock actual ({libro['stock']}): "))
-        costo=enteroPositivoOpcional(f"Costo actual ({libro['costo']}): ")
-        activo = validarEstado(libro['activo'])
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON a escribir.
+    datos: diccionario a guardar.
 
-        autor1 = input(f"Autor 1 actual ({libro['autores']['autor1']}): ").strip()
-        autor2 = input(f"Autor 2 actual ({libro['autores']['autor2']}): ").strip()
-        autor3 = input(f"Autor 3 actual ({libro['autores']['autor3']}): ").strip()
+    SALIDA:
+    Guarda el archivo. Si la escritura falla se descarta la copia en memoria para que la próxima lectura vuelva al disco.
+    '''
+    entradaAnterior = _cacheArchivos.get(nombreArchivo, {})
+    posiciones = None
+    if archivoMapeado(nombreArchivo):
+        # Con acceso mapeado se anota dónde queda cada registro mientras se arma el contenido
+        contenido, posiciones = serializarConPosiciones(datos)
+    else:
+        contenido = json.dumps(datos, ensure_ascii=False, indent=4).encode("utf-8")
+    cerrarMapeado(nombreArchivo) # El archivo y su índice de posiciones no pueden seguir mapeados al reemplazarlos
+    try:
+        reemplazarArchivo(nombreArchivo, contenido)
+    except OSError:
+        _cacheArchivos.pop(nombreArchivo, None)
+        raise
+    _cacheArchivos[nombreArchivo] = {
+        "firma": firmaArchivo(nombreArchivo),
+        "datos": datos,
+        "diario": entradaAnterior.get("diario"),
+        "posicionDiario": entradaAnterior.get("posicionDiario", 0),
+        "version": entradaAnterior.get("version", 0)
+    }
+    if posiciones is not None:
+        guardarPosiciones(nombreArchivo, _cacheArchivos[nombreArchivo]["firma"], posiciones)
+
+def registrosSinCambios(anteriores):
+    '''
+    Verifica que los registros leídos por una operación sigan iguales en el estado actual.
 
-        # Solo actualiza si el campo no está vacío
-        if nombre:
-            libro['nombre'] = nombre
-        if editorial:
-            libro['editorial'] = editorial
-        if categoria:
-            libro['categoria'] = categoria
-        if stock:
-            libro['stock'] = int(stock)
-        if costo:
-            libro['costo'] = int(costo)
-        if activo is not None :
-            libro['activo'] = activo
-
-        if autor1:
-            libro['autores']['autor1'] = autor1
-        if autor2:
-            libro['autores']['autor2'] = autor2
-        if autor3:
-            libro['autores']['autor3'] = autor3
-            
-        #Escribo el archivo json de Libros con el diccionario de libros
-        Libros=open("Libros.json",mode="w",encoding="utf-8")
-        libros=json.dump(libros,Libros,ensure_ascii=False,indent=4)
-        Libros.close()
-        print("\nLibro modificado exitosamente.")
-        return
-    except(FileNotFoundError,OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    PARAMETROS:
+    anteriores: diccionario {(nombreArchivo, clave): registro leído}, con None para los registros que no existían.
 
+    SALIDA:
+    Devuelve True si ninguno cambió, False si hay un conflicto real con otra terminal.
+    '''
+    for (archivo, clave), anterior in anteriores.items():
+        actual = obtenerRegistro(archivo, clave)
+        if actual is not anterior and actual != anterior:
+            return False
+    return True
+
+@medirTiempo
+def confirmarCambios(cambios, anteriores=None):
+    '''
+    Registra en el diario una lista de registros nuevos o modificados, escribiendo una sola línea al final del archivo.
+    Al arrancar, el estado se reconstruye con el último archivo JSON más los cambios del diario.
 
+    Control de concurrencia optimista: se bloquean solo los archivos involucrados, se relee su estado y
+    se verifica que los registros en los que se basó la operación (anteriores) no hayan cambiado. El diario
+    se bloquea únicamente el instante de agregar la línea con la versión siguiente.
 
-def eliminarLibro():
-    
-    """
-    Función para Eliminar libros del sistema.
+    PARAMETROS:
+    cambios: lista de tuplas (nombreArchivo, clave, registro) con el registro completo ya modificado.
+    anteriores: diccionario opcional {(nombreArchivo, clave): registro leído} con los registros en los que se
+                basaron los cambios (None si se esperaba que no existieran).
 
     SALIDA:
-        Mensaje informativo de que el libro fue eliminado correctamente.
-        Además, se actualiza el valor del campo "activo" a False en el archivo "Libros"
-        en el registro con el idLibro ingresado por teclado.
-    """
+    Devuelve True si los cambios se confirmaron, False si otra terminal modificó alguno de los registros leídos.
+    Con un lote abierto los cambios quedan pendientes hasta confirmarLote. Si corresponde (ver diarioParaCompactar),
+    el diario se compacta; un error al compactar no cambia el resultado, porque los cambios ya están en el diario.
+    '''
+    if anteriores is None:
+        anteriores = {}
+    if ALMACENAMIENTO == "sqlite":
+        return confirmarCambiosSqlite(cambios, anteriores)
+    archivos = [archivo for archivo, clave, registro in cambios]
+    for archivo in archivos:
+        if archivo not in ARCHIVOS_CON_DIARIO:
+            raise ValueError(f"El archivo {archivo} no utiliza diario.")
+
+    if _lote is not None:
+        if not registrosSinCambios(anteriores):
+            return False
+        _lote["grupos"].append(cambios)
+        datosPorArchivo = {} # Cada archivo se pone al día una sola vez, aunque el grupo tenga muchos registros
+        for archivo, clave, registro in cambios:
+            if archivo not in datosPorArchivo:
+                mapeado = registrosMapeados(archivo)["datos"] if archivoMapeado(archivo) else None
+                completo = leerArchivo(archivo) if mapeado is None or archivo in _cacheArchivos else None
+                datosPorArchivo[archivo] = (mapeado, completo)
+            mapeado, completo = datosPorArchivo[archivo]
+            if mapeado is not None:
+                mapeado[clave] = registro
+            if completo is not None:
+                actualizarEnMemoria(completo, clave, registro)
+        return True
+
+    bloqueos = bloquearVarios(archivos + [archivo for archivo, clave in anteriores])
     try:
-        # Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
+        # Con los archivos bloqueados ninguna otra terminal puede confirmar cambios sobre ellos
+        if not registrosSinCambios(anteriores):
+            return False
+        bloqueoDiario = bloquearArchivo(DIARIO)
+        try:
+            agregarAlDiario([lineaDiario(ultimaVersionDiario() + 1, cambios)])
+        finally:
+            desbloquearArchivo(bloqueoDiario)
 
-        idLibro = input("Ingrese el ID del libro que desea desactivar: ").strip()
+        # La propia línea se aplica en memoria leyendo el final del diario, igual que los cambios de otros procesos
+        ponerAlDiaConfirmados(archivos)
+    finally:
+        desbloquearVarios(bloqueos)
 
-        if idLibro in libros:
-            if libros[idLibro]["activo"]:
-                libros[idLibro]["activo"] = False
+    compactarSiCorresponde()
+    return True
 
-                # Guardar el diccionario actualizado en el archivo JSON
-                Libros = open("Libros.json", mode="w", encoding="utf-8")
-                json.dump(libros, Libros, ensure_ascii=False, indent=4)
-                Libros.close()
+def ponerAlDiaConfirmados(nombresArchivos):
+    '''
+    Pone al día los archivos recién confirmados en el diario. Los cambios ya están guardados, así que si falla la
+    lectura no se propaga el error: se descarta la copia en memoria y la próxima lectura vuelve al disco.
 
-                # Mostrar mensaje después de guardar, usando el diccionario original
-                print(f"Libro '{libros[idLibro]['nombre']}' con ID {idLibro} fue desactivado correctamente.")
-                return
-            else:
-                print(f"El libro con ID {idLibro} ya estaba inactivo.")
-                return
-        else:
-            print(f"No se encontró ningún libro con ID {idLibro}.")
-            return
+    PARAMETROS:
+    nombresArchivos: nombres de los archivos modificados.
 
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    SALIDA:
+    '''
+    for nombreArchivo in set(nombresArchivos):
+        try:
+            ponerAlDia(nombreArchivo)
+        except (OSError, json.JSONDecodeError):
+            _cacheArchivos.pop(nombreArchivo, None)
+            cerrarMapeado(nombreArchivo)
 
+def ejecutarTransaccion(calcularCambios):
+    '''
+    Ejecuta una modificación con reintentos. calcularCambios lee el estado actual y arma los cambios;
+    si al confirmar otra terminal ya modificó alguno de los registros leídos, se vuelve a calcular
+    sobre los datos nuevos. Si los registros leídos no cambiaron, se confirma sin reintentar aunque
+    otras terminales hayan escrito otros registros.
 
+    PARAMETROS:
+    calcularCambios: función sin parámetros que devuelve una tupla (cambios, anteriores) como las que recibe
+                     confirmarCambios, o None si la operación ya no corresponde.
 
-def librosActivos():
-    """
-    Funcion para mostrar libros activos
-    
-    PARÁMETROS:
     SALIDA:
-            Listado de libros que cumplen con la condicion campo "Activo" sea True.
-    """
-    try:
-        # Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
-    
-        encontrados = False
-        for idLibro, datos in libros.items():
-            if datos["activo"]:
-                encontrados = True
-                print(f"ID del Libro: {idLibro}")
-                print(f"Nombre: {datos['nombre']}")
-                print(f"Editorial: {datos['editorial']}")
-                print(f"Categoría: {datos['categoria']}")
-                print(f"Stock: {datos['stock']}")
-                print(f"Autor 1: {datos['autores']['autor1']}")
-                print(f"Autor 2: {datos['autores']['autor2']}")
-                print(f"Autor 3: {datos['autores']['autor3']}")
-                print(f"Costo de garantia por dia: {datos['costo']}")
-                print("-" * 30)
-
-        if not encontrados:
-            print("No hay libros activos para listar.")
-        return
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    Devuelve la lista de cambios confirmados, None si calcularCambios canceló la operación
+    o False si siguió habiendo conflictos después de INTENTOS_TRANSACCION intentos.
+    '''
+    for intento in range(INTENTOS_TRANSACCION):
+        resultado = calcularCambios()
+        if resultado is None:
+            return None
+        cambios, anteriores = resultado
+        if confirmarCambios(cambios, anteriores):
+            return cambios
+    return False
+
+def diarioParaCompactar():
+    '''
+    Indica si el diario creció lo suficiente para compactarlo: más de TAMAÑO_MINIMO_COMPACTACION y más de
+    PROPORCION_COMPACTACION del tamaño de los archivos JSON.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve True si hay que compactarlo.
+    '''
+    tamaño = identidadDiario()[1]
+    if tamaño <= TAMAÑO_MINIMO_COMPACTACION:
+        return False
+    archivos = sum(os.stat(archivo).st_size for archivo in ARCHIVOS_CON_DIARIO if os.path.exists(archivo))
+    return tamaño > archivos * PROPORCION_COMPACTACION
+
+def archivosEnDiario():
+    '''
+    Busca qué archivos tienen cambios en el diario, sin interpretar sus líneas: cada cambio empieza con
+    ["<archivo>", y esa secuencia no puede aparecer dentro de un texto JSON (las comillas van escapadas).
+    Debe llamarse con el diario bloqueado.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve la lista de archivos con cambios.
+    '''
+    if identidadDiario()[1] == 0:
+        return []
+    Diario = open(DIARIO, mode="rb")
+    try:
+        contenido = mmap.mmap(Diario.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return [archivo for archivo in ARCHIVOS_CON_DIARIO if contenido.find(b'["' + archivo.encode("utf-8") + b'", ') >= 0]
+        finally:
+            contenido.close()
+    finally:
+        Diario.close()
+
+@medirTiempo
+def compactarDiario():
+    '''
+    Vuelca el diario en los archivos JSON y lo reemplaza por un diario que solo conserva la última versión.
+    Solo se reescriben los archivos que tienen cambios en el diario.
+    Como cada línea del diario guarda registros completos, volver a aplicarla es inofensivo:
+    si el programa se corta a mitad de la compactación no se pierde ni se duplica nada.
+
+    PARAMETROS:
+    SALIDA:
+    Reescribe los archivos con cambios y deja el diario vacío. Bloquea todos los archivos mientras tanto.
+    '''
+    bloqueos = bloquearVarios(ARCHIVOS_CON_DIARIO)
+    try:
+        bloqueoDiario = bloquearArchivo(DIARIO)
+        try:
+            version = ultimaVersionDiario()
+            modificados = archivosEnDiario()
+            for archivo in modificados:
+                guardarArchivo(archivo, leerArchivo(archivo))
+            if os.path.exists(ARCHIVO_COLUMNAR_PRESTAMOS):
+                # La copia columnar tiene que quedar con la versión del diario compactado: si sus préstamos
+                # no cambiaron, alcanza con cambiarle la versión sin volver a armar las columnas
+                if "Prestamos.json" in modificados or not actualizarVersionColumnar(version):
+                    escribirColumnarPrestamos(leerArchivo("Prestamos.json"), version)
+
+            reemplazarArchivo(DIARIO, lineaDiario(version, []))
+
+            # Los archivos sin cambios no se reescriben: lo que está en memoria ya coincide con el disco
+            identidad = identidadDiario()[0]
+            for archivo in ARCHIVOS_CON_DIARIO:
+                if archivo in _cacheArchivos:
+                    _cacheArchivos[archivo]["diario"] = identidad
+                    _cacheArchivos[archivo]["posicionDiario"] = 0
+        finally:
+            desbloquearArchivo(bloqueoDiario)
+    finally:
+        desbloquearVarios(bloqueos)
+
+def compactarSiCorresponde():
+    '''
+    Compacta el diario si corresponde (ver diarioParaCompactar). Se llama después de confirmar cambios, que ya
+    están a salvo en el diario: si la compactación falla, el error se informa sin propagarlo y el diario queda
+    como estaba, para volver a compactarlo en una próxima confirmación.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve False si la compactación falló, True en cualquier otro caso.
+    '''
+    try:
+        if diarioParaCompactar():
+            compactarDiario()
+    except (OSError, ValueError) as detalle: # ValueError: un préstamo que no se puede guardar en la copia columnar
+        if METRICAS_ACTIVAS:
+            registrarMetrica("error compactarDiario", 0) # Cuenta las compactaciones fallidas
+        print("No se pudo compactar el diario, se volverá a intentar más adelante:", detalle)
+        return False
+    return True
+
+def iniciarLote():
+    '''
+    Abre un lote de escritura (confirmación agrupada). Hasta llamar a confirmarLote, confirmarCambios
+    solo actualiza la memoria, de modo que muchas modificaciones cuestan una única escritura y un único
+    fsync del diario. Dentro del lote los registros leídos se verifican contra la memoria.
+
+    PARAMETROS:
+    SALIDA:
+    '''
+    global _lote
+    if _lote is not None:
+        raise RuntimeError("Ya hay un lote de escritura abierto.")
+    if ALMACENAMIENTO == "sqlite":
+        conexionSqlite().execute("BEGIN IMMEDIATE") # En SQLite el lote es una única transacción
+    _lote = {"grupos": []}
+
+def aplicarLotePendiente(nombreArchivo, datos):
+    '''
+    Vuelve a aplicar los cambios todavía no confirmados del lote sobre un diccionario recién leído del disco.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON leído.
+    datos: diccionario recién leído.
+
+    SALIDA:
+    '''
+    for cambios in _lote["grupos"]:
+        for archivo, clave, registro in cambios:
+            if archivo == nombreArchivo:
+                datos[clave] = registro
+
+@medirTiempo
+def confirmarLote(compactar=True):
+    '''
+    Escribe todo lo acumulado en el lote abierto: todas las líneas del diario, cada una con su versión,
+    se agregan con una sola escritura y un único fsync.
+
+    PARAMETROS:
+    compactar: si es False no se compacta el diario aunque corresponda (lo usa la importación
+               masiva, que confirma muchos lotes seguidos y compacta una sola vez al final).
+
+    SALIDA:
+    Si lanza una excepción, el lote no quedó confirmado. Una vez agregadas las líneas al diario ya no se lanzan
+    errores: si falla la compactación solo se informa (ver compactarSiCorresponde).
+    '''
+    global _lote
+    lote = _lote
+    _lote = None
+    if ALMACENAMIENTO == "sqlite":
+        conexionSqlite().execute("COMMIT")
+        return
+    if not lote["grupos"]:
+        return
+    archivos = [archivo for cambios in lote["grupos"] for archivo, clave, registro in cambios]
+    bloqueos = bloquearVarios(archivos)
+    try:
+        bloqueoDiario = bloquearArchivo(DIARIO)
+        try:
+            version = ultimaVersionDiario()
+            lineas = []
+            for cambios in lote["grupos"]:
+                version += 1
+                lineas.append(lineaDiario(version, cambios))
+            agregarAlDiario(lineas)
+        finally:
+            desbloquearArchivo(bloqueoDiario)
+        ponerAlDiaConfirmados(archivos)
+    finally:
+        desbloquearVarios(bloqueos)
+    if compactar:
+        compactarSiCorresponde()
+
+def descartarLote():
+    '''
+    Cierra el lote abierto sin escribir nada. Los diccionarios afectados se descartan de la memoria
+    para que la próxima lectura los vuelva a tomar del disco.
+
+    PARAMETROS:
+    SALIDA:
+    '''
+    global _lote
+    lote = _lote
+    _lote = None
+    if ALMACENAMIENTO == "sqlite":
+        conexionSqlite().execute("ROLLBACK")
+        for indice in _indices.values():
+            indice["origen"] = None # Tenían aplicados los cambios descartados
+        return
+    for cambios in lote["grupos"]:
+        for archivo, clave, registro in cambios:
+            _cacheArchivos.pop(archivo, None)
+            cerrarMapeado(archivo)
+
+
+#FUNCIONES DE ALMACENAMIENTO SQLITE
+
+ESQUEMA_SQLITE = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS alumnos (
+    clave TEXT PRIMARY KEY,
+    activo INTEGER NOT NULL,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS libros (
+    clave TEXT PRIMARY KEY,
+    activo INTEGER NOT NULL,
+    categoria TEXT NOT NULL,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prestamos (
+    clave TEXT PRIMARY KEY,
+    IdAlumno TEXT NOT NULL,
+    IdLibro TEXT NOT NULL,
+    fechaPrestamo TEXT NOT NULL,
+    fechaDevolucion TEXT NOT NULL,
+    Devuelto INTEGER NOT NULL,
+    costoPrestamo NUMERIC NOT NULL,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prestamosPorAlumno ON prestamos (IdAlumno);
+CREATE INDEX IF NOT EXISTS prestamosPorLibro ON prestamos (IdLibro);
+CREATE INDEX IF NOT EXISTS prestamosPorFecha ON prestamos (fechaPrestamo);
+CREATE INDEX IF NOT EXISTS prestamosPendientesPorVencimiento ON prestamos (Devuelto, fechaDevolucion);
+CREATE INDEX IF NOT EXISTS librosPorCategoria ON libros (categoria);
+CREATE TABLE IF NOT EXISTS version (valor INTEGER NOT NULL);
+INSERT INTO version SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM version);
+CREATE TABLE IF NOT EXISTS secuencias (archivo TEXT PRIMARY KEY, ultimo INTEGER NOT NULL);
+
+-- Resumen mensual de préstamos por libro, mantenido por los triggers en cada alta, cambio o baja de un préstamo
+CREATE TABLE IF NOT EXISTS resumenMensual (
+    año TEXT NOT NULL,
+    mes INTEGER NOT NULL,
+    IdLibro TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    pesos NUMERIC NOT NULL,
+    PRIMARY KEY (año, mes, IdLibro)
+);
+INSERT INTO resumenMensual
+    SELECT substr(fechaPrestamo, 1, 4), CAST(substr(fechaPrestamo, 6, 2) AS INTEGER), IdLibro, COUNT(*), SUM(costoPrestamo)
+    FROM prestamos WHERE NOT EXISTS (SELECT 1 FROM resumenMensual) GROUP BY 1, 2, 3;
+CREATE TRIGGER IF NOT EXISTS resumenMensualAlta AFTER INSERT ON prestamos BEGIN
+    INSERT INTO resumenMensual VALUES (substr(NEW.fechaPrestamo, 1, 4), CAST(substr(NEW.fechaPrestamo, 6, 2) AS INTEGER), NEW.IdLibro, 1, NEW.costoPrestamo)
+        ON CONFLICT (año, mes, IdLibro) DO UPDATE SET cantidad = cantidad + 1, pesos = pesos + excluded.pesos;
+END;
+CREATE TRIGGER IF NOT EXISTS resumenMensualBaja AFTER DELETE ON prestamos BEGIN
+    UPDATE resumenMensual SET cantidad = cantidad - 1, pesos = pesos - OLD.costoPrestamo
+        WHERE año = substr(OLD.fechaPrestamo, 1, 4) AND mes = CAST(substr(OLD.fechaPrestamo, 6, 2) AS INTEGER) AND IdLibro = OLD.IdLibro;
+END;
+CREATE TRIGGER IF NOT EXISTS resumenMensualCambio AFTER UPDATE OF fechaPrestamo, IdLibro, costoPrestamo ON prestamos BEGIN
+    UPDATE resumenMensual SET cantidad = cantidad - 1, pesos = pesos - OLD.costoPrestamo
+        WHERE año = substr(OLD.fechaPrestamo, 1, 4) AND mes = CAST(substr(OLD.fechaPrestamo, 6, 2) AS INTEGER) AND IdLibro = OLD.IdLibro;
+    INSERT INTO resumenMensual VALUES (substr(NEW.fechaPrestamo, 1, 4), CAST(substr(NEW.fechaPrestamo, 6, 2) AS INTEGER), NEW.IdLibro, 1, NEW.costoPrestamo)
+        ON CONFLICT (año, mes, IdLibro) DO UPDATE SET cantidad = cantidad + 1, pesos = pesos + excluded.pesos;
+END;
+COMMIT;
+"""
+
+SQL_GUARDAR = {
+    "Alumnos.json": """INSERT INTO alumnos VALUES (?, ?, ?)
+        ON CONFLICT (clave) DO UPDATE SET activo = excluded.activo, datos = excluded.datos""",
+    "Libros.json": """INSERT INTO libros VALUES (?, ?, ?, ?)
+        ON CONFLICT (clave) DO UPDATE SET activo = excluded.activo, categoria = excluded.categoria, datos = excluded.datos""",
+    "Prestamos.json": """INSERT INTO prestamos VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (clave) DO UPDATE SET IdAlumno = excluded.IdAlumno, IdLibro = excluded.IdLibro,
+        fechaPrestamo = excluded.fechaPrestamo, fechaDevolucion = excluded.fechaDevolucion,
+        Devuelto = excluded.Devuelto, costoPrestamo = excluded.costoPrestamo, datos = excluded.datos"""
+}
+
+def conexionSqlite():
+    '''
+    Abre (una sola vez por proceso) la conexión a la base SQLite en modo WAL y crea las tablas e índices si no existen.
+    En modo WAL las lecturas no esperan a las escrituras de otras terminales.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve la conexión compartida.
+    '''
+    global _conexionSqlite
+    if _conexionSqlite is None:
+        conexion = sqlite3.connect(BASE_SQLITE, timeout=30, isolation_level=None, check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.executescript(ESQUEMA_SQLITE)
+        _conexionSqlite = conexion
+    return _conexionSqlite
+
+def filaSqlite(nombreArchivo, clave, registro):
+    '''
+    Arma la fila de la tabla correspondiente: el registro completo en JSON más las columnas indexadas.
+
+    PARAMETROS:
+    nombreArchivo: archivo JSON al que pertenece el registro.
+    clave: clave del registro.
+    registro: diccionario con el registro.
+
+    SALIDA:
+    Devuelve la tupla con los valores de la fila.
+    '''
+    datos = json.dumps(registro, ensure_ascii=False)
+    if nombreArchivo == "Alumnos.json":
+        return (clave, int(registro["activo"]), datos)
+    if nombreArchivo == "Libros.json":
+        return (clave, int(registro["activo"]), registro["categoria"], datos)
+    return (clave, registro["IdAlumno"], registro["IdLibro"], clave[:19], registro["fechaDevolucion"],
+            int(registro["Devuelto"]), registro["costoPrestamo"], datos)
+
+@medirTiempo
+def confirmarCambiosSqlite(cambios, anteriores):
+    '''
+    Versión de confirmarCambios para SQLite: verifica los registros leídos y guarda los cambios en una sola transacción.
+    Dentro de un lote abierto se usa la transacción del lote.
+
+    PARAMETROS:
+    cambios: lista de tuplas (nombreArchivo, clave, registro).
+    anteriores: diccionario {(nombreArchivo, clave): registro leído}.
+
+    SALIDA:
+    Devuelve True si se confirmaron los cambios, False si otra terminal modificó alguno de los registros leídos.
+    '''
+    conexion = conexionSqlite()
+    if _lote is None:
+        conexion.execute("BEGIN IMMEDIATE")
+    try:
+        sinConflictos = all(obtenerRegistro(archivo, clave) == anterior for (archivo, clave), anterior in anteriores.items())
+        if sinConflictos:
+            version = conexion.execute("SELECT valor FROM version").fetchone()[0]
+            previos = [obtenerRegistro(archivo, clave) for archivo, clave, registro in cambios]
+            for archivo, clave, registro in cambios:
+                conexion.execute(SQL_GUARDAR[archivo], filaSqlite(archivo, clave, registro))
+            conexion.execute("UPDATE version SET valor = valor + 1")
+    except BaseException:
+        if _lote is None:
+            conexion.execute("ROLLBACK")
+        raise
+    if _lote is None:
+        conexion.execute("COMMIT" if sinConflictos else "ROLLBACK")
+    if sinConflictos:
+        actualizarIndicesSqlite(version, cambios, previos)
+    return sinConflictos
+
+def migrarJsonASqlite():
+    '''
+    Copia los tres archivos JSON (con los cambios pendientes del diario) a la base SQLite,
+    reemplazando lo que tuviera. Se hace en una sola transacción.
+
+    PARAMETROS:
+    SALIDA:
+    Muestra la cantidad de registros migrados de cada archivo.
+    '''
+    conexion = conexionSqlite()
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        for nombreArchivo, tabla in TABLAS_SQLITE.items():
+            datos = leerArchivo(nombreArchivo)
+            conexion.execute(f"DELETE FROM {tabla}")
+            conexion.executemany(SQL_GUARDAR[nombreArchivo], (filaSqlite(nombreArchivo, clave, registro) for clave, registro in datos.items()))
+            print(f"{nombreArchivo}: {len(datos)} registros migrados a la tabla {tabla}.")
+        conexion.execute("UPDATE version SET valor = valor + 1")
+    except BaseException:
+        conexion.execute("ROLLBACK")
+        raise
+    conexion.execute("COMMIT")
+
+
+#FUNCIONES DE ACCESO MAPEADO EN MEMORIA
+
+# Índice de posiciones de un archivo JSON ("<archivo>.pos"), ordenado por clave para buscar con búsqueda binaria:
+#   encabezado: "POSICION", firma del archivo JSON (fecha, tamaño, inodo) y cantidad de registros
+#   entradas:   por cada registro, dónde está su clave dentro de los textos y dónde empieza y termina el registro
+#   textos:     las claves en UTF-8, una a continuación de otra
+MAGICO_POSICIONES = b"POSICION"
+ENCABEZADO_POSICIONES = struct.Struct("<8sQQQQ")
+ENTRADA_POSICIONES = struct.Struct("<QQQQ")
+ESPACIOS_JSON = re.compile(rb"[ \t\n\r]*")
+
+def archivoMapeado(nombreArchivo):
+    '''
+    Indica si los registros de un archivo se leen de a uno desde el archivo mapeado en memoria.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
+
+    SALIDA:
+    True o False.
+    '''
+    return ALMACENAMIENTO == "json" and ACCESO_REGISTROS == "mapeado" and fcntl is not None and nombreArchivo in ARCHIVOS_MAPEADOS
+
+def cerrarMapeado(nombreArchivo):
+    '''
+    Cierra el acceso mapeado a un archivo antes de reemplazarlo; se vuelve a mapear la próxima vez que se lea.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
+
+    SALIDA:
+    '''
+    entrada = _mapeados.pop(nombreArchivo, None)
+    if entrada is not None:
+        entrada["mapa"].close()
+        entrada["posiciones"]["mapa"].close()
+
+def archivoPosiciones(nombreArchivo):
+    '''
+    Devuelve el nombre del índice de posiciones de un archivo JSON (por ejemplo, "Libros.pos").
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
+
+    SALIDA:
+    Nombre del archivo del índice.
+    '''
+    return os.path.splitext(nombreArchivo)[0] + ".pos"
+
+def serializarConPosiciones(datos):
+    '''
+    Arma el contenido de un archivo JSON igual al de json.dumps(datos, indent=4), anotando dónde queda cada registro.
+
+    PARAMETROS:
+    datos: diccionario a guardar.
+
+    SALIDA:
+    Devuelve una tupla (contenido en bytes, lista de tuplas (clave, inicio, fin) con la posición de cada registro).
+    '''
+    partes = [b"{"]
+    tamaño = 1
+    posiciones = []
+    for numero, (clave, registro) in enumerate(datos.items()):
+        prefijo = (("," if numero else "") + "\n    " + json.dumps(clave, ensure_ascii=False) + ": ").encode("utf-8")
+        # Los textos no tienen saltos de línea sin escapar, así que alcanza con sangrar cada línea del registro
+        valor = json.dumps(registro, ensure_ascii=False, indent=4).replace("\n", "\n    ").encode("utf-8")
+        inicio = tamaño + len(prefijo)
+        posiciones.append((clave, inicio, inicio + len(valor)))
+        partes.extend([prefijo, valor])
+        tamaño = inicio + len(valor)
+    partes.append(b"\n}" if datos else b"}")
+    return b"".join(partes), posiciones
+
+def posicionesDeContenido(contenido):
+    '''
+    Recorre el contenido de un archivo JSON (un objeto con un registro por clave) y anota dónde está cada registro.
+    Se usa cuando el archivo no fue guardado por este programa en modo mapeado.
+
+    PARAMETROS:
+    contenido: bytes del archivo (o el archivo mapeado).
+
+    SALIDA:
+    Devuelve la lista de tuplas (clave, inicio, fin). Lanza json.JSONDecodeError si el contenido no es un objeto JSON.
+    '''
+    # Leído como latin-1 cada carácter es un byte, así las posiciones del texto coinciden con las del archivo.
+    # Las claves se vuelven a leer desde sus bytes en UTF-8.
+    texto = bytes(contenido).decode("latin-1")
+    decodificador = json.JSONDecoder()
+    posiciones = []
+    posicion = ESPACIOS_JSON.match(contenido, 0).end()
+    if texto[posicion:posicion + 1] != "{":
+        raise json.JSONDecodeError("Se esperaba un objeto", texto, posicion)
+    posicion = ESPACIOS_JSON.match(contenido, posicion + 1).end()
+    if texto[posicion:posicion + 1] == "}":
+        return posiciones
+    while True:
+        if texto[posicion:posicion + 1] != '"':
+            raise json.JSONDecodeError("Se esperaba una clave", texto, posicion)
+        finClave = json.decoder.scanstring(texto, posicion + 1)[1]
+        clave = json.loads(bytes(contenido[posicion:finClave]).decode("utf-8"))
+        posicion = ESPACIOS_JSON.match(contenido, finClave).end()
+        if texto[posicion:posicion + 1] != ":":
+            raise json.JSONDecodeError("Se esperaba ':'", texto, posicion)
+        inicio = ESPACIOS_JSON.match(contenido, posicion + 1).end()
+        fin = decodificador.raw_decode(texto, inicio)[1]
+        posiciones.append((clave, inicio, fin))
+        posicion = ESPACIOS_JSON.match(contenido, fin).end()
+        if texto[posicion:posicion + 1] == "}":
+            return posiciones
+        if texto[posicion:posicion + 1] != ",":
+            raise json.JSONDecodeError("Se esperaba ',' o '}'", texto, posicion)
+        posicion = ESPACIOS_JSON.match(contenido, posicion + 1).end()
+
+def guardarPosiciones(nombreArchivo, firma, posiciones):
+    '''
+    Guarda el índice de posiciones de un archivo JSON, ordenado por clave.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
+    firma: firma del archivo JSON al que corresponden las posiciones.
+    posiciones: lista de tuplas (clave, inicio, fin). Si una clave se repite vale la última, como en json.load.
+
+    SALIDA:
+    Escribe el índice de forma atómica.
+    '''
+    ultimas = {clave.encode("utf-8"): (inicio, fin) for clave, inicio, fin in posiciones}
+    entradas = []
+    textos = []
+    largoTextos = 0
+    for clave in sorted(ultimas):
+        entradas.append(ENTRADA_POSICIONES.pack(largoTextos, len(clave), *ultimas[clave]))
+        textos.append(clave)
+        largoTextos += len(clave)
+    encabezado = ENCABEZADO_POSICIONES.pack(MAGICO_POSICIONES, *firma, len(entradas))
+    reemplazarArchivo(archivoPosiciones(nombreArchivo), encabezado + b"".join(entradas) + b"".join(textos))
+
+def abrirPosiciones(nombreArchivo, firma):
+    '''
+    Abre el índice de posiciones de un archivo JSON mapeándolo en memoria, si corresponde a la firma indicada.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
+    firma: firma del archivo JSON mapeado.
+
+    SALIDA:
+    Devuelve {"mapa": índice mapeado, "cantidad": cantidad de registros, "textos": posición de las claves},
+    o None si no existe o quedó viejo.
+    '''
+    try:
+        Archivo = open(archivoPosiciones(nombreArchivo), mode="rb")
+    except FileNotFoundError:
+        return None
+    try:
+        if os.fstat(Archivo.fileno()).st_size < ENCABEZADO_POSICIONES.size:
+            return None
+        mapa = mmap.mmap(Archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        Archivo.close()
+    magico, fecha, tamaño, inodo, cantidad = ENCABEZADO_POSICIONES.unpack_from(mapa, 0)
+    if magico != MAGICO_POSICIONES or (fecha, tamaño, inodo) != tuple(firma):
+        mapa.close()
+        return None
+    return {"mapa": mapa, "cantidad": cantidad, "textos": ENCABEZADO_POSICIONES.size + cantidad * ENTRADA_POSICIONES.size}
+
+def registrosMapeados(nombreArchivo):
+    '''
+    Devuelve el acceso mapeado a un archivo JSON, al día con el diario. El archivo se vuelve a mapear solo si
+    otro proceso lo reemplazó (al compactar el diario); los cambios del diario se guardan aparte, sobre los
+    registros del archivo, así que nunca se lee el archivo completo.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON ("Alumnos.json" o "Libros.json").
+
+    SALIDA:
+    Devuelve un diccionario con el archivo mapeado ("mapa"), su índice de posiciones ("posiciones") y los registros
+    del diario posteriores al archivo ("datos"), con la misma forma que las entradas de _cacheArchivos.
+    '''
+    entrada = _mapeados.get(nombreArchivo)
+    if entrada is None or entrada["firma"] != firmaArchivo(nombreArchivo):
+        # La firma se toma del mismo descriptor que se mapea, para que coincida con el contenido mapeado
+        Archivo = open(nombreArchivo, mode="rb")
+        try:
+            estado = os.fstat(Archivo.fileno())
+            firma = (estado.st_mtime_ns, estado.st_size, estado.st_ino)
+            mapa = mmap.mmap(Archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            Archivo.close()
+        posiciones = abrirPosiciones(nombreArchivo, firma)
+        if posiciones is None:
+            guardarPosiciones(nombreArchivo, firma, posicionesDeContenido(mapa))
+            posiciones = abrirPosiciones(nombreArchivo, firma)
+        entrada = {"firma": firma, "mapa": mapa, "posiciones": posiciones, "datos": {}, "diario": None, "posicionDiario": 0, "version": 0}
+        _mapeados[nombreArchivo] = entrada
+        if _lote is not None:
+            aplicarLotePendiente(nombreArchivo, entrada["datos"])
+    aplicarDiario(nombreArchivo, entrada)
+    return entrada
+
+def buscarPosicion(posiciones, clave):
+    '''
+    Busca una clave en un índice de posiciones con búsqueda binaria, leyendo solo las entradas que compara.
+
+    PARAMETROS:
+    posiciones: índice abierto con abrirPosiciones.
+    clave: clave buscada.
+
+    SALIDA:
+    Devuelve una tupla (inicio, fin) con la posición del registro en el archivo JSON, o None si la clave no está.
+    '''
+    buscada = clave.encode("utf-8")
+    mapa = posiciones["mapa"]
+    bajo, alto = 0, posiciones["cantidad"]
+    while bajo < alto:
+        medio = (bajo + alto) // 2
+        inicioClave, largoClave, inicio, fin = ENTRADA_POSICIONES.unpack_from(mapa, ENCABEZADO_POSICIONES.size + medio * ENTRADA_POSICIONES.size)
+        actual = mapa[posiciones["textos"] + inicioClave:posiciones["textos"] + inicioClave + largoClave]
+        if actual < buscada:
+            bajo = medio + 1
+        elif actual > buscada:
+            alto = medio
+        else:
+            return inicio, fin
+    return None
+
+def leerRegistroMapeado(nombreArchivo, clave):
+    '''
+    Lee un único registro de un archivo con acceso mapeado: primero entre los cambios del diario y si no,
+    directamente de su posición en el archivo.
+
+    PARAMETROS:
+    nombreArchivo: nombre del archivo JSON.
+    clave: clave del registro.
+
+    SALIDA:
+    Devuelve el registro, o None si no existe.
+    '''
+    entrada = registrosMapeados(nombreArchivo)
+    if clave in entrada["datos"]:
+        return entrada["datos"][clave]
+    posicion = buscarPosicion(entrada["posiciones"], clave)
+    if posicion is None:
+        return None
+    return json.loads(entrada["mapa"][posicion[0]:posicion[1]].decode("utf-8"))
+
+
+#FUNCIONES DE ACCESO A LOS DATOS (independientes del almacenamiento elegido)
+
+def obtenerRegistro(nombreArchivo, clave):
+    '''
+    Busca un registro por su clave.
+
+    PARAMETROS:
+    nombreArchivo: "Alumnos.json", "Libros.json" o "Prestamos.json".
+    clave: clave del registro (IdAlumno, IdLibro o ID del préstamo).
+
+    SALIDA:
+    Devuelve el registro, o None si no existe. No debe modificarse directamente.
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        fila = conexionSqlite().execute(f"SELECT datos FROM {TABLAS_SQLITE[nombreArchivo]} WHERE clave = ?", (clave,)).fetchone()
+        return json.loads(fila[0]) if fila else None
+    if archivoMapeado(nombreArchivo):
+        return leerRegistroMapeado(nombreArchivo, clave)
+    return leerArchivo(nombreArchivo).get(clave)
+
+def recorrerRegistros(nombreArchivo, soloActivos=False):
+    '''
+    Recorre los registros de un archivo en el orden en que fueron ingresados.
+
+    PARAMETROS:
+    nombreArchivo: "Alumnos.json", "Libros.json" o "Prestamos.json".
+    soloActivos: si es True, solo devuelve los alumnos o libros con "activo" en True.
+
+    SALIDA:
+    Genera tuplas (clave, registro).
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        consulta = f"SELECT clave, datos FROM {TABLAS_SQLITE[nombreArchivo]}"
+        if soloActivos:
+            consulta += " WHERE activo = 1"
+        for clave, datos in conexionSqlite().execute(consulta + " ORDER BY rowid"):
+            yield clave, json.loads(datos)
+        return
+    for clave, registro in leerArchivo(nombreArchivo).items():
+        if not soloActivos or registro["activo"]:
+            yield clave, registro
+
+def clavesRegistros(nombreArchivo):
+    '''
+    Devuelve la lista de claves de un archivo.
+
+    PARAMETROS:
+    nombreArchivo: "Alumnos.json", "Libros.json" o "Prestamos.json".
+
+    SALIDA:
+    Lista con las claves.
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        return [fila[0] for fila in conexionSqlite().execute(f"SELECT clave FROM {TABLAS_SQLITE[nombreArchivo]}")]
+    return list(leerArchivo(nombreArchivo).keys())
+
+def prestamosDelPeriodo(desde, hasta):
+    '''
+    Recorre los préstamos realizados en un período. Como el ID del préstamo empieza con la fecha
+    "AAAA.MM.DD hh.mm.ss" (seguida de ".NNN" si hubo otro préstamo en el mismo segundo), el período se indica
+    con textos de ese formato (o un prefijo, como "2025.06").
+
+    PARAMETROS:
+    desde: fecha inicial, incluida.
+    hasta: fecha final, excluida.
+
+    SALIDA:
+    Genera tuplas (idPrestamo, prestamo).
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        consulta = "SELECT clave, datos FROM prestamos WHERE fechaPrestamo >= ? AND fechaPrestamo < ? ORDER BY rowid"
+        for clave, datos in conexionSqlite().execute(consulta, (desde, hasta)):
+            yield clave, json.loads(datos)
+        return
+    for idPrestamo, prestamo in leerArchivo("Prestamos.json").items():
+        if desde <= idPrestamo[:19] < hasta:
+            yield idPrestamo, prestamo
+
+@medirTiempo
+def resumenMensualPrestamos(año):
+    '''
+    Devuelve, para cada libro, la cantidad de préstamos y el total en pesos de cada mes del año, más los totales
+    de cada mes. No recorre los préstamos: en JSON se usa el índice del resumen mensual y en SQLite la tabla
+    resumenMensual, ambos actualizados con cada préstamo.
+
+    PARAMETROS:
+    año: texto con el año (por ejemplo "2025").
+
+    SALIDA:
+    Devuelve una tupla (porLibro, totales): porLibro es un diccionario {idLibro: [cantidades de los 12 meses,
+    pesos de los 12 meses]} con solo los libros que tuvieron préstamos ese año, y totales es
+    [cantidades de los 12 meses, pesos de los 12 meses] de todos los libros.
+    '''
+    if usarMotorColumnar():
+        return resumenMensualColumnar(año)
+    if ALMACENAMIENTO == "sqlite":
+        porLibro = {}
+        totales = [[0] * 12, [0] * 12]
+        consulta = "SELECT IdLibro, mes, cantidad, pesos FROM resumenMensual WHERE año = ? AND cantidad > 0"
+        for idLibro, mes, cantidad, pesos in conexionSqlite().execute(consulta, (año,)):
+            fila = porLibro.setdefault(idLibro, [[0] * 12, [0] * 12])
+            fila[0][mes - 1] = cantidad
+            fila[1][mes - 1] = pesos
+            totales[0][mes - 1] += cantidad
+            totales[1][mes - 1] += pesos
+        return porLibro, totales
+    resumenAño = obtenerIndice("resumenMensual").get(año)
+    if resumenAño is None:
+        return {}, [[0] * 12, [0] * 12]
+    porLibro = {idLibro: [list(fila[0]), list(fila[1])] for idLibro, fila in resumenAño["libros"].items()}
+    return porLibro, [list(resumenAño["totales"][0]), list(resumenAño["totales"][1])]
+
+def prestamosVencidosSinDevolver(fechaLimite):
+    '''
+    Recorre los préstamos no devueltos cuya fecha de devolución es anterior a la fecha límite, del más atrasado
+    al menos atrasado. Solo se recorren los préstamos vencidos: en JSON se usa el índice de préstamos pendientes
+    y en SQLite el índice (Devuelto, fechaDevolucion). Las fechas se comparan como texto, sin convertirlas.
+
+    PARAMETROS:
+    fechaLimite: texto con la fecha en formato "AAAA.MM.DD hh.mm.ss".
+
+    SALIDA:
+    Genera tuplas (idPrestamo, prestamo).
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        consulta = "SELECT clave, datos FROM prestamos WHERE Devuelto = 0 AND fechaDevolucion < ? ORDER BY fechaDevolucion, clave"
+        for clave, datos in conexionSqlite().execute(consulta, (fechaLimite,)):
+            yield clave, json.loads(datos)
+        return
+    pendientes = obtenerIndice("prestamosPendientes")
+    vencidos = pendientes[:bisect.bisect_left(pendientes, (fechaLimite,))]
+    for fechaDevolucion, idPrestamo in vencidos:
+        yield idPrestamo, obtenerRegistro("Prestamos.json", idPrestamo)
+
+
+#FUNCIONES DE SECUENCIAS DE IDS
+
+# Último número de ID entregado a cada archivo. En JSON se guarda en Biblioteca.secuencias (bloqueado mientras se
+# reserva) y en SQLite en la tabla secuencias. La primera vez se parte del ID más alto existente.
+ARCHIVO_SECUENCIAS = "Biblioteca.secuencias"
+FORMATOS_ID = {
+    "Alumnos.json": {"prefijo": "", "ancho": 1, "primero": 1001},
+    "Libros.json": {"prefijo": "L", "ancho": 3, "primero": 1}
+}
+
+def formatearId(nombreArchivo, numero):
+    '''
+    Arma el ID de un registro a partir de su número (por ejemplo, 7 → "L007" y 1234 → "L1234" en Libros).
+
+    PARAMETROS:
+    nombreArchivo: "Alumnos.json" o "Libros.json".
+    numero: número del ID.
+
+    SALIDA:
+    Devuelve el ID.
+    '''
+    formato = FORMATOS_ID[nombreArchivo]
+    return formato["prefijo"] + str(numero).zfill(formato["ancho"])
+
+def ordenId(idRegistro):
+    '''
+    Clave para ordenar IDs por su número y no alfabéticamente ("L999" antes que "L1000").
+
+    PARAMETROS:
+    idRegistro: ID de un alumno o libro.
+
+    SALIDA:
+    Devuelve una tupla comparable (prefijo, número, ID).
+    '''
+    partes = re.fullmatch(r"(\D*)(\d+)", idRegistro)
+    if partes is None:
+        return (idRegistro, -1, idRegistro)
+    return (partes.group(1), int(partes.group(2)), idRegistro)
+
+def mayorIdExistente(nombreArchivo):
+    '''
+    Busca el número de ID más alto de un archivo. Solo se usa para iniciar la secuencia la primera vez.
+
+    PARAMETROS:
+    nombreArchivo: "Alumnos.json" o "Libros.json".
+
+    SALIDA:
+    Devuelve el número más alto, o el anterior al primero si el archivo no tiene IDs con ese formato.
+    '''
+    formato = FORMATOS_ID[nombreArchivo]
+    patron = re.compile(re.escape(formato["prefijo"]) + r"(\d+)")
+    numeros = [int(partes.group(1)) for partes in map(patron.fullmatch, clavesRegistros(nombreArchivo)) if partes]
+    return max(numeros, default=formato["primero"] - 1)
+
+def reservarIds(nombreArchivo, cantidad=1):
+    '''
+    Reserva IDs nuevos consecutivos para un archivo. Cada número se entrega una sola vez, aunque varias terminales
+    reserven a la vez o el programa se reinicie; un ID reservado y no usado simplemente queda sin ocupar.
+    Para una importación se puede reservar de una vez todo el rango necesario.
+
+    PARAMETROS:
+    nombreArchivo: "Alumnos.json" o "Libros.json".
+    cantidad: cantidad de IDs a reservar.
+
+    SALIDA:
+    Devuelve la lista de IDs reservados, en orden.
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        conexion = conexionSqlite()
+        if _lote is None:
+            conexion.execute("BEGIN IMMEDIATE")
+        try:
+            fila = conexion.execute("SELECT ultimo FROM secuencias WHERE archivo = ?", (nombreArchivo,)).fetchone()
+            ultimo = fila[0] if fila else mayorIdExistente(nombreArchivo)
+            conexion.execute("INSERT INTO secuencias VALUES (?, ?) ON CONFLICT (archivo) DO UPDATE SET ultimo = excluded.ultimo",
+                             (nombreArchivo, ultimo + cantidad))
+        except BaseException:
+            if _lote is None:
+                conexion.execute("ROLLBACK")
+            raise
+        if _lote is None:
+            conexion.execute("COMMIT")
+    else:
+        Bloqueo = bloquearArchivo(ARCHIVO_SECUENCIAS)
+        try:
+            try:
+                Archivo = open(ARCHIVO_SECUENCIAS, mode="r", encoding="utf-8")
+                secuencias = json.load(Archivo)
+                Archivo.close()
+            except FileNotFoundError:
+                secuencias = {}
+            ultimo = secuencias[nombreArchivo] if nombreArchivo in secuencias else mayorIdExistente(nombreArchivo)
+            secuencias[nombreArchivo] = ultimo + cantidad
+            reemplazarArchivo(ARCHIVO_SECUENCIAS, json.dumps(secuencias, ensure_ascii=False, indent=4).encode("utf-8"))
+        finally:
+            desbloquearArchivo(Bloqueo)
+    return [formatearId(nombreArchivo, numero) for numero in range(ultimo + 1, ultimo + cantidad + 1)]
+
+
+#FUNCIONES DE INDICES EN MEMORIA
+
+def registrarIndice(nombre, nombreArchivo, crear, agregar, quitar, archivoIndice=None):
+    '''
+    Declara un índice en memoria sobre los registros de un archivo. El índice se arma la primera vez que se pide
+    con obtenerIndice y después se actualiza solo con los registros que cambian.
+
+    PARAMETROS:
+    nombre: nombre del índice.
+    nombreArchivo: archivo cuyos registros se indexan.
+    crear: función sin parámetros que devuelve el índice vacío.
+    agregar: función (indice, clave, registro) que incorpora un registro al índice.
+    quitar: función (indice, clave, registro) que saca un registro del índice.
+    archivoIndice: archivo opcional donde se guarda el índice para no armarlo de cero en cada inicio.
+                   La estructura debe poder pasarse a JSON, y quitar debe aceptar registro None
+                   (al ponerse al día con el diario no se conoce el registro anterior).
+
+    SALIDA:
+    '''
+    _indices[nombre] = {"archivo": nombreArchivo, "crear": crear, "agregar": agregar, "quitar": quitar,
+                        "archivoIndice": archivoIndice, "estructura": None, "origen": None, "versionGuardada": None}
+
+def obtenerIndice(nombre):
+    '''
+    Devuelve un índice declarado con registrarIndice, al día con los datos actuales.
+    Solo se arma de cero la primera vez o si los datos se volvieron a leer completos
+    (en SQLite, si otra terminal confirmó cambios).
+
+    PARAMETROS:
+    nombre: nombre del índice.
+
+    SALIDA:
+    Devuelve la estructura del índice. No debe modificarse directamente.
+    '''
+    indice = _indices[nombre]
+    if ALMACENAMIENTO == "sqlite":
+        origen = versionArchivo(indice["archivo"])
+        alDia = indice["origen"] == origen
+    else:
+        origen = leerArchivo(indice["archivo"]) # Aplica los cambios del diario, que actualizan el índice
+        alDia = indice["origen"] is origen
+    if not alDia:
+        estructura = None
+        if indice["archivoIndice"] and indice["estructura"] is None:
+            estructura = cargarIndiceGuardado(indice)
+        if estructura is None:
+            estructura = indice["crear"]()
+            for clave, registro in recorrerRegistros(indice["archivo"]):
+                indice["agregar"](estructura, clave, registro)
+            indice["versionGuardada"] = None
+        indice["estructura"] = estructura
+        indice["origen"] = origen
+        if indice["archivoIndice"] and indice["versionGuardada"] is None:
+            guardarIndice(indice)
+    return indice["estructura"]
+
+def cambiosDelDiario(desde, hasta):
+    '''
+    Junta los cambios del diario con versión mayor que desde y hasta hasta (inclusive).
+
+    PARAMETROS:
+    desde: versión ya conocida.
+    hasta: última versión buscada.
+
+    SALIDA:
+    Devuelve la lista de cambios [archivo, clave, registro], o None si el diario ya no tiene
+    todos los cambios de ese intervalo (por ejemplo, porque se compactó).
+    '''
+    try:
+        Diario = open(DIARIO, mode="rb")
+    except FileNotFoundError:
+        return [] if desde == hasta else None
+    contenido = Diario.read()
+    Diario.close()
+
+    base = None
+    cambios = []
+    for linea in contenido[:contenido.rfind(b"\n") + 1].splitlines():
+        if not linea.strip():
+            continue
+        registroDiario = json.loads(linea.decode("utf-8"))
+        if base is None:
+            # Un diario compactado empieza con una línea sin cambios que indica la versión de los archivos JSON
+            base = registroDiario["version"] if not registroDiario["cambios"] else registroDiario["version"] - 1
+        if desde < registroDiario["version"] <= hasta:
+            cambios.extend(registroDiario["cambios"])
+    if not (base or 0) <= desde <= hasta:
+        return None
+    return cambios
+
+def cargarIndiceGuardado(indice):
+    '''
+    Lee un índice guardado con guardarIndice y lo pone al día con los cambios del diario posteriores.
+
+    PARAMETROS:
+    indice: entrada de _indices.
+
+    SALIDA:
+    Devuelve la estructura del índice, o None si no hay un índice guardado que sirva y hay que armarlo de cero.
+    '''
+    try:
+        Archivo = open(indice["archivoIndice"], mode="r", encoding="utf-8")
+        guardado = json.load(Archivo)
+        Archivo.close()
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if guardado.get("almacenamiento") != ALMACENAMIENTO or _lote is not None:
+        return None
+
+    version = versionArchivo(indice["archivo"])
+    if ALMACENAMIENTO == "sqlite":
+        cambios = [] if guardado["version"] == version else None
+    else:
+        cambios = cambiosDelDiario(guardado["version"], version)
+    if cambios is None:
+        return None
+
+    estructura = guardado["estructura"]
+    for archivo, clave, registro in cambios:
+        if archivo == indice["archivo"]:
+            indice["quitar"](estructura, clave, None)
+            indice["agregar"](estructura, clave, registro)
+    indice["versionGuardada"] = guardado["version"] if cambios else version
+    return estructura
+
+@medirTiempo
+def guardarIndice(indice):
+    '''
+    Guarda en disco un índice al día, junto con la versión de los datos que refleja.
+    No se guarda con un lote abierto porque el índice incluye cambios todavía no confirmados.
+
+    PARAMETROS:
+    indice: entrada de _indices con archivoIndice.
+
+    SALIDA:
+    '''
+    if _lote is not None:
+        return
+    version = versionArchivo(indice["archivo"])
+    contenido = {"almacenamiento": ALMACENAMIENTO, "version": version, "estructura": indice["estructura"]}
+    reemplazarArchivo(indice["archivoIndice"], json.dumps(contenido, ensure_ascii=False).encode("utf-8"))
+    indice["versionGuardada"] = version
+
+def guardarIndicesModificados():
+    '''
+    Guarda los índices con archivo que cambiaron desde la última vez que se guardaron. Se llama al salir del programa.
+
+    PARAMETROS:
+    SALIDA:
+    '''
+    for nombre, indice in _indices.items():
+        if indice["archivoIndice"] and indice["estructura"] is not None:
+            obtenerIndice(nombre)
+            if indice["versionGuardada"] != versionArchivo(indice["archivo"]):
+                guardarIndice(indice)
+
+def actualizarEnMemoria(datos, clave, registro):
+    '''
+    Reemplaza un registro en un diccionario en memoria y actualiza los índices armados sobre ese diccionario.
+
+    PARAMETROS:
+    datos: diccionario compartido de un archivo (el que devuelve leerArchivo).
+    clave: clave del registro.
+    registro: registro nuevo.
+
+    SALIDA:
+    '''
+    anterior = datos.get(clave)
+    datos[clave] = registro
+    for indice in _indices.values():
+        if indice["origen"] is datos:
+            if anterior is not None:
+                indice["quitar"](indice["estructura"], clave, anterior)
+            indice["agregar"](indice["estructura"], clave, registro)
+
+def actualizarIndicesSqlite(version, cambios, previos):
+    '''
+    Aplica a los índices los cambios recién guardados en SQLite. Solo se actualizan los índices que estaban
+    al día con la versión anterior; los demás se vuelven a armar cuando se pidan.
+
+    PARAMETROS:
+    version: versión de la base antes de los cambios.
+    cambios: lista de tuplas (nombreArchivo, clave, registro) guardadas.
+    previos: registros que había antes de los cambios (None si no existían), en el mismo orden.
+
+    SALIDA:
+    '''
+    for indice in _indices.values():
+        if indice["origen"] != version:
+            continue
+        for (archivo, clave, registro), anterior in zip(cambios, previos):
+            if archivo == indice["archivo"]:
+                if anterior is not None:
+                    indice["quitar"](indice["estructura"], clave, anterior)
+                indice["agregar"](indice["estructura"], clave, registro)
+        indice["origen"] = version + 1
+
+def normalizarTexto(texto):
+    '''
+    Pasa un texto a minúsculas y le quita los acentos, para comparar sin importar cómo se escribió.
+
+    PARAMETROS:
+    texto: texto a normalizar.
+
+    SALIDA:
+    Devuelve el texto normalizado (por ejemplo, "Cortázar" → "cortazar").
+    '''
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+
+def palabrasAutores(libro):
+    '''
+    Separa en palabras normalizadas los nombres de los autores de un libro.
+
+    PARAMETROS:
+    libro: registro del libro.
+
+    SALIDA:
+    Devuelve el conjunto de palabras.
+    '''
+    palabras = set()
+    for autor in libro["autores"].values():
+        palabras.update(re.findall(r"\w+", normalizarTexto(autor)))
+    return palabras
+
+def agregarLibroAutores(indice, idLibro, libro):
+    '''
+    Agrega un libro al índice de autores.
+
+    PARAMETROS:
+    indice: índice de autores.
+    idLibro: ID del libro.
+    libro: registro del libro.
+
+    SALIDA:
+    '''
+    for palabra in palabrasAutores(libro):
+        if palabra not in indice["libros"]:
+            indice["libros"][palabra] = set()
+            bisect.insort(indice["palabras"], palabra)
+        indice["libros"][palabra].add(idLibro)
+
+def quitarLibroAutores(indice, idLibro, libro):
+    '''
+    Saca un libro del índice de autores; las palabras que quedan sin libros se eliminan.
+
+    PARAMETROS:
+    indice: índice de autores.
+    idLibro: ID del libro.
+    libro: registro del libro tal como estaba indexado.
+
+    SALIDA:
+    '''
+    for palabra in palabrasAutores(libro):
+        libros = indice["libros"].get(palabra)
+        if libros is None:
+            continue
+        libros.discard(idLibro)
+        if not libros:
+            del indice["libros"][palabra]
+            del indice["palabras"][bisect.bisect_left(indice["palabras"], palabra)]
+
+# Índice de autores: palabra normalizada → IDs de libros, más la lista ordenada de palabras para buscar por prefijo
+registrarIndice("autores", "Libros.json", lambda: {"libros": {}, "palabras": []}, agregarLibroAutores, quitarLibroAutores)
+
+@medirTiempo
+def librosPorAutor(textoBuscado):
+    '''
+    Busca libros por autor usando el índice de autores, sin recorrer todos los libros. Cada palabra buscada
+    puede ser el comienzo de una palabra del autor ("cort" encuentra "Cortázar"), sin importar acentos ni mayúsculas.
+
+    PARAMETROS:
+    textoBuscado: texto ingresado por el usuario.
+
+    SALIDA:
+    Devuelve la lista de IDs de los libros que coinciden con todas las palabras buscadas, primero los que coinciden
+    con palabras completas y luego los que coinciden solo por el comienzo.
+    '''
+    indice = obtenerIndice("autores")
+    buscadas = re.findall(r"\w+", normalizarTexto(textoBuscado))
+    if not buscadas:
+        return sorted(set().union(*indice["libros"].values()), key=ordenId)
+
+    puntajes = None
+    for buscada in buscadas:
+        # Las palabras que empiezan con la buscada están contiguas en la lista ordenada
+        puntajePalabra = {}
+        posicion = bisect.bisect_left(indice["palabras"], buscada)
+        while posicion < len(indice["palabras"]) and indice["palabras"][posicion].startswith(buscada):
+            palabra = indice["palabras"][posicion]
+            parecido = len(buscada) / len(palabra) # 1 si es la palabra completa
+            for idLibro in indice["libros"][palabra]:
+                puntajePalabra[idLibro] = max(puntajePalabra.get(idLibro, 0), parecido)
+            posicion += 1
+        if puntajes is None:
+            puntajes = puntajePalabra
+        else:
+            puntajes = {idLibro: puntaje + puntajePalabra[idLibro] for idLibro, puntaje in puntajes.items() if idLibro in puntajePalabra}
+    return sorted(puntajes, key=lambda idLibro: (-puntajes[idLibro], ordenId(idLibro)))
+
+
+def agregarLibroCategorias(indice, idLibro, libro):
+    '''
+    Agrega un libro al índice de categorías y, si está activo, al conjunto de libros activos.
+
+    PARAMETROS:
+    indice: índice de categorías.
+    idLibro: ID del libro.
+    libro: registro del libro.
+
+    SALIDA:
+    '''
+    categoria = normalizarTexto(libro["categoria"].strip())
+    if categoria not in indice["libros"]:
+        indice["libros"][categoria] = set()
+        indice["nombres"][categoria] = libro["categoria"].strip()
+        indice["activosPorCategoria"][categoria] = 0
+    indice["libros"][categoria].add(idLibro)
+    if libro["activo"]:
+        indice["activos"].add(idLibro)
+        indice["activosPorCategoria"][categoria] += 1
+
+def quitarLibroCategorias(indice, idLibro, libro):
+    '''
+    Saca un libro del índice de categorías y del conjunto de libros activos.
+
+    PARAMETROS:
+    indice: índice de categorías.
+    idLibro: ID del libro.
+    libro: registro del libro tal como estaba indexado.
+
+    SALIDA:
+    '''
+    categoria = normalizarTexto(libro["categoria"].strip())
+    if libro["activo"]:
+        indice["activos"].discard(idLibro)
+        indice["activosPorCategoria"][categoria] -= 1
+    indice["libros"][categoria].discard(idLibro)
+    if not indice["libros"][categoria]:
+        del indice["libros"][categoria]
+        del indice["nombres"][categoria]
+        del indice["activosPorCategoria"][categoria]
+
+# Índice de categorías: categoría normalizada → IDs de libros, el conjunto de libros activos
+# y la cantidad de libros activos de cada categoría
+registrarIndice("categorias", "Libros.json",
+                lambda: {"libros": {}, "nombres": {}, "activos": set(), "activosPorCategoria": {}},
+                agregarLibroCategorias, quitarLibroCategorias)
+
+def idsLibrosActivos():
+    '''
+    Devuelve los IDs de los libros activos, ordenados, sin recorrer el catálogo.
+
+    PARAMETROS:
+    SALIDA:
+    Lista de IDs de libros activos.
+    '''
+    return sorted(obtenerIndice("categorias")["activos"], key=ordenId)
+
+@medirTiempo
+def librosActivosPorCategoria(textoBuscado):
+    '''
+    Busca los libros activos cuya categoría contiene el texto buscado, sin importar acentos ni mayúsculas.
+    Se recorren solo los nombres de las categorías, no los libros.
+
+    PARAMETROS:
+    textoBuscado: texto ingresado por el usuario.
+
+    SALIDA:
+    Devuelve la lista ordenada de IDs de los libros activos encontrados.
+    '''
+    indice = obtenerIndice("categorias")
+    buscada = normalizarTexto(textoBuscado.strip())
+    encontrados = set()
+    for categoria, libros in indice["libros"].items():
+        if buscada in categoria:
+            encontrados |= libros
+    return sorted(encontrados & indice["activos"], key=ordenId)
+
+def cantidadLibrosPorCategoria():
+    '''
+    Cuenta los libros activos de cada categoría. Los conteos se mantienen en el índice, así que el costo
+    depende solo de la cantidad de categorías.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve un diccionario {nombre de la categoría: cantidad de libros activos} con las categorías que tienen alguno.
+    '''
+    indice = obtenerIndice("categorias")
+    return {indice["nombres"][categoria]: cantidad for categoria, cantidad in indice["activosPorCategoria"].items() if cantidad}
+
+
+# Parámetros del buscador del catálogo (ranking BM25)
+ARCHIVO_INDICE_CATALOGO = "Libros.indice"
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAXIMO_VARIANTES = 50 # Palabras del índice que como máximo se prueban por cada palabra buscada
+PALABRAS_VACIAS = {"a", "al", "con", "de", "del", "e", "el", "en", "la", "las", "lo", "los",
+                   "o", "para", "por", "u", "un", "una", "unas", "unos", "y"}
+
+def palabrasCatalogo(libro):
+    '''
+    Cuenta las palabras normalizadas de un libro para el buscador del catálogo. Las del nombre valen doble.
+
+    PARAMETROS:
+    libro: registro del libro.
+
+    SALIDA:
+    Devuelve un diccionario {palabra: frecuencia}.
+    '''
+    textos = [libro["nombre"], libro["nombre"], libro["editorial"], libro["categoria"]] + list(libro["autores"].values())
+    frecuencias = {}
+    for texto in textos:
+        for palabra in re.findall(r"\w+", normalizarTexto(texto)):
+            if palabra not in PALABRAS_VACIAS:
+                frecuencias[palabra] = frecuencias.get(palabra, 0) + 1
+    return frecuencias
+
+def agregarLibroCatalogo(indice, idLibro, libro):
+    '''
+    Agrega un libro activo al índice del catálogo. Los libros inactivos no se indexan.
+
+    PARAMETROS:
+    indice: índice del catálogo.
+    idLibro: ID del libro.
+    libro: registro del libro.
+
+    SALIDA:
+    '''
+    if not libro["activo"]:
+        return
+    frecuencias = palabrasCatalogo(libro)
+    for palabra, frecuencia in frecuencias.items():
+        if palabra not in indice["palabras"]:
+            indice["palabras"][palabra] = {}
+            bisect.insort(indice["ordenadas"], palabra)
+        indice["palabras"][palabra][idLibro] = frecuencia
+    indice["documentos"][idLibro] = frecuencias
+    indice["largos"][idLibro] = sum(frecuencias.values())
+    indice["longitudTotal"] += indice["largos"][idLibro]
+
+def quitarLibroCatalogo(indice, idLibro, libro):
+    '''
+    Saca un libro del índice del catálogo. Usa las palabras guardadas en el índice, así que no necesita el registro.
+
+    PARAMETROS:
+    indice: índice del catálogo.
+    idLibro: ID del libro.
+    libro: registro anterior del libro (puede ser None).
+
+    SALIDA:
+    '''
+    frecuencias = indice["documentos"].pop(idLibro, None)
+    if frecuencias is None:
+        return
+    for palabra in frecuencias:
+        libros = indice["palabras"][palabra]
+        del libros[idLibro]
+        if not libros:
+            del indice["palabras"][palabra]
+            del indice["ordenadas"][bisect.bisect_left(indice["ordenadas"], palabra)]
+    indice["longitudTotal"] -= indice["largos"].pop(idLibro)
+
+# Índice del catálogo: palabra → {IdLibro: frecuencia}, palabras y largo de cada libro y largo total para BM25.
+# Se guarda en Libros.indice para no volver a armarlo en cada inicio.
+registrarIndice("catalogo", "Libros.json",
+                lambda: {"palabras": {}, "ordenadas": [], "documentos": {}, "largos": {}, "longitudTotal": 0},
+                agregarLibroCatalogo, quitarLibroCatalogo, ARCHIVO_INDICE_CATALOGO)
+
+def difierenEnUnaLetra(palabra1, palabra2):
+    '''
+    Indica si dos palabras distintas difieren en a lo sumo una letra (cambiada, agregada, quitada)
+    o en dos letras vecinas invertidas.
+
+    PARAMETROS:
+    palabra1, palabra2: palabras a comparar.
+
+    SALIDA:
+    True o False.
+    '''
+    largo1, largo2 = len(palabra1), len(palabra2)
+    if abs(largo1 - largo2) > 1:
+        return False
+    i = 0
+    while i < min(largo1, largo2) and palabra1[i] == palabra2[i]:
+        i += 1
+    if largo1 > largo2:
+        return palabra1[i + 1:] == palabra2[i:]
+    if largo1 < largo2:
+        return palabra1[i:] == palabra2[i + 1:]
+    return (palabra1[i + 1:] == palabra2[i + 1:]
+            or (palabra1[i:i + 2] == palabra2[i:i + 2][::-1] and palabra1[i + 2:] == palabra2[i + 2:]))
+
+def variantesPalabra(indice, buscada):
+    '''
+    Busca en el índice las palabras que corresponden a una palabra buscada: la misma palabra, las que empiezan
+    con ella y, si no hay ninguna de esas, las que difieren en una letra (se asume bien escrita la primera).
+
+    PARAMETROS:
+    indice: índice del catálogo.
+    buscada: palabra normalizada.
+
+    SALIDA:
+    Devuelve un diccionario {palabra del índice: peso}, con peso 1 para la palabra exacta y menor para las demás.
+    '''
+    ordenadas = indice["ordenadas"]
+    variantes = {}
+    posicion = bisect.bisect_left(ordenadas, buscada)
+    while posicion < len(ordenadas) and ordenadas[posicion].startswith(buscada) and len(variantes) < MAXIMO_VARIANTES:
+        palabra = ordenadas[posicion]
+        variantes[palabra] = 1.0 if palabra == buscada else 0.5 + 0.5 * len(buscada) / len(palabra)
+        posicion += 1
+    if variantes or len(buscada) < 4:
+        return variantes
+
+    # Las palabras con la misma primera letra están contiguas en la lista ordenada
+    desde = bisect.bisect_left(ordenadas, buscada[0])
+    hasta = bisect.bisect_left(ordenadas, chr(ord(buscada[0]) + 1))
+    for posicion in range(desde, hasta):
+        palabra = ordenadas[posicion]
+        if difierenEnUnaLetra(buscada, palabra):
+            variantes[palabra] = 0.5
+            if len(variantes) >= MAXIMO_VARIANTES:
+                break
+    return variantes
+
+@medirTiempo
+def buscarEnCatalogo(textoBuscado, cantidad=20):
+    '''
+    Busca libros activos por nombre, editorial, categoría o autores, ordenados por relevancia (BM25).
+    Tolera acentos, palabras incompletas y errores de una letra.
+
+    PARAMETROS:
+    textoBuscado: texto ingresado por el usuario.
+    cantidad: cantidad máxima de resultados.
+
+    SALIDA:
+    Devuelve una lista de tuplas (idLibro, puntaje) de mayor a menor puntaje.
+    '''
+    indice = obtenerIndice("catalogo")
+    totalLibros = len(indice["documentos"])
+    if totalLibros == 0:
+        return []
+    largoPromedio = indice["longitudTotal"] / totalLibros
+
+    puntajes = {}
+    for buscada in set(re.findall(r"\w+", normalizarTexto(textoBuscado))) - PALABRAS_VACIAS:
+        # Cada libro suma el puntaje de la mejor variante de cada palabra buscada
+        mejores = {}
+        for palabra, peso in variantesPalabra(indice, buscada).items():
+            libros = indice["palabras"][palabra]
+            idf = math.log(1 + (totalLibros - len(libros) + 0.5) / (len(libros) + 0.5))
+            for idLibro, frecuencia in libros.items():
+                largo = indice["largos"][idLibro]
+                puntaje = peso * idf * frecuencia * (BM25_K1 + 1) / (frecuencia + BM25_K1 * (1 - BM25_B + BM25_B * largo / largoPromedio))
+                if puntaje > mejores.get(idLibro, 0):
+                    mejores[idLibro] = puntaje
+        for idLibro, puntaje in mejores.items():
+            puntajes[idLibro] = puntajes.get(idLibro, 0) + puntaje
+
+    mejoresLibros = heapq.nlargest(cantidad, puntajes.items(), key=lambda par: par[1])
+    return sorted(mejoresLibros, key=lambda par: (-par[1], ordenId(par[0])))
+
+
+def agregarPrestamoPendiente(pendientes, idPrestamo, prestamo):
+    '''
+    Agrega un préstamo no devuelto a la lista de pendientes, en su lugar según la fecha de devolución.
+
+    PARAMETROS:
+    pendientes: lista ordenada de tuplas (fechaDevolucion, idPrestamo).
+    idPrestamo: ID del préstamo.
+    prestamo: registro del préstamo.
+
+    SALIDA:
+    '''
+    if prestamo.get("Devuelto") == False:
+        bisect.insort(pendientes, (prestamo["fechaDevolucion"], idPrestamo))
+
+def quitarPrestamoPendiente(pendientes, idPrestamo, prestamo):
+    '''
+    Saca un préstamo de la lista de pendientes (por ejemplo, al registrar su devolución).
+
+    PARAMETROS:
+    pendientes: lista ordenada de tuplas (fechaDevolucion, idPrestamo).
+    idPrestamo: ID del préstamo.
+    prestamo: registro del préstamo tal como estaba indexado.
+
+    SALIDA:
+    '''
+    if prestamo.get("Devuelto") == False:
+        posicion = bisect.bisect_left(pendientes, (prestamo["fechaDevolucion"], idPrestamo))
+        if posicion < len(pendientes) and pendientes[posicion] == (prestamo["fechaDevolucion"], idPrestamo):
+            del pendientes[posicion]
+
+# Préstamos no devueltos ordenados por fecha de devolución: los vencidos quedan al principio de la lista
+registrarIndice("prestamosPendientes", "Prestamos.json", list, agregarPrestamoPendiente, quitarPrestamoPendiente)
+
+def fechaDeTexto(texto):
+    '''
+    Convierte una fecha en formato "AAAA.MM.DD hh.mm.ss" a datetime tomando los números por posición,
+    más rápido que strptime.
+
+    PARAMETROS:
+    texto: fecha en formato "AAAA.MM.DD hh.mm.ss".
+
+    SALIDA:
+    Devuelve el datetime correspondiente.
+    '''
+    return datetime(int(texto[0:4]), int(texto[5:7]), int(texto[8:10]), int(texto[11:13]), int(texto[14:16]), int(texto[17:19]))
+
+
+def sumarPrestamoResumen(resumen, idPrestamo, prestamo, signo):
+    '''
+    Suma (o resta, con signo -1) un préstamo en el resumen mensual de su año, mes y libro.
+
+    PARAMETROS:
+    resumen: índice del resumen mensual.
+    idPrestamo: ID del préstamo, que empieza con la fecha "AAAA.MM.DD".
+    prestamo: registro del préstamo.
+    signo: 1 para sumar, -1 para restar.
+
+    SALIDA:
+    '''
+    año, mesIdx = idPrestamo[:4], int(idPrestamo[5:7]) - 1
+    resumenAño = resumen.setdefault(año, {"libros": {}, "totales": [[0] * 12, [0] * 12]})
+    fila = resumenAño["libros"].setdefault(prestamo["IdLibro"], [[0] * 12, [0] * 12])
+    fila[0][mesIdx] += signo
+    fila[1][mesIdx] += signo * prestamo["costoPrestamo"]
+    resumenAño["totales"][0][mesIdx] += signo
+    resumenAño["totales"][1][mesIdx] += signo * prestamo["costoPrestamo"]
+    if not any(fila[0]):
+        del resumenAño["libros"][prestamo["IdLibro"]]
+
+# Resumen mensual de préstamos: {año: {"libros": {IdLibro: [cantidades, pesos]}, "totales": [cantidades, pesos]}},
+# con las listas de 12 meses. Cada préstamo nuevo suma en su mes, sin recorrer el historial.
+registrarIndice("resumenMensual", "Prestamos.json", dict,
+                lambda resumen, idPrestamo, prestamo: sumarPrestamoResumen(resumen, idPrestamo, prestamo, 1),
+                lambda resumen, idPrestamo, prestamo: sumarPrestamoResumen(resumen, idPrestamo, prestamo, -1))
+
+
+#MOTOR DE INFORMES COLUMNAR (opcional, requiere numpy)
+
+def usarMotorColumnar():
+    '''
+    Indica si los informes se calculan con el motor columnar.
+
+    PARAMETROS:
+    SALIDA:
+    True si se eligió el motor "columnar" y numpy está instalado.
+    '''
+    return MOTOR_INFORMES == "columnar" and numpy is not None
+
+def segundosDesdeTexto(fechas):
+    '''
+    Convierte un arreglo de fechas "AAAA.MM.DD hh.mm.ss" a segundos desde 1970, leyendo los dígitos por posición
+    en todo el arreglo a la vez (sin convertir fecha por fecha).
+
+    PARAMETROS:
+    fechas: arreglo de numpy con tipo "S19".
+
+    SALIDA:
+    Devuelve una tupla (segundos, años, meses) de arreglos int64.
+    '''
+    digitos = fechas.view(numpy.uint8).reshape(-1, 19).astype(numpy.int64) - ord("0")
+    años = digitos[:, 0] * 1000 + digitos[:, 1] * 100 + digitos[:, 2] * 10 + digitos[:, 3]
+    meses = digitos[:, 5] * 10 + digitos[:, 6]
+    dias = digitos[:, 8] * 10 + digitos[:, 9]
+    segundosDelDia = (digitos[:, 11] * 10 + digitos[:, 12]) * 3600 + (digitos[:, 14] * 10 + digitos[:, 15]) * 60 + digitos[:, 17] * 10 + digitos[:, 18]
+    primerDiaDelMes = ((años - 1970) * 12 + meses - 1).astype("datetime64[M]").astype("datetime64[D]").astype(numpy.int64)
+    return (primerDiaDelMes + dias - 1) * 86400 + segundosDelDia, años, meses
+
+def filasPrestamos():
+    '''
+    Recorre los préstamos devolviendo solo los campos que usa el motor columnar.
+
+    PARAMETROS:
+    SALIDA:
+    Genera tuplas (idPrestamo, IdLibro, IdAlumno, costoPrestamo, fechaDevolucion, Devuelto).
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        yield from conexionSqlite().execute("SELECT clave, IdLibro, IdAlumno, costoPrestamo, fechaDevolucion, Devuelto FROM prestamos")
+        return
+    for idPrestamo, prestamo in leerArchivo("Prestamos.json").items():
+        yield idPrestamo, prestamo["IdLibro"], prestamo["IdAlumno"], prestamo["costoPrestamo"], prestamo["fechaDevolucion"], prestamo.get("Devuelto") != False
+
+@medirTiempo
+def columnasPrestamos():
+    '''
+    Carga los préstamos en arreglos de numpy, una columna por campo: fechas como segundos desde 1970 (int64),
+    libros y alumnos como códigos enteros con su lista de IDs, costo como float64 y Devuelto como bool.
+    Los arreglos se reutilizan mientras no cambien los datos.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve un diccionario con las columnas.
+    '''
+    global _columnasPrestamos
+    # Con la copia columnar en disco no hace falta leer Prestamos.json: alcanza con la versión del diario
+    usarCopiaColumnar = ALMACENAMIENTO == "json" and os.path.exists(ARCHIVO_COLUMNAR_PRESTAMOS)
+    if usarCopiaColumnar:
+        version = (ALMACENAMIENTO, ultimaVersionDiario())
+    else:
+        version = (ALMACENAMIENTO, versionArchivo("Prestamos.json"))
+    if _columnasPrestamos is not None and _columnasPrestamos["version"] == version:
+        return _columnasPrestamos
+
+    crudas = columnasCrudasDesdeCopia(version[1]) if usarCopiaColumnar else None
+    if crudas is None:
+        # Cada columna se arma con su propia lista por comprensión, más rápido que separar fila por fila
+        if ALMACENAMIENTO == "sqlite":
+            filas = conexionSqlite().execute("SELECT clave, IdLibro, IdAlumno, costoPrestamo, fechaDevolucion, Devuelto FROM prestamos").fetchall()
+            claves, libros, alumnos, costos, devoluciones, devueltos = ([fila[i] for fila in filas] for i in range(6))
+        else:
+            prestamos = leerArchivo("Prestamos.json")
+            registros = list(prestamos.values())
+            claves = list(prestamos)
+            libros = [prestamo["IdLibro"] for prestamo in registros]
+            alumnos = [prestamo["IdAlumno"] for prestamo in registros]
+            costos = [prestamo["costoPrestamo"] for prestamo in registros]
+            devoluciones = [prestamo["fechaDevolucion"] for prestamo in registros]
+            devueltos = [prestamo.get("Devuelto") != False for prestamo in registros]
+        textos = {}
+        crudas = {
+            "claves": numpy.array(claves, dtype="S19"),
+            "libro": numpy.array([textos.setdefault(idLibro, len(textos)) for idLibro in libros], dtype=numpy.int64),
+            "alumno": numpy.array([textos.setdefault(idAlumno, len(textos)) for idAlumno in alumnos], dtype=numpy.int64),
+            "textos": list(textos),
+            "costo": numpy.array(costos, dtype=numpy.float64),
+            "fechaDevolucion": numpy.array(devoluciones, dtype="S19"),
+            "devuelto": numpy.array(devueltos, dtype=bool)
+        }
+
+    # El ID del préstamo empieza con la fecha del préstamo: alcanza con sus primeros 19 caracteres
+    segundosPrestamo, años, meses = segundosDesdeTexto(crudas["claves"].astype("S19"))
+    codigosLibros, codigoLibro = numpy.unique(crudas["libro"], return_inverse=True)
+    codigosAlumnos, codigoAlumno = numpy.unique(crudas["alumno"], return_inverse=True)
+    _columnasPrestamos = {
+        "version": version,
+        "segundosPrestamo": segundosPrestamo,
+        "año": años,
+        "mes": meses,
+        "segundosDevolucion": segundosDesdeTexto(crudas["fechaDevolucion"])[0],
+        "libros": [crudas["textos"][codigo] for codigo in codigosLibros.tolist()],
+        "codigoLibro": codigoLibro.reshape(-1),
+        "alumnos": [crudas["textos"][codigo] for codigo in codigosAlumnos.tolist()],
+        "codigoAlumno": codigoAlumno.reshape(-1),
+        "costo": crudas["costo"],
+        "devuelto": crudas["devuelto"]
+    }
+    return _columnasPrestamos
+
+def columnasCrudasDesdeCopia(version):
+    '''
+    Arma las columnas del motor columnar a partir de la copia columnar de Prestamos, sin leer JSON:
+    las columnas se toman directamente del archivo mapeado en memoria y después se les aplican
+    los préstamos del diario posteriores a la copia.
+
+    PARAMETROS:
+    version: última versión del diario.
+
+    SALIDA:
+    Devuelve un diccionario con las columnas sin procesar (claves, códigos de libro y alumno sobre la lista
+    "textos", costo, fechaDevolucion y devuelto), o None si la copia no sirve y hay que leer los préstamos.
+    '''
+    try:
+        copia = abrirColumnarPrestamos()
+    except (OSError, ValueError, json.JSONDecodeError):
+        return None
+    encabezado = copia["encabezado"]
+    if encabezado["almacenamiento"] != "json":
+        return None
+    cambios = cambiosDelDiario(encabezado["version"], version)
+    if cambios is None:
+        return None
+
+    def columna(grupo, nombre, tipo):
+        desplazamiento, largo = grupo["columnas"][nombre]
+        return numpy.frombuffer(copia["mapa"], dtype=tipo, count=largo // numpy.dtype(tipo).itemsize,
+                                offset=copia["base"] + desplazamiento)
+
+    grupos = encabezado["grupos"]
+    crudas = {
+        "claves": numpy.concatenate([columna(grupo, "clave", f"S{grupo['anchoClave']}") for grupo in grupos] or [numpy.array([], dtype="S19")]),
+        "libro": numpy.concatenate([columna(grupo, "libro", "<u4") for grupo in grupos] or [numpy.array([], dtype="<u4")]).astype(numpy.int64),
+        "alumno": numpy.concatenate([columna(grupo, "alumno", "<u4") for grupo in grupos] or [numpy.array([], dtype="<u4")]).astype(numpy.int64),
+        "textos": textosColumnar(copia, encabezado["diccionario"]),
+        "costo": numpy.concatenate([columna(grupo, "costo", "<f8") for grupo in grupos] or [numpy.array([], dtype="<f8")]).astype(numpy.float64),
+        "fechaDevolucion": numpy.concatenate([columna(grupo, "fechaDevolucion", "S19") for grupo in grupos] or [numpy.array([], dtype="S19")]),
+        "devuelto": numpy.concatenate([columna(grupo, "devuelto", "u1") for grupo in grupos] or [numpy.array([], dtype="u1")]).astype(bool)
+    }
+
+    # Los préstamos guardados como JSON en la copia (con otra forma) y los del diario se aplican encima
+    cambiosPorClave = {}
+    fila = 0
+    for grupo in grupos:
+        especiales = textosColumnar(copia, grupo["columnas"]["especial"])
+        for numero, texto in enumerate(especiales):
+            if texto:
+                cambiosPorClave[fila + numero] = json.loads(texto)
+        fila += grupo["filas"]
+    for archivo, clave, registro in cambios:
+        if archivo == "Prestamos.json":
+            cambiosPorClave[clave] = registro
+    if cambiosPorClave:
+        aplicarCambiosColumnas(crudas, cambiosPorClave, columna(encabezado, "orden", "<u4") if encabezado["filas"] else None)
+    return crudas
+
+def aplicarCambiosColumnas(crudas, cambios, orden):
+    '''
+    Aplica préstamos nuevos o modificados sobre las columnas sin procesar del motor columnar.
+
+    PARAMETROS:
+    crudas: columnas armadas por columnasCrudasDesdeCopia.
+    cambios: diccionario {clave o número de fila: registro del préstamo}.
+    orden: arreglo con las filas ordenadas por clave, para encontrar cada préstamo con búsqueda binaria.
+
+    SALIDA:
+    Modifica crudas.
+    '''
+    codigos = {texto: codigo for codigo, texto in enumerate(crudas["textos"])}
+    nuevas = []
+    for clave, registro in cambios.items():
+        fila = clave if isinstance(clave, int) else None
+        if fila is None and orden is not None:
+            buscada = numpy.array([clave.encode("utf-8")])
+            posicion = int(numpy.searchsorted(crudas["claves"], buscada.astype(crudas["claves"].dtype), sorter=orden)[0])
+            if posicion < len(orden) and crudas["claves"][orden[posicion]] == buscada[0]:
+                fila = int(orden[posicion])
+        if fila is None:
+            nuevas.append((clave, registro))
+            continue
+        for nombre, texto in (("libro", registro["IdLibro"]), ("alumno", registro["IdAlumno"])):
+            if texto not in codigos:
+                codigos[texto] = len(crudas["textos"])
+                crudas["textos"].append(texto)
+            crudas[nombre][fila] = codigos[texto]
+        crudas["costo"][fila] = registro["costoPrestamo"]
+        crudas["fechaDevolucion"][fila] = registro["fechaDevolucion"].encode("utf-8")
+        crudas["devuelto"][fila] = registro.get("Devuelto") != False
+
+    if nuevas:
+        for clave, registro in nuevas:
+            for texto in (registro["IdLibro"], registro["IdAlumno"]):
+                if texto not in codigos:
+                    codigos[texto] = len(crudas["textos"])
+                    crudas["textos"].append(texto)
+        crudas["claves"] = numpy.concatenate([crudas["claves"], numpy.array([clave.encode("utf-8") for clave, registro in nuevas])])
+        crudas["libro"] = numpy.concatenate([crudas["libro"], numpy.array([codigos[registro["IdLibro"]] for clave, registro in nuevas], dtype=numpy.int64)])
+        crudas["alumno"] = numpy.concatenate([crudas["alumno"], numpy.array([codigos[registro["IdAlumno"]] for clave, registro in nuevas], dtype=numpy.int64)])
+        crudas["costo"] = numpy.concatenate([crudas["costo"], numpy.array([registro["costoPrestamo"] for clave, registro in nuevas], dtype=numpy.float64)])
+        crudas["fechaDevolucion"] = numpy.concatenate([crudas["fechaDevolucion"], numpy.array([registro["fechaDevolucion"] for clave, registro in nuevas], dtype="S19")])
+        crudas["devuelto"] = numpy.concatenate([crudas["devuelto"], numpy.array([registro.get("Devuelto") != False for clave, registro in nuevas], dtype=bool)])
+
+def numeroSimple(valor):
+    '''
+    Convierte un float de numpy a int si no tiene decimales, para mostrarlo igual que los importes originales.
+
+    PARAMETROS:
+    valor: número a convertir.
+
+    SALIDA:
+    Devuelve un int o un float.
+    '''
+    valor = float(valor)
+    return int(valor) if valor.is_integer() else valor
+
+def resumenMensualColumnar(año):
+    '''
+    Versión de resumenMensualPrestamos con el motor columnar: agrupa por libro y mes con bincount.
+
+    PARAMETROS:
+    año: texto con el año (por ejemplo "2025").
+
+    SALIDA:
+    Devuelve la tupla (porLibro, totales) con el mismo formato que resumenMensualPrestamos.
+    '''
+    columnas = columnasPrestamos()
+    cantidadLibros = len(columnas["libros"])
+    filas = numpy.flatnonzero(columnas["año"] == int(año))
+    grupos = columnas["codigoLibro"][filas] * 12 + columnas["mes"][filas] - 1
+    cantidades = numpy.bincount(grupos, minlength=cantidadLibros * 12).reshape(cantidadLibros, 12)
+    pesos = numpy.bincount(grupos, weights=columnas["costo"][filas], minlength=cantidadLibros * 12).reshape(cantidadLibros, 12)
+
+    porLibro = {}
+    for codigo in numpy.flatnonzero(cantidades.sum(axis=1)):
+        porLibro[columnas["libros"][codigo]] = [cantidades[codigo].tolist(), [numeroSimple(v) for v in pesos[codigo]]]
+    totales = [cantidades.sum(axis=0).tolist(), [numeroSimple(v) for v in pesos.sum(axis=0)]]
+    return porLibro, totales
+
+@medirTiempo
+def indicadoresPrestamos(fechaLimite):
+    '''
+    Calcula los indicadores generales de los préstamos: cantidad total, pendientes de devolución, atrasados
+    (con su importe) y cantidad e importe por año. Con el motor columnar se calcula sobre los arreglos;
+    si no, en una sola pasada por los préstamos.
+
+    PARAMETROS:
+    fechaLimite: texto "AAAA.MM.DD hh.mm.ss"; los préstamos pendientes con devolución anterior están atrasados.
+
+    SALIDA:
+    Devuelve un diccionario {"prestamos", "pendientes", "atrasados", "importeAtrasado", "porAño": {año: [cantidad, importe]}}.
+    '''
+    if usarMotorColumnar():
+        columnas = columnasPrestamos()
+        limite = segundosDesdeTexto(numpy.array([fechaLimite], dtype="S19"))[0][0]
+        pendientes = ~columnas["devuelto"]
+        atrasados = pendientes & (columnas["segundosDevolucion"] < limite)
+        años, grupos = numpy.unique(columnas["año"], return_inverse=True)
+        cantidadPorAño = numpy.bincount(grupos.reshape(-1), minlength=len(años))
+        importePorAño = numpy.bincount(grupos.reshape(-1), weights=columnas["costo"], minlength=len(años))
+        return {
+            "prestamos": len(columnas["costo"]),
+            "pendientes": int(pendientes.sum()),
+            "atrasados": int(atrasados.sum()),
+            "importeAtrasado": numeroSimple(columnas["costo"][atrasados].sum()),
+            "porAño": {str(año): [int(cantidad), numeroSimple(importe)] for año, cantidad, importe in zip(años, cantidadPorAño, importePorAño)}
+        }
+
+    indicadores = {"prestamos": 0, "pendientes": 0, "atrasados": 0, "importeAtrasado": 0, "porAño": {}}
+    for idPrestamo, idLibro, idAlumno, costo, fechaDevolucion, devuelto in filasPrestamos():
+        indicadores["prestamos"] += 1
+        if not devuelto:
+            indicadores["pendientes"] += 1
+            if fechaDevolucion < fechaLimite:
+                indicadores["atrasados"] += 1
+                indicadores["importeAtrasado"] += costo
+        año = indicadores["porAño"].setdefault(idPrestamo[:4], [0, 0])
+        año[0] += 1
+        año[1] += costo
+    indicadores["porAño"] = dict(sorted(indicadores["porAño"].items()))
+    return indicadores
+
+
+#FORMATO COLUMNAR BINARIO DE PRESTAMOS
+
+# Copia de Prestamos en formato columnar: los préstamos se guardan en grupos de filas y, dentro de cada grupo,
+# una columna binaria por campo (los IDs de alumnos y libros como números de un diccionario de textos).
+# El archivo se puede mapear en memoria y leer solo las columnas necesarias, sin interpretar JSON.
+#
+#   "PRESTCOL" | largo del encabezado (8 bytes) | encabezado JSON | bloques alineados a 8 bytes
+#
+# El encabezado indica la versión de los datos, los grupos (con su clave mínima y máxima) y la posición de cada bloque.
+# Se crea con --exportar-columnar y, si existe, se actualiza en cada compactación del diario.
+ARCHIVO_COLUMNAR_PRESTAMOS = "Prestamos.col"
+MAGICO_COLUMNAR = b"PRESTCOL"
+FILAS_POR_GRUPO = 65536
+CAMPOS_PRESTAMO = ["IdAlumno", "IdLibro", "tipoPrestamo", "costoPrestamo", "fechaDevolucion", "Devuelto"]
+# Columnas numéricas de cada grupo con su tipo de array (I: uint32, q: int64, d: float64, B: uint8), en little endian
+TIPOS_COLUMNAS = {"alumno": "I", "libro": "I", "tipo": "q", "costo": "d", "costoDecimal": "B", "devuelto": "B"}
+
+def prestamoEnColumnas(registro):
+    '''
+    Indica si un préstamo tiene exactamente la forma habitual y por lo tanto se puede guardar en columnas sin perder
+    nada (mismos campos en el mismo orden y con los tipos esperados). Los demás se guardan como JSON.
+
+    PARAMETROS:
+    registro: registro del préstamo.
+
+    SALIDA:
+    True o False.
+    '''
+    if list(registro) != CAMPOS_PRESTAMO:
+        return False
+    costo = registro["costoPrestamo"]
+    fecha = registro["fechaDevolucion"]
+    return (type(registro["IdAlumno"]) is str and type(registro["IdLibro"]) is str
+            and type(registro["tipoPrestamo"]) is int and -2 ** 63 <= registro["tipoPrestamo"] < 2 ** 63
+            and (type(costo) is float or (type(costo) is int and abs(costo) <= 2 ** 53))
+            and type(fecha) is str and len(fecha) == 19 and fecha.isascii()
+            and type(registro["Devuelto"]) is bool)
+
+def agregarBloque(salida, contenido):
+    '''
+    Agrega un bloque de bytes al archivo columnar en armado, alineado a 8 bytes.
+
+    PARAMETROS:
+    salida: diccionario {"bloques": lista de bytes, "tamaño": bytes acumulados}.
+    contenido: bytes del bloque.
+
+    SALIDA:
+    Devuelve [desplazamiento, largo] del bloque, para el encabezado.
+    '''
+    ubicacion = [salida["tamaño"], len(contenido)]
+    relleno = b"\0" * (-len(contenido) % 8)
+    salida["bloques"].extend([contenido, relleno])
+    salida["tamaño"] += len(contenido) + len(relleno)
+    return ubicacion
+
+def bytesArreglo(tipo, valores):
+    '''
+    Convierte una lista de números a bytes en little endian con el tipo de array indicado.
+
+    PARAMETROS:
+    tipo: código de tipo del módulo array.
+    valores: lista de números.
+
+    SALIDA:
+    Devuelve los bytes.
+    '''
+    arreglo = array.array(tipo, valores)
+    if sys.byteorder == "big":
+        arreglo.byteswap()
+    return arreglo.tobytes()
+
+def agregarTextos(salida, textos):
+    '''
+    Agrega una lista de textos al archivo columnar: un bloque con las posiciones (uint64) y otro con los textos en UTF-8.
+
+    PARAMETROS:
+    salida: archivo columnar en armado.
+    textos: lista de textos (o de bytes).
+
+    SALIDA:
+    Devuelve {"posiciones": [...], "texto": [...]} con la ubicación de los dos bloques.
+    '''
+    codificados = [texto if isinstance(texto, bytes) else texto.encode("utf-8") for texto in textos]
+    posiciones = [0]
+    for codificado in codificados:
+        posiciones.append(posiciones[-1] + len(codificado))
+    return {"posiciones": agregarBloque(salida, bytesArreglo("Q", posiciones)),
+            "texto": agregarBloque(salida, b"".join(codificados))}
+
+@medirTiempo
+def escribirColumnarPrestamos(prestamos, version, ruta=ARCHIVO_COLUMNAR_PRESTAMOS):
+    '''
+    Guarda los préstamos en formato columnar (de forma atómica, como los JSON).
+
+    PARAMETROS:
+    prestamos: diccionario {idPrestamo: registro}.
+    version: versión de los datos que refleja la copia.
+    ruta: archivo a escribir.
+
+    SALIDA:
+    Escribe el archivo. Lanza ValueError si algún ID de préstamo contiene el carácter nulo.
+    '''
+    claves = list(prestamos)
+    textos = {}
+    salida = {"bloques": [], "tamaño": 0}
+    grupos = []
+    for inicio in range(0, len(claves), FILAS_POR_GRUPO):
+        clavesGrupo = claves[inicio:inicio + FILAS_POR_GRUPO]
+        columnas = {nombre: [] for nombre in TIPOS_COLUMNAS}
+        fechas = []
+        especiales = []
+        for clave in clavesGrupo:
+            registro = prestamos[clave]
+            if prestamoEnColumnas(registro):
+                columnas["alumno"].append(textos.setdefault(registro["IdAlumno"], len(textos)))
+                columnas["libro"].append(textos.setdefault(registro["IdLibro"], len(textos)))
+                columnas["tipo"].append(registro["tipoPrestamo"])
+                columnas["costo"].append(registro["costoPrestamo"])
+                columnas["costoDecimal"].append(type(registro["costoPrestamo"]) is float)
+                columnas["devuelto"].append(registro["Devuelto"])
+                fechas.append(registro["fechaDevolucion"].encode("ascii"))
+                especiales.append(b"")
+            else:
+                for valores in columnas.values():
+                    valores.append(0)
+                fechas.append(b"\0" * 19)
+                especiales.append(json.dumps(registro, ensure_ascii=False).encode("utf-8"))
+
+        clavesBytes = [clave.encode("utf-8") for clave in clavesGrupo]
+        if any(b"\0" in clave for clave in clavesBytes):
+            raise ValueError("Un ID de préstamo contiene el carácter nulo y no se puede guardar en formato columnar.")
+        ancho = max(len(clave) for clave in clavesBytes)
+        grupo = {"filas": len(clavesGrupo), "claveMinima": min(clavesGrupo), "claveMaxima": max(clavesGrupo),
+                 "anchoClave": ancho, "columnas": {}}
+        grupo["columnas"]["clave"] = agregarBloque(salida, b"".join(clave.ljust(ancho, b"\0") for clave in clavesBytes))
+        grupo["columnas"]["fechaDevolucion"] = agregarBloque(salida, b"".join(fechas))
+        for nombre, tipo in TIPOS_COLUMNAS.items():
+            grupo["columnas"][nombre] = agregarBloque(salida, bytesArreglo(tipo, columnas[nombre]))
+        grupo["columnas"]["especial"] = agregarTextos(salida, especiales)
+        grupos.append(grupo)
+
+    encabezado = {
+        "formato": 1,
+        "almacenamiento": ALMACENAMIENTO,
+        "version": version,
+        "filas": len(claves),
+        "campos": CAMPOS_PRESTAMO,
+        "grupos": grupos,
+        "diccionario": agregarTextos(salida, list(textos)),
+        # Filas ordenadas por ID de préstamo, para buscar un préstamo con búsqueda binaria
+        "columnas": {"orden": agregarBloque(salida, bytesArreglo("I", sorted(range(len(claves)), key=claves.__getitem__)))}
+    }
+    textoEncabezado = json.dumps(encabezado, ensure_ascii=False).encode("utf-8")
+    textoEncabezado += b" " * (-len(textoEncabezado) % 8)
+    reemplazarArchivo(ruta, MAGICO_COLUMNAR + struct.pack("<Q", len(textoEncabezado)) + textoEncabezado + b"".join(salida["bloques"]))
+
+def actualizarVersionColumnar(version, ruta=ARCHIVO_COLUMNAR_PRESTAMOS):
+    '''
+    Cambia la versión de un archivo columnar cuyos préstamos siguen iguales. Los bloques se copian tal cual
+    (sus ubicaciones se cuentan desde el final del encabezado), y el archivo se reemplaza de forma atómica.
+
+    PARAMETROS:
+    version: versión nueva.
+    ruta: archivo columnar.
+
+    SALIDA:
+    Devuelve True si se actualizó, False si el archivo no tiene el formato esperado y hay que volver a escribirlo.
+    '''
+    try:
+        copia = abrirColumnarPrestamos(ruta)
+    except (ValueError, json.JSONDecodeError):
+        return False
+    encabezado = dict(copia["encabezado"], version=version)
+    base = copia["base"]
+    copia["mapa"].close() # En Windows no se puede reemplazar un archivo mapeado
+    textoEncabezado = json.dumps(encabezado, ensure_ascii=False).encode("utf-8")
+    textoEncabezado += b" " * (-len(textoEncabezado) % 8)
+
+    def escribirContenido(Archivo):
+        Archivo.write(MAGICO_COLUMNAR + struct.pack("<Q", len(textoEncabezado)) + textoEncabezado)
+        Anterior = open(ruta, mode="rb")
+        try:
+            Anterior.seek(base)
+            while True:
+                bloque = Anterior.read(1024 * 1024)
+                if not bloque:
+                    break
+                Archivo.write(bloque)
+        finally:
+            Anterior.close()
+
+    reemplazarArchivoPorPartes(ruta, escribirContenido)
+    return True
+
+def abrirColumnarPrestamos(ruta=ARCHIVO_COLUMNAR_PRESTAMOS):
+    '''
+    Abre un archivo columnar mapeándolo en memoria. Solo se lee el encabezado; las columnas se leen cuando se piden.
+
+    PARAMETROS:
+    ruta: archivo columnar.
+
+    SALIDA:
+    Devuelve {"mapa": archivo mapeado, "encabezado": encabezado, "base": posición del primer bloque}.
+    Lanza ValueError si el archivo no tiene el formato esperado.
+    '''
+    Archivo = open(ruta, mode="rb")
+    try:
+        if os.fstat(Archivo.fileno()).st_size < 16:
+            raise ValueError(f"{ruta} no es un archivo columnar de préstamos.")
+        mapa = mmap.mmap(Archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        Archivo.close()
+    if mapa[:8] != MAGICO_COLUMNAR:
+        mapa.close()
+        raise ValueError(f"{ruta} no es un archivo columnar de préstamos.")
+    largo = struct.unpack("<Q", mapa[8:16])[0]
+    return {"mapa": mapa, "encabezado": json.loads(mapa[16:16 + largo].decode("utf-8")), "base": 16 + largo}
+
+def columnaColumnar(copia, ubicacion, tipo):
+    '''
+    Lee una columna numérica de un archivo columnar abierto.
+
+    PARAMETROS:
+    copia: archivo abierto con abrirColumnarPrestamos.
+    ubicacion: [desplazamiento, largo] del bloque.
+    tipo: código de tipo del módulo array.
+
+    SALIDA:
+    Devuelve un array con los valores.
+    '''
+    desplazamiento, largo = ubicacion
+    inicio = copia["base"] + desplazamiento
+    arreglo = array.array(tipo)
+    arreglo.frombytes(copia["mapa"][inicio:inicio + largo])
+    if sys.byteorder == "big":
+        arreglo.byteswap()
+    return arreglo
+
+def textosColumnar(copia, ubicaciones):
+    '''
+    Lee una lista de textos guardada con agregarTextos.
+
+    PARAMETROS:
+    copia: archivo abierto con abrirColumnarPrestamos.
+    ubicaciones: {"posiciones": [...], "texto": [...]}.
+
+    SALIDA:
+    Devuelve la lista de textos.
+    '''
+    posiciones = columnaColumnar(copia, ubicaciones["posiciones"], "Q")
+    inicio = copia["base"] + ubicaciones["texto"][0]
+    contenido = copia["mapa"][inicio:inicio + ubicaciones["texto"][1]]
+    return [contenido[posiciones[i]:posiciones[i + 1]].decode("utf-8") for i in range(len(posiciones) - 1)]
+
+@medirTiempo
+def leerColumnarPrestamos(ruta=ARCHIVO_COLUMNAR_PRESTAMOS):
+    '''
+    Convierte un archivo columnar de vuelta al diccionario de préstamos, idéntico al que se guardó
+    (mismo orden, mismos campos y mismos tipos).
+
+    PARAMETROS:
+    ruta: archivo columnar.
+
+    SALIDA:
+    Devuelve el diccionario {idPrestamo: registro}.
+    '''
+    copia = abrirColumnarPrestamos(ruta)
+    try:
+        encabezado = copia["encabezado"]
+        textos = textosColumnar(copia, encabezado["diccionario"])
+        prestamos = {}
+        for grupo in encabezado["grupos"]:
+            ubicaciones = grupo["columnas"]
+            columnas = {nombre: columnaColumnar(copia, ubicaciones[nombre], tipo) for nombre, tipo in TIPOS_COLUMNAS.items()}
+            especiales = textosColumnar(copia, ubicaciones["especial"])
+            ancho = grupo["anchoClave"]
+            inicio = copia["base"] + ubicaciones["clave"][0]
+            clavesBytes = copia["mapa"][inicio:inicio + ubicaciones["clave"][1]]
+            inicio = copia["base"] + ubicaciones["fechaDevolucion"][0]
+            fechas = copia["mapa"][inicio:inicio + ubicaciones["fechaDevolucion"][1]]
+            for fila in range(grupo["filas"]):
+                clave = clavesBytes[fila * ancho:(fila + 1) * ancho].rstrip(b"\0").decode("utf-8")
+                if especiales[fila]:
+                    prestamos[clave] = json.loads(especiales[fila])
+                    continue
+                costo = columnas["costo"][fila]
+                prestamos[clave] = {
+                    "IdAlumno": textos[columnas["alumno"][fila]],
+                    "IdLibro": textos[columnas["libro"][fila]],
+                    "tipoPrestamo": columnas["tipo"][fila],
+                    "costoPrestamo": costo if columnas["costoDecimal"][fila] else int(costo),
+                    "fechaDevolucion": fechas[fila * 19:(fila + 1) * 19].decode("ascii"),
+                    "Devuelto": bool(columnas["devuelto"][fila])
+                }
+        return prestamos
+    finally:
+        copia["mapa"].close()
+
+def exportarColumnarPrestamos():
+    '''
+    Crea (o actualiza) la copia columnar de los préstamos actuales. A partir de ahí, cada compactación del diario
+    la mantiene al día y el motor columnar de informes la usa en lugar de leer Prestamos.json.
+
+    PARAMETROS:
+    SALIDA:
+    Escribe Prestamos.col e informa la cantidad de préstamos exportados.
+    '''
+    if ALMACENAMIENTO == "sqlite":
+        prestamos = dict(recorrerRegistros("Prestamos.json"))
+    else:
+        prestamos = leerArchivo("Prestamos.json")
+    escribirColumnarPrestamos(prestamos, versionArchivo("Prestamos.json"))
+    print(f"{len(prestamos)} préstamos exportados a {ARCHIVO_COLUMNAR_PRESTAMOS}.")
+
+def columnarAJson(origen, destino):
+    '''
+    Convierte un archivo columnar de préstamos a un archivo JSON con el mismo formato que Prestamos.json.
+
+    PARAMETROS:
+    origen: archivo columnar.
+    destino: archivo JSON a escribir.
+
+    SALIDA:
+    Escribe el archivo JSON e informa la cantidad de préstamos convertidos.
+    '''
+    prestamos = leerColumnarPrestamos(origen)
+    reemplazarArchivo(destino, json.dumps(prestamos, ensure_ascii=False, indent=4).encode("utf-8"))
+    print(f"{len(prestamos)} préstamos convertidos de {origen} a {destino}.")
+
+
+#FUNCIONES DE VALIDACION
+
+# Patrones compilados una sola vez, no en cada validación
+PATRON_EMAIL = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+
+def validarEmail(_email):
+    '''
+    Valida si el formato del email ingresado es correcto mediante una expresión regular.
+    
+    PARAMETROS:
+    _email: cadena de texto que representa el email a validar.
+    
+    SALIDA:
+    Devuelve True si el email tiene un formato válido, False en caso contrario.
+    '''
+    return bool(PATRON_EMAIL.match(_email))
+
+
+
+
+def pedirMail():
+    '''
+    Solicita al usuario que ingrese un email y valida su formato.
+    
+    PARAMETROS:
+    SALIDA:
+    Devuelve el email ingresado una vez que cumple con el formato válido.
+    '''
+    email = input("Ingrese un email:").strip()
+    while not validarEmail(email):
+        print("Email inválido. Intente nuevamente.")
+        email = input("Ingrese un email válido: ").strip()
+    return email
+
+def pedirMailOpcional(email_actual):
+    """
+    Pide un nuevo email. Si se deja vacío, conserva el actual.
+    
+    PARAMETROS:
+    email_actual: string con el email que ya tiene el alumno
+    
+    SALIDA:
+    - Nuevo email validado si se ingresa uno.
+    - El mismo email si se deja vacío.
+    """
+    entrada = input(f"Ingrese nuevo email (actual: {email_actual}, Enter para mantenerlo): ").strip()
+    if entrada == "":
+        return email_actual
+
+    while not validarEmail(entrada):
+        print("Email inválido. Intente nuevamente o presione Enter para dejar el actual.")
+        entrada = input("Ingrese un email válido: ").strip()
+        if entrada == "":
+            return email_actual
+
+    return entrada
+
+def pedirTelefono(nro="Telefono"):
+    '''
+    Solicita al usuario que ingrese un número de teléfono válido, con opción a dejarlo vacío.
+    
+    PARAMETROS:
+    nro: etiqueta opcional que indica qué tipo de número se solicita (por defecto "Telefono").
+    
+    SALIDA:
+    Devuelve el número de teléfono ingresado si es válido, o una cadena vacía si el usuario lo omite.
+    '''
+    while True:
+        telefono = input(f"Ingrese {nro} (Enter para dejar vacío): ").strip()
+        
+        if telefono == "":
+            return ""  # Permite dejar vacío
+        
+        if validarTelefono(telefono):
+            return telefono
+        else:
+            print("Número inválido. Debe contener solo dígitos y tener entre 10 y 12 caracteres.")
+        
+
+def validarTelefono(_telefono):
+    '''
+    Valida que el número de teléfono contenga solo dígitos y tenga entre 10 y 12 caracteres.
+    
+    PARAMETROS:
+    _telefono: cadena de texto que representa el número a validar.
+    
+    SALIDA:
+    Devuelve True si el número es válido (solo dígitos, largo adecuado y mayor a 0), False en caso contrario.
+    '''
+    _telefono = _telefono.strip()
+    if _telefono.isdigit() and 10 <= len(_telefono) <= 12:
+        return int(_telefono) > 0
+    else:
+        return False
+    
+def validarNombre(_nombre):
+    '''
+    Valida que el nombre ingresado contenga solo letras (permitiendo espacios).
+    
+    PARAMETROS:
+    _nombre: cadena de texto que representa el nombre a validar.
+    
+    SALIDA:
+    Devuelve True si el nombre contiene únicamente letras y espacios, False en caso contrario.
+    '''
+    nombreSinEspacios= _nombre.replace(" ", "")
+    return nombreSinEspacios.isalpha()
+
+# Reglas que puede incumplir un alumno y su descripción para los mensajes
+REGLAS_ALUMNO = {
+    "soloLetras": "debe contener solo letras y espacios",
+    "formatoEmail": "no tiene el formato de un email",
+    "formatoTelefono": "debe contener solo dígitos y tener entre 10 y 12 caracteres"
+}
+
+def erroresAlumno(alumno):
+    '''
+    Verifica un alumno completo con las mismas reglas que el ingreso por teclado.
+
+    PARAMETROS:
+    alumno: registro del alumno.
+
+    SALIDA:
+    Devuelve la lista de tuplas (campo, regla, valor) que no se cumplen; vacía si el alumno es válido.
+    Los teléfonos se informan como "telefonos.telefono1", etc.
+    '''
+    errores = []
+    for campo in ("nombre", "apellido"):
+        valor = str(alumno.get(campo, ""))
+        if not validarNombre(valor):
+            errores.append((campo, "soloLetras", valor))
+    email = str(alumno.get("email", ""))
+    if not validarEmail(email):
+        errores.append(("email", "formatoEmail", email))
+    for campo, telefono in (alumno.get("telefonos") or {}).items():
+        if telefono != "" and not validarTelefono(str(telefono)):
+            errores.append(("telefonos." + campo, "formatoTelefono", telefono))
+    return errores
+
+def pedirNombre():
+    '''
+    Solicita al usuario que ingrese un nombre y valida que contenga solo letras y espacios.
+    
+    PARAMETROS:
+    SALIDA:
+    Devuelve el nombre ingresado si es válido. Muestra un mensaje de error si el formato es incorrecto.
+    '''
+    while True:
+        try:
+            nombre = input("Nombre: ").strip()
+            if not validarNombre(nombre):
+                raise ValueError
+            return nombre
+        except ValueError:
+            print("Error: El nombre solo debe contener letras y espacios")
+            
+def pedirNombreOpcional(nombreActual):
+    '''
+    Solicita un nuevo nombre o permite mantener el actual si se deja vacío.
+    
+    PARÁMETROS:
+    nombreActual: El nombre que ya tiene el alumno.
+
+    SALIDA:
+    Devuelve el nuevo nombre si es válido o el actual si se deja vacío.
+    '''
+    while True:
+        try:
+            nombre = input(f"Ingrese nuevo nombre (actual: {nombreActual}, Enter para mantenerlo): ").strip()
+            if nombre == "":
+                return nombreActual
+            if not validarNombre(nombre):
+                raise ValueError
+            return nombre
+        except ValueError:
+            print("Error: El nombre solo debe contener letras y espacios.")
+            
+
+def pedirApellido():
+    '''
+    Solicita al usuario que ingrese un apellido y valida que contenga solo letras y espacios.
+    
+    PARAMETROS:
+    SALIDA:
+    Devuelve el apellido ingresado si es válido. Muestra un mensaje de error si el formato es incorrecto.
+    '''
+    while True:
+        try:
+            apellido = input("Apellido: ").strip()
+            if not validarNombre(apellido):
+                raise ValueError
+            return apellido
+        except ValueError:
+            print("Error: El apellido solo debe contener letras y espacios")
+            
+def pedirApellidoOpcional(apellidoActual):
+    '''
+    Solicita un nuevo apellido o permite mantener el actual si se deja vacío.
+    
+    PARÁMETROS:
+    apellidoActual: El apellido que ya tiene el alumno.
+
+    SALIDA:
+    Devuelve el nuevo apellido si es válido o el actual si se deja vacío.
+    '''
+    while True:
+        try:
+            apellido = input(f"Ingrese nuevo apellido (actual: {apellidoActual}, Enter para mantenerlo): ").strip()
+            if apellido == "":
+                return apellidoActual
+            if not validarNombre(apellido):
+                raise ValueError
+            return apellido
+        except ValueError:
+            print("Error: El apellido solo debe contener letras y espacios.")
+
+def enteroPositivo(mensaje):
+    '''
+    Solicita al usuario que ingrese un número entero positivo o cero, y valida la entrada.
+    
+    PARAMETROS:
+    mensaje: texto que se muestra al solicitar el valor al usuario.
+    
+    SALIDA:
+    Devuelve el valor ingresado como entero si es válido (mayor o igual a 0). Muestra mensajes de error en caso de entrada inválida.
+    '''
+    while True:
+        try:
+            valor = int(input(mensaje))
+            if valor >= 0:
+                return valor
+            print("Debe ser un número igual o mayor a 0.")
+        except ValueError:
+            print("Entrada inválida. Ingrese un número igual o mayor a 0.")
+            
+def enteroPositivoOpcional(mensaje):
+    """
+    Solicita un número entero mayor o igual a 0.
+    Permite dejar vacío (devuelve None si se presiona Enter).
+    """
+    while True:
+        entrada = input(mensaje).strip()
+        if entrada == "":
+            return None
+        if entrada.isdigit():
+            return int(entrada)
+        print("Error: debe ingresar un número entero positivo o dejar vacío.")
+            
+def validarEstado(actual):
+    """
+    Solicita el estado activo/inactivo del libro.
+    Permite ingresar 'si', 'no', o Enter para no modificar.
+    
+    Retorna:
+        - True si se ingresa 'si'
+        - False si se ingresa 'no'
+        - None si se deja vacío (no se modifica)
+    """
+    while True:
+        try:
+            entrada = input(f"¿Activo? (actual: {actual}, si/no, Enter para mantener): ").strip().lower()
+            if entrada == "":
+                return None
+            elif entrada == "si":
+                return True
+            elif entrada == "no":
+                return False
+            else:
+                raise ValueError
+        except ValueError:
+            print("Error: Debe ingresar 'si', 'no' o presionar Enter para no modificarlo.")
+
+
+#SERVICIOS (operaciones sin entrada por teclado ni salida por pantalla)
+
+# Cada operación recibe sus datos como parámetros y devuelve un diccionario con "ok": True y el resultado,
+# o "ok": False con un código de "error" y un "mensaje" para mostrar. Los menús, la importación y cualquier
+# otro programa las usan igual. Los errores de lectura o escritura de archivos se propagan como excepciones.
+
+def resultadoError(error, mensaje, **datos):
+    '''
+    Arma el resultado de una operación que no se pudo realizar.
+
+    PARAMETROS:
+    error: código del error ("noEncontrado", "inactivo", "sinStock", "datosInvalidos", "yaRealizado" o "conflicto").
+    mensaje: texto para mostrar al usuario.
+    datos: datos adicionales del resultado.
+
+    SALIDA:
+    Devuelve el diccionario del resultado.
+    '''
+    return dict(datos, ok=False, error=error, mensaje=mensaje)
+
+RESULTADO_CONFLICTO = "otras terminales estaban modificando los mismos datos. Intente nuevamente."
+
+def paginaResultados(nombre, elementos, desde=0, cantidad=None):
+    '''
+    Arma el resultado de una consulta paginada. Los elementos se toman de un generador, así que solo se arman
+    los registros de la página pedida (y los anteriores se saltean sin copiarlos).
+
+    PARAMETROS:
+    nombre: clave del resultado que contiene la lista (por ejemplo "alumnos").
+    elementos: iterable con los elementos de la consulta, en orden.
+    desde: cantidad de elementos que se saltean antes de la página.
+    cantidad: cantidad de elementos de la página (None para todos los que siguen).
+
+    SALIDA:
+    Devuelve {"ok": True, nombre: lista de la página, "siguiente": valor de desde para la página siguiente,
+    o None si no hay más}.
+    '''
+    if cantidad is None:
+        return {"ok": True, nombre: list(itertools.islice(elementos, desde, None)), "siguiente": None}
+    # Se toma un elemento de más solo para saber si hay otra página
+    pagina = list(itertools.islice(elementos, desde, desde + cantidad + 1))
+    siguiente = desde + cantidad if len(pagina) > cantidad else None
+    return {"ok": True, nombre: pagina[:cantidad], "siguiente": siguiente}
+
+def erroresInvalidos(errores):
+    '''
+    Arma el resultado de una operación rechazada por datos de alumno inválidos.
+
+    PARAMETROS:
+    errores: lista de tuplas (campo, regla, valor) devuelta por erroresAlumno.
+
+    SALIDA:
+    Devuelve el resultado con el mensaje del primer error y la lista completa en "errores".
+    '''
+    campo, regla, valor = errores[0]
+    return resultadoError("datosInvalidos", f"{campo} inválido ('{valor}'): {REGLAS_ALUMNO[regla]}",
+                          errores=[{"campo": campo, "regla": regla, "valor": valor} for campo, regla, valor in errores])
+
+def textosLimpios(**campos):
+    '''
+    Verifica que los datos de texto de una operación sean textos y les quita los espacios de los extremos, como el menú.
+    Así un dato de otro tipo (por ejemplo, un número en un pedido al servidor) se rechaza antes de guardarlo.
+
+    PARAMETROS:
+    campos: cada dato de texto con su nombre.
+
+    SALIDA:
+    Devuelve la tupla (diccionario campo → texto limpio, None) o (None, resultado de error "datosInvalidos").
+    '''
+    for campo, valor in campos.items():
+        if not isinstance(valor, str):
+            return None, resultadoError("datosInvalidos", f"{campo} inválido ('{valor}'): debe ser un texto")
+    return {campo: valor.strip() for campo, valor in campos.items()}, None
+
+def altaAlumno(nombre, apellido, direccion, email, carrera, telefono1="", telefono2="", telefono3=""):
+    '''
+    Da de alta un alumno nuevo con el siguiente ID de la secuencia.
+
+    PARAMETROS:
+    nombre, apellido, direccion, email, carrera: datos del alumno.
+    telefono1, telefono2, telefono3: teléfonos (opcionales).
+
+    SALIDA:
+    Devuelve {"ok": True, "IdAlumno", "alumno"} o un resultado de error ("datosInvalidos" o "conflicto").
+    '''
+    textos, error = textosLimpios(nombre=nombre, apellido=apellido, direccion=direccion, email=email, carrera=carrera,
+                                  telefono1=telefono1, telefono2=telefono2, telefono3=telefono3)
+    if error:
+        return error
+    nombre, apellido, direccion, email, carrera, telefono1, telefono2, telefono3 = textos.values()
+    alumno = {
+        "IdAlumno": None,
+        "activo": True,
+        "nombre": nombre,
+        "apellido": apellido,
+        "direccion": direccion,
+        "email": email,
+        "carrera": carrera,
+        "telefonos":
+        {
+            "telefono1": telefono1,
+            "telefono2": telefono2,
+            "telefono3": telefono3
+        }
+    }
+    errores = erroresAlumno(alumno)
+    if errores:
+        return erroresInvalidos(errores)
+
+    def calcularCambios():
+        # El ID sale de la secuencia de alumnos; si igual ya existiera, se vuelve a calcular con el siguiente
+        nuevoId = reservarIds("Alumnos.json")[0]
+        return [("Alumnos.json", nuevoId, dict(alumno, IdAlumno=nuevoId))], {("Alumnos.json", nuevoId): None}
+
+    # Se agrega solo el alumno nuevo al diario
+    cambios = ejecutarTransaccion(calcularCambios)
+    if not cambios:
+        return resultadoError("conflicto", "No se pudo registrar el alumno porque " + RESULTADO_CONFLICTO)
+    return {"ok": True, "IdAlumno": cambios[0][1], "alumno": cambios[0][2]}
+
+def modificacionAlumno(idAlumno, nombre="", apellido="", direccion="", email="", carrera="", telefono1="", telefono2="", telefono3=""):
+    '''
+    Modifica los datos de un alumno. Los campos vacíos no se modifican.
+
+    PARAMETROS:
+    idAlumno: ID del alumno.
+    nombre, apellido, direccion, email, carrera, telefono1, telefono2, telefono3: datos nuevos ("" para mantener el actual).
+
+    SALIDA:
+    Devuelve {"ok": True, "alumno"} o un resultado de error ("noEncontrado", "datosInvalidos" o "conflicto").
+    '''
+    if obtenerRegistro("Alumnos.json", idAlumno) is None:
+        return resultadoError("noEncontrado", "ID de alumno no válido.")
+    textos, error = textosLimpios(nombre=nombre, apellido=apellido, direccion=direccion, email=email, carrera=carrera,
+                                  telefono1=telefono1, telefono2=telefono2, telefono3=telefono3)
+    if error:
+        return error
+    nombre, apellido, direccion, email, carrera, telefono1, telefono2, telefono3 = textos.values()
+    nuevos = {"nombre": nombre, "apellido": apellido, "direccion": direccion, "email": email, "carrera": carrera}
+    telefonos = {"telefono1": telefono1, "telefono2": telefono2, "telefono3": telefono3}
+    # Solo se validan los campos ingresados: los vacíos mantienen el valor actual
+    errores = [error for error in erroresAlumno(dict(nuevos, telefonos=telefonos)) if error[2] != ""]
+    if errores:
+        return erroresInvalidos(errores)
+
+    def calcularCambios():
+        # Los campos ingresados se aplican sobre el alumno actual: si otra terminal lo modificó
+        # mientras tanto, se conservan sus cambios en los campos que acá se dejaron en blanco
+        anterior = obtenerRegistro("Alumnos.json", idAlumno)
+        alumno = copy.deepcopy(anterior)
+
+        # Solo actualiza si el campo no está vacío
+        for campo, valor in nuevos.items():
+            if valor:
+                alumno[campo] = valor
+        for campo, valor in telefonos.items():
+            if valor:
+                alumno["telefonos"][campo] = valor
+        return [("Alumnos.json", idAlumno, alumno)], {("Alumnos.json", idAlumno): anterior}
+
+    # Se registra en el diario solo el alumno modificado
+    cambios = ejecutarTransaccion(calcularCambios)
+    if not cambios:
+        return resultadoError("conflicto", "No se pudo modificar el alumno porque " + RESULTADO_CONFLICTO)
+    return {"ok": True, "alumno": cambios[0][2]}
+
+def bajaAlumno(idAlumno):
+    '''
+    Da de baja (borrado lógico) a un alumno.
+
+    PARAMETROS:
+    idAlumno: ID del alumno.
+
+    SALIDA:
+    Devuelve {"ok": True} o un resultado de error ("noEncontrado", "yaRealizado" o "conflicto").
+    '''
+    def calcularCambios():
+        anterior = obtenerRegistro("Alumnos.json", idAlumno)
+        if not anterior["activo"]:
+            return None # Ya fue dado de baja (quizás desde otra terminal)
+        alumno = copy.deepcopy(anterior)
+        alumno["activo"] = False
+        return [("Alumnos.json", idAlumno, alumno)], {("Alumnos.json", idAlumno): anterior}
+
+    if obtenerRegistro("Alumnos.json", idAlumno) is None:
+        return resultadoError("noEncontrado", f"No se encontró ningún alumno con ID {idAlumno}.")
+    # Se registra en el diario solo el alumno dado de baja
+    resultado = ejecutarTransaccion(calcularCambios)
+    if resultado is None:
+        return resultadoError("yaRealizado", f"El alumno con ID {idAlumno} ya estaba dado de baja.")
+    if not resultado:
+        return resultadoError("conflicto", "No se pudo dar de baja al alumno porque " + RESULTADO_CONFLICTO)
+    return {"ok": True}
+
+def recorrerAlumnos(soloActivos=True):
+    '''
+    Recorre los alumnos en el orden en que fueron ingresados.
+
+    PARAMETROS:
+    soloActivos: si es True, solo los alumnos activos.
+
+    SALIDA:
+    Genera los registros de los alumnos, cada uno con su "IdAlumno".
+    '''
+    for idAlumno, alumno in recorrerRegistros("Alumnos.json", soloActivos):
+        yield dict(alumno, IdAlumno=idAlumno)
+
+def consultaAlumnos(soloActivos=True, desde=0, cantidad=None):
+    '''
+    Devuelve los alumnos en el orden en que fueron ingresados.
+
+    PARAMETROS:
+    soloActivos: si es True, solo los alumnos activos.
+    desde, cantidad: página pedida (ver paginaResultados); por defecto, todos.
+
+    SALIDA:
+    Devuelve {"ok": True, "alumnos": lista de registros con su "IdAlumno", "siguiente"}.
+    '''
+    return paginaResultados("alumnos", recorrerAlumnos(soloActivos), desde, cantidad)
+
+def altaLibro(nombre, editorial, categoria, stock, costo, autor1="", autor2="", autor3=""):
+    '''
+    Da de alta un libro nuevo con el siguiente ID de la secuencia. Queda activo si tiene stock.
+
+    PARAMETROS:
+    nombre, editorial, categoria: datos del libro.
+    stock, costo: enteros mayores o iguales a 0.
+    autor1, autor2, autor3: autores (opcionales).
+
+    SALIDA:
+    Devuelve {"ok": True, "IdLibro", "libro"} o un resultado de error ("datosInvalidos" o "conflicto").
+    '''
+    for campo, valor in (("stock", stock), ("costo", costo)):
+        if type(valor) is not int or valor < 0:
+            return resultadoError("datosInvalidos", f"{campo} inválido ('{valor}'): debe ser un número igual o mayor a 0")
+    textos, error = textosLimpios(nombre=nombre, editorial=editorial, categoria=categoria, autor1=autor1, autor2=autor2, autor3=autor3)
+    if error:
+        return error
+    nombre, editorial, categoria, autor1, autor2, autor3 = textos.values()
+    libro = {
+        "activo": stock > 0,
+        "stock": stock,
+        "nombre": nombre,
+        "editorial": editorial,
+        "categoria": categoria,
+        "autores": {
+            "autor1": autor1,
+            "autor2": autor2,
+            "autor3": autor3
+        },
+        "costo": costo
+    }
+
+    def calcularCambios():
+        # El ID sale de la secuencia de libros; si igual ya existiera, se vuelve a calcular con el siguiente
+        nuevoId = reservarIds("Libros.json")[0]
+        return [("Libros.json", nuevoId, libro)], {("Libros.json", nuevoId): None}
+
+    # Se agrega solo el libro nuevo al diario
+    cambios = ejecutarTransaccion(calcularCambios)
+    if not cambios:
+        return resultadoError("conflicto", "No se pudo registrar el libro porque " + RESULTADO_CONFLICTO)
+    return {"ok": True, "IdLibro": cambios[0][1], "libro": libro}
+
+def modificacionLibro(idLibro, nombre="", editorial="", categoria="", stock=None, costo=None, activo=None, autor1="", autor2="", autor3=""):
+    '''
+    Modifica los datos de un libro. Los textos vacíos y los valores None no se modifican.
+
+    PARAMETROS:
+    idLibro: ID del libro.
+    nombre, editorial, categoria, autor1, autor2, autor3: textos nuevos ("" para mantener el actual).
+    stock, costo: enteros mayores o iguales a 0 (None para mantener el actual).
+    activo: True o False (None para mantener el actual).
+
+    SALIDA:
+    Devuelve {"ok": True, "libro"} o un resultado de error ("noEncontrado", "datosInvalidos" o "conflicto").
+    '''
+    if obtenerRegistro("Libros.json", idLibro) is None:
+        return resultadoError("noEncontrado", "ID de libro no válido.")
+    for campo, valor in (("stock", stock), ("costo", costo)):
+        if valor is not None and (type(valor) is not int or valor < 0):
+            return resultadoError("datosInvalidos", f"{campo} inválido ('{valor}'): debe ser un número igual o mayor a 0")
+    if activo is not None and not isinstance(activo, bool):
+        return resultadoError("datosInvalidos", f"activo inválido ('{activo}'): debe ser verdadero o falso")
+    textos, error = textosLimpios(nombre=nombre, editorial=editorial, categoria=categoria, autor1=autor1, autor2=autor2, autor3=autor3)
+    if error:
+        return error
+    nombre, editorial, categoria, autor1, autor2, autor3 = textos.values()
+    nuevos = {"nombre": nombre, "editorial": editorial, "categoria": categoria}
+    autores = {"autor1": autor1, "autor2": autor2, "autor3": autor3}
+
+    def calcularCambios():
+        # Los campos ingresados se aplican sobre una copia del libro actual: si otra terminal lo modificó
+        # mientras tanto, se conservan sus cambios en los campos que acá se dejaron en blanco
+        anterior = obtenerRegistro("Libros.json", idLibro)
+        libro = copy.deepcopy(anterior)
+
+        # Solo actualiza si el campo no está vacío
+        for campo, valor in nuevos.items():
+            if valor:
+                libro[campo] = valor
+        for campo, valor in (("stock", stock), ("costo", costo), ("activo", activo)):
+            if valor is not None:
+                libro[campo] = valor
+        for campo, valor in autores.items():
+            if valor:
+                libro["autores"][campo] = valor
+        return [("Libros.json", idLibro, libro)], {("Libros.json", idLibro): anterior}
+
+    # Se registra en el diario solo el libro modificado
+    cambios = ejecutarTransaccion(calcularCambios)
+    if not cambios:
+        return resultadoError("conflicto", "No se pudo modificar el libro porque " + RESULTADO_CONFLICTO)
+    return {"ok": True, "libro": cambios[0][2]}
+
+def bajaLibro(idLibro):
+    '''
+    Desactiva un libro (borrado lógico).
+
+    PARAMETROS:
+    idLibro: ID del libro.
+
+    SALIDA:
+    Devuelve {"ok": True, "libro"} o un resultado de error ("noEncontrado", "yaRealizado" o "conflicto").
+    '''
+    def calcularCambios():
+        anterior = obtenerRegistro("Libros.json", idLibro)
+        if not anterior["activo"]:
+            return None # Ya estaba inactivo (quizás desde otra terminal)
+        libroInactivo = copy.deepcopy(anterior)
+        libroInactivo["activo"] = False
+        return [("Libros.json", idLibro, libroInactivo)], {("Libros.json", idLibro): anterior}
+
+    if obtenerRegistro("Libros.json", idLibro) is None:
+        return resultadoError("noEncontrado", f"No se encontró ningún libro con ID {idLibro}.")
+    # Se registra en el diario solo el libro modificado
+    resultado = ejecutarTransaccion(calcularCambios)
+    if resultado is None:
+        return resultadoError("yaRealizado", f"El libro con ID {idLibro} ya estaba inactivo.")
+    if not resultado:
+        return resultadoError("conflicto", "No se pudo desactivar el libro porque " + RESULTADO_CONFLICTO)
+    return {"ok": True, "libro": resultado[0][2]}
+
+def fichasLibros(idsLibros):
+    '''
+    Recorre los registros de los libros indicados, leyendo cada uno recién cuando se lo pide.
+
+    PARAMETROS:
+    idsLibros: IDs de los libros, en el orden deseado.
+
+    SALIDA:
+    Genera los registros de los libros, cada uno con su "IdLibro".
+    '''
+    for idLibro in idsLibros:
+        yield dict(obtenerRegistro("Libros.json", idLibro), IdLibro=idLibro)
+
+def consultaLibrosActivos(desde=0, cantidad=None):
+    '''
+    Devuelve los libros activos ordenados por ID.
+
+    PARAMETROS:
+    desde, cantidad: página pedida (ver paginaResultados); por defecto, todos.
+
+    SALIDA:
+    Devuelve {"ok": True, "libros": lista de registros con su "IdLibro", "siguiente"}.
+    '''
+    return paginaResultados("libros", fichasLibros(idsLibrosActivos()), desde, cantidad)
+
+def consultaLibrosPorAutor(autorBuscado, desde=0, cantidad=None):
+    '''
+    Busca libros por autor, primero los que coinciden con palabras completas.
+
+    PARAMETROS:
+    autorBuscado: texto con el autor (o parte de su nombre).
+    desde, cantidad: página pedida (ver paginaResultados); por defecto, todos.
+
+    SALIDA:
+    Devuelve {"ok": True, "libros": lista de registros con su "IdLibro", "siguiente"}.
+    '''
+    return paginaResultados("libros", fichasLibros(librosPorAutor(autorBuscado)), desde, cantidad)
+
+def consultaLibrosPorCategoria(categoria, desde=0, cantidad=None):
+    '''
+    Busca los libros activos cuya categoría contiene el texto buscado.
+
+    PARAMETROS:
+    categoria: texto con la categoría (o parte de ella).
+    desde, cantidad: página pedida (ver paginaResultados); por defecto, todos.
+
+    SALIDA:
+    Devuelve {"ok": True, "libros": lista de registros con su "IdLibro", "siguiente"}.
+    '''
+    return paginaResultados("libros", fichasLibros(librosActivosPorCategoria(categoria)), desde, cantidad)
+
+def consultaCategorias():
+    '''
+    Devuelve las categorías con la cantidad de libros activos de cada una.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve {"ok": True, "categorias": {categoría: cantidad}} ordenado por nombre.
+    '''
+    return {"ok": True, "categorias": dict(sorted(cantidadLibrosPorCategoria().items()))}
+
+def consultaCatalogo(textoBuscado, cantidad=20):
+    '''
+    Busca libros activos por cualquier dato (nombre, autor, editorial o categoría), del más al menos relevante.
+
+    PARAMETROS:
+    textoBuscado: texto a buscar.
+    cantidad: cantidad máxima de resultados.
+
+    SALIDA:
+    Devuelve {"ok": True, "libros": lista de registros con su "IdLibro" y su "puntaje"}.
+    '''
+    resultados = buscarEnCatalogo(textoBuscado, cantidad)
+    return {"ok": True, "libros": [dict(libro, puntaje=puntaje) for libro, (idLibro, puntaje) in zip(fichasLibros(idLibro for idLibro, puntaje in resultados), resultados)]}
+
+# Días hasta la devolución según el tipo de préstamo
+DIAS_POR_TIPO_PRESTAMO = {1: 7, 2: 15, 3: 30}
+
+def verificarDatosPrestamo(idAlumno, idLibro=None, tipoPrestamo=None):
+    '''
+    Verifica los datos de un préstamo a medida que se conocen (primero el alumno, después el libro y el tipo),
+    así el menú puede avisar de un error sin pedir los datos siguientes.
+
+    PARAMETROS:
+    idAlumno: ID del alumno.
+    idLibro: ID del libro (None para verificar solo el alumno).
+    tipoPrestamo: 1 (semanal), 2 (15 días) o 3 (30 días), como número o texto (None para no verificarlo).
+
+    SALIDA:
+    Devuelve None si los datos son válidos, o un resultado de error ("noEncontrado", "inactivo", "sinStock" o "datosInvalidos").
+    '''
+    alumno = obtenerRegistro("Alumnos.json", idAlumno)
+    if alumno is None or not alumno["activo"]:
+        return resultadoError("noEncontrado" if alumno is None else "inactivo", "Alumno no válido o inactivo.")
+    if idLibro is None:
+        return None
+    libro = obtenerRegistro("Libros.json", idLibro)
+    if libro is None or not libro["activo"] or libro["stock"] <= 0:
+        error = "noEncontrado" if libro is None else "inactivo" if not libro["activo"] else "sinStock"
+        return resultadoError(error, "Libro no válido, inactivo o sin stock.")
+    if tipoPrestamo is not None and str(tipoPrestamo) not in ["1", "2", "3"]:
+        return resultadoError("datosInvalidos", "Tipo de préstamo inválido.")
+    return None
+
+def altaPrestamo(idAlumno, idLibro, tipoPrestamo):
+    '''
+    Registra un préstamo nuevo y descuenta un ejemplar del stock del libro, ambos en la misma transacción.
+    El costo es el costo diario del libro por la cantidad de días del préstamo.
+
+    PARAMETROS:
+    idAlumno: ID del alumno.
+    idLibro: ID del libro.
+    tipoPrestamo: 1 (semanal), 2 (15 días) o 3 (30 días), como número o texto.
+
+    SALIDA:
+    Devuelve {"ok": True, "idPrestamo", "prestamo"} o un resultado de error
+    ("noEncontrado", "inactivo", "sinStock", "datosInvalidos" o "conflicto").
+    '''
+    error = verificarDatosPrestamo(idAlumno, idLibro, tipoPrestamo)
+    if error:
+        return error
+    tipoPrestamo = int(tipoPrestamo)
+    diasADevolver = DIAS_POR_TIPO_PRESTAMO[tipoPrestamo]
+    rechazo = [] # Motivo por el que la nueva validación rechazó el préstamo
+
+    def calcularCambios():
+        # Se vuelve a validar sobre el estado actual: otra terminal pudo prestar el último ejemplar
+        # o dar de baja al alumno o al libro mientras se cargaban los datos
+        alumno = obtenerRegistro("Alumnos.json", idAlumno)
+        libro = obtenerRegistro("Libros.json", idLibro)
+        rechazo.clear()
+        if not alumno["activo"]:
+            rechazo.append(resultadoError("inactivo", "Alumno no válido o inactivo."))
+        elif not libro["activo"]:
+            rechazo.append(resultadoError("inactivo", "Libro no válido, inactivo o sin stock."))
+        elif libro["stock"] <= 0:
+            rechazo.append(resultadoError("sinStock", "Libro no válido, inactivo o sin stock."))
+        if rechazo:
+            return None
+
+        # Calcular costoPrestamo basado en costoGarantia * tipoPrestamo
+        costo = libro.get("costo", 0)
+        costoPrestamo = costo * diasADevolver
+
+        fechaPrestamo = datetime.now()
+        fechaDevolucion = sumarDias(fechaPrestamo, diasADevolver)
+
+        idPrestamo = nuevoIdPrestamo(fechaPrestamo)
+        nuevoPrestamo = {
+            "IdAlumno": idAlumno,
+            "IdLibro": idLibro,
+            "tipoPrestamo": tipoPrestamo,
+            "costoPrestamo": costoPrestamo,
+            "fechaDevolucion": fechaDevolucion.strftime("%Y.%m.%d %H.%M.%S"),
+            "Devuelto": False
+        }
+
+        libroPrestado = copy.deepcopy(libro)
+        libroPrestado["stock"] -= 1
+
+        # El préstamo nuevo y el descuento de stock se confirman juntos en una sola línea del diario:
+        # se guardan ambos o ninguno
+        cambios = [
+            ("Prestamos.json", idPrestamo, nuevoPrestamo),
+            ("Libros.json", idLibro, libroPrestado)
+        ]
+        anteriores = {
+            ("Prestamos.json", idPrestamo): None,
+            ("Libros.json", idLibro): libro,
+            ("Alumnos.json", idAlumno): alumno
+        }
+        return cambios, anteriores
+
+    cambios = ejecutarTransaccion(calcularCambios)
+    if cambios is None:
+        return rechazo[0]
+    if not cambios:
+        return resultadoError("conflicto", "No se pudo registrar el préstamo porque " + RESULTADO_CONFLICTO)
+    return {"ok": True, "idPrestamo": cambios[0][1], "prestamo": cambios[0][2]}
+
+def devolucionPrestamo(idPrestamo):
+    '''
+    Registra la devolución de un préstamo y repone el stock del libro en la misma transacción.
+
+    PARAMETROS:
+    idPrestamo: ID del préstamo.
+
+    SALIDA:
+    Devuelve {"ok": True, "prestamo"} o un resultado de error ("noEncontrado", "yaRealizado" o "conflicto").
+    '''
+    def calcularCambios():
+        anterior = obtenerRegistro("Prestamos.json", idPrestamo)
+        if anterior.get("Devuelto", False):
+            return None # Ya fue devuelto (quizás desde otra terminal)
+        prestamoDevuelto = dict(anterior)
+        prestamoDevuelto["Devuelto"] = True
+        cambios = [("Prestamos.json", idPrestamo, prestamoDevuelto)]
+        anteriores = {("Prestamos.json", idPrestamo): anterior}
+
+        # La devolución repone el stock del libro en la misma línea del diario
+        idLibro = prestamoDevuelto["IdLibro"]
+        libro = obtenerRegistro("Libros.json", idLibro)
+        if libro is not None:
+            libroDevuelto = copy.deepcopy(libro)
+            libroDevuelto["stock"] += 1
+            cambios.append(("Libros.json", idLibro, libroDevuelto))
+            anteriores[("Libros.json", idLibro)] = libro
+        return cambios, anteriores
+
+    if obtenerRegistro("Prestamos.json", idPrestamo) is None:
+        return resultadoError("noEncontrado", "No se encontró un préstamo con ese ID.")
+    resultado = ejecutarTransaccion(calcularCambios)
+    if resultado is None:
+        return resultadoError("yaRealizado", "Este préstamo ya fue registrado como devuelto.")
+    if not resultado:
+        return resultadoError("conflicto", "No se pudo registrar la devolución porque " + RESULTADO_CONFLICTO)
+    return {"ok": True, "prestamo": resultado[0][2]}
+
+def recorrerPrestamosDelMes(fecha=None):
+    '''
+    Recorre los préstamos realizados en el mes de la fecha indicada, en orden de fecha.
+
+    PARAMETROS:
+    fecha: datetime de cualquier día del mes (por defecto, hoy).
+
+    SALIDA:
+    Genera los registros de los préstamos, cada uno con su "idPrestamo".
+    '''
+    if fecha is None:
+        fecha = datetime.now()
+    # El ID del préstamo empieza con la fecha, así que el mes se busca como un rango de texto
+    mes = fecha.strftime("%Y.%m")
+    mesSiguiente = (fecha.replace(day=1) + timedelta(days=32)).strftime("%Y.%m")
+    for idPrestamo, prestamo in prestamosDelPeriodo(mes, mesSiguiente):
+        yield dict(prestamo, idPrestamo=idPrestamo)
+
+def consultaPrestamosDelMes(fecha=None, desde=0, cantidad=None):
+    '''
+    Devuelve los préstamos realizados en el mes de la fecha indicada.
+
+    PARAMETROS:
+    fecha: datetime de cualquier día del mes (por defecto, hoy).
+    desde, cantidad: página pedida (ver paginaResultados); por defecto, todos.
+
+    SALIDA:
+    Devuelve {"ok": True, "prestamos": lista de registros con su "idPrestamo", "siguiente"}.
+    '''
+    return paginaResultados("prestamos", recorrerPrestamosDelMes(fecha), desde, cantidad)
+
+def consultaResumenAnual(año):
+    '''
+    Devuelve la cantidad y el importe de los préstamos de cada libro en cada mes del año.
+
+    PARAMETROS:
+    año: texto con el año (por ejemplo "2025").
+
+    SALIDA:
+    Devuelve {"ok": True, "libros": lista de {"IdLibro", "nombre", "cantidades", "pesos"} con todos los libros
+    (12 valores por mes), "totales": [cantidades, pesos] de cada mes}.
+    '''
+    porLibro, totales = resumenMensualPrestamos(año)
+    libros = []
+    for idLibro, libro in recorrerRegistros("Libros.json"):
+        cantidades, pesos = porLibro.get(idLibro, ([0] * 12, [0] * 12))
+        libros.append({"IdLibro": idLibro, "nombre": libro["nombre"], "cantidades": cantidades, "pesos": pesos})
+    return {"ok": True, "libros": libros, "totales": totales}
+
+def recorrerPrestamosAtrasados(fecha=None):
+    '''
+    Recorre los préstamos no devueltos con la fecha de devolución vencida, del más al menos atrasado.
+
+    PARAMETROS:
+    fecha: datetime con el que se calcula el atraso (por defecto, ahora).
+
+    SALIDA:
+    Genera los registros de los préstamos, cada uno con su "idPrestamo", "nombreAlumno" y "diasAtraso".
+    '''
+    if fecha is None:
+        fecha = datetime.now()
+    # Solo se recorren los préstamos pendientes ya vencidos, ordenados del más atrasado al menos atrasado
+    for idPrestamo, prestamo in prestamosVencidosSinDevolver(fecha.strftime("%Y.%m.%d %H.%M.%S")):
+        alumno = obtenerRegistro("Alumnos.json", prestamo["IdAlumno"])
+        yield dict(prestamo, idPrestamo=idPrestamo, nombreAlumno=alumno["nombre"] + " " + alumno["apellido"],
+                   diasAtraso=(fecha - fechaDeTexto(prestamo["fechaDevolucion"])).days)
+
+def consultaPrestamosAtrasados(fecha=None, desde=0, cantidad=None):
+    '''
+    Devuelve los préstamos no devueltos con la fecha de devolución vencida, del más al menos atrasado.
+
+    PARAMETROS:
+    fecha: datetime con el que se calcula el atraso (por defecto, ahora).
+    desde, cantidad: página pedida (ver paginaResultados); por defecto, todos.
+
+    SALIDA:
+    Devuelve {"ok": True, "prestamos": lista de registros con su "idPrestamo", "nombreAlumno" y "diasAtraso", "siguiente"}.
+    '''
+    return paginaResultados("prestamos", recorrerPrestamosAtrasados(fecha), desde, cantidad)
+
+def consultaIndicadores(fecha=None):
+    '''
+    Devuelve los indicadores generales de los préstamos.
+
+    PARAMETROS:
+    fecha: datetime con el que se calculan los atrasos (por defecto, ahora).
+
+    SALIDA:
+    Devuelve {"ok": True} junto con los datos de indicadoresPrestamos.
+    '''
+    if fecha is None:
+        fecha = datetime.now()
+    return dict(indicadoresPrestamos(fecha.strftime("%Y.%m.%d %H.%M.%S")), ok=True)
+
+
+#SALIDA PAGINADA
+
+# Los listados se arman con generadores que devuelven el texto de cada registro; mostrarPaginado junta una página
+# y la escribe de una sola vez, así la primera página aparece enseguida y cada página cuesta una sola escritura.
+FILAS_POR_PAGINA = int(os.environ.get("BIBLIOTECA_FILAS_POR_PAGINA", "20"))
+
+def mostrarPaginado(bloques, tamañoPagina=FILAS_POR_PAGINA, desde=0):
+    '''
+    Muestra un listado por páginas. En una terminal, después de cada página se pregunta si se sigue con la
+    siguiente; si la salida va a un archivo o a otro programa se escribe todo, igualmente de a una página por escritura.
+
+    PARAMETROS:
+    bloques: iterable con el texto de cada registro (con sus saltos de línea). Se consume a medida que se muestra.
+    tamañoPagina: cantidad de registros por página.
+    desde: cantidad de registros que se saltean antes de la primera página.
+
+    SALIDA:
+    Devuelve la cantidad de registros mostrados.
+    '''
+    interactivo = sys.stdin.isatty() and sys.stdout.isatty()
+    bloques = itertools.islice(bloques, desde, None)
+    mostrados = 0
+    proximo = next(bloques, None)
+    while proximo is not None:
+        pagina = [proximo]
+        pagina.extend(itertools.islice(bloques, tamañoPagina - 1))
+        sys.stdout.write("".join(pagina))
+        sys.stdout.flush()
+        mostrados += len(pagina)
+        proximo = next(bloques, None)
+        if proximo is not None and interactivo:
+            if input(f"-- {mostrados} mostrados. Enter para ver la página siguiente, 'q' para terminar: ").strip().lower() == "q":
+                break
+    return mostrados
+
+def textoAlumno(datos):
+    '''
+    Arma el texto con la ficha de un alumno para los listados.
+
+    PARAMETROS:
+    datos: registro del alumno con su "IdAlumno".
+
+    SALIDA:
+    Devuelve el texto, con salto de línea final.
+    '''
+    return ("-" * 30 + "\n"
+            f"Legajo: {datos['IdAlumno']}\n"
+            f"Nombre completo: {datos['nombre']} {datos['apellido']}\n"
+            f"Email: {datos['email']}\n"
+            f"Carrera: {datos['carrera']}\n"
+            f"Teléfono 1: {datos['telefonos']['telefono1']}\n"
+            f"Teléfono 2: {datos['telefonos']['telefono2']}\n"
+            f"Teléfono 3: {datos['telefonos']['telefono3']}\n"
+            + "-" * 30 + "\n")
+
+def textoLibro(datos, conCosto=False):
+    '''
+    Arma el texto con la ficha de un libro para los listados.
+
+    PARAMETROS:
+    datos: registro del libro con su "IdLibro".
+    conCosto: si es True, la ficha termina con el costo de garantía (listado de libros activos);
+              si no, va entre dos líneas separadoras (búsquedas).
+
+    SALIDA:
+    Devuelve el texto, con salto de línea final.
+    '''
+    texto = (f"ID del Libro: {datos['IdLibro']}\n"
+             f"Nombre: {datos['nombre']}\n"
+             f"Editorial: {datos['editorial']}\n"
+             f"Categoría: {datos['categoria']}\n"
+             f"Stock: {datos['stock']}\n"
+             f"Autor 1: {datos['autores']['autor1']}\n"
+             f"Autor 2: {datos['autores']['autor2']}\n"
+             f"Autor 3: {datos['autores']['autor3']}\n")
+    if conCosto:
+        return texto + f"Costo de garantia por dia: {datos['costo']}\n" + "-" * 30 + "\n"
+    return "-" * 30 + "\n" + texto + "-" * 30 + "\n"
+
+def textoPrestamoAtrasado(datos):
+    '''
+    Arma el texto con los datos de un préstamo atrasado para el listado.
+
+    PARAMETROS:
+    datos: registro del préstamo con su "idPrestamo", "nombreAlumno" y "diasAtraso".
+
+    SALIDA:
+    Devuelve el texto, con salto de línea final.
+    '''
+    return (f"ID Préstamo: {datos['idPrestamo']}\n"
+            f"Alumno: {datos['nombreAlumno']}\n"
+            f"ID Alumno: {datos['IdAlumno']}\n"
+            f"ID Libro: {datos['IdLibro']}\n"
+            f"Tipo de préstamo: {datos['tipoPrestamo']}\n"
+            f"Costo del préstamo: ${datos['costoPrestamo']}\n"
+            f"Fecha de devolución: {datos['fechaDevolucion']}\n"
+            f"Días de atraso: {datos['diasAtraso']}\n"
+            + "-" * 55 + "\n")
+
+
+# FUNCIONES PARA GESTIONAR ALUMNOS
+
+def ingresoAlumno():
+    
+    """
+    Funcion para ingresar alumnos al sistema.
+    
+    PARÁMETROS:
+    SALIDA:
+            Mensaje informativo que el Alumno fue ingresado correctamente. Ademas se carga el Alumno ingresado en el diccionario "Alumnos".
+    """
+    try:
+                
+        print("---------------------------")
+        print("Ingreso de nuevo Alumno")
+        print("---------------------------")
+
+        nombre = pedirNombre()
+        apellido = pedirApellido()
+        direccion = input("Dirección: ").strip()
+        email = pedirMail()
+        carrera = input("Carrera de estudio: ").strip()
+        telefono1 = pedirTelefono("Telefono 1:")
+        telefono2 = pedirTelefono("Telefono 2:")
+        telefono3 = pedirTelefono("Telefono 3:")
+
+        resultado = altaAlumno(nombre, apellido, direccion, email, carrera, telefono1, telefono2, telefono3)
+        if not resultado["ok"]:
+            print(f"\n{resultado['mensaje']}\n")
+            return
+
+        print(f"\n El alumno '{nombre}' (ID: {resultado['IdAlumno']}) fue agregado con éxito.\n")
+        
+    except(FileNotFoundError,OSError,json.JSONDecodeError,sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        
+        return
+
+def modificarAlumno():
+    """
+    Funcion para modificar alumnos al sistema.
+    
+    PARÁMETROS:
+            No recibe, busca el archivo Alumnos y lo convierte en diccionario
+    SALIDA:
+            Mensaje informativo que el Alumno fue modificado correctamente junto con las modificaciones realizadas.
+            Ademas se actualiza el alumno ingresado en el diccionario "Alumnos".
+    """
+    try:
+        print("\n=== Modificar Alumno ===")
+        print("Alumnos disponibles:")
+        mostrarPaginado(f"{datos['IdAlumno']}: {datos['nombre']} {datos['apellido']}\n" for datos in recorrerAlumnos(soloActivos=False))
+        idAlumno = input("Ingrese el ID del alumno a modificar: ").strip()
+        alumno = obtenerRegistro("Alumnos.json", idAlumno)
+        if alumno is None:
+            print("ID de alumno no válido.")
+            return
+
+        print("\nDeje en blanco para no modificar ese campo.")
+
+        nombre=pedirNombreOpcional(alumno['nombre'])
+        apellido = pedirApellidoOpcional(alumno['apellido'])
+        direccion = input(f"Dirección actual ({alumno['direccion']}): ").strip()
+        print((f"Email actual ({alumno['email']}): "))
+        email = pedirMailOpcional(alumno['email'])
+        carrera = input(f"Carrera actual ({alumno['carrera']}): ").strip()
+
+        print(f"Teléfono 1 actual ({alumno['telefonos']['telefono1']}): ")
+        telefono1 = pedirTelefono("Telefono 1:")        
+        print(f"Teléfono 2 actual ({alumno['telefonos']['telefono2']}): ")
+        telefono2 = pedirTelefono("Telefono 2:")
+        print(f"Teléfono 3 actual ({alumno['telefonos']['telefono3']}): ")
+        telefono3 = pedirTelefono("Telefono 3:")
+
+        resultado = modificacionAlumno(idAlumno, nombre, apellido, direccion, email, carrera, telefono1, telefono2, telefono3)
+        if not resultado["ok"]:
+            print(f"\n{resultado['mensaje']}")
+            return
+
+        print("\nAlumno modificado exitosamente.")
+        return
+    except(FileNotFoundError,OSError,json.JSONDecodeError,sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+def eliminarAlumno():
+    """
+    Funcion para eliminar alumnos del sistema, lee un archivo y lo modifica.
+    SALIDA:
+            Mensaje informativo que el Alumno fue eliminado correctamente. Ademas se elimina mediante baja logica el Alumno eliminado en el archivo "Alumnos".
+    """
+    try:
+        while True:
+            legajo = input("Ingrese el ID del alumno a eliminar: ")
+            print()
+
+            if not legajo.isdigit():
+                print("Error: Debe ingresar un número entero.")
+                continue
+
+            legajo = str(int(legajo))
+            break  # Si todo está OK, salimos del bucle
+
+        resultado = bajaAlumno(legajo)
+        if resultado["ok"]:
+            print(f"El alumno con ID {legajo} fue dado de baja.")
+        else:
+            print(resultado["mensaje"])
+
+        return
+    except(FileNotFoundError,OSError,json.JSONDecodeError,sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+def listarAlumnos():
+    """
+    Funcion para ingresar alumnos al sistema.
+    SALIDA:
+            Listado de alumnos con campo "Activo" == True.
+    """
+    try:
+        if not mostrarPaginado(textoAlumno(datos) for datos in recorrerAlumnos()):
+            print("No hay alumnos activos para listar.")
+        return
+    except(FileNotFoundError,OSError,json.JSONDecodeError,sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+        
+#FUNCIONES PARA GESTIONAR LIBROS
+def ingresoLibros():
+
+    """
+    Funcion para ingresar libros al sistema, guarda el libro en archivo "Libros"
+    
+    PARÁMETROS:
+    SALIDA:
+            Mensaje informativo que el libro fue ingresado correctamente. Ademas se carga el libro ingresado en el archivo "Libros".
+    """
+    try:
+        print("---------------------------")
+        print("Ingreso de nuevo libro")
+        print("---------------------------")
+
+        nombre = input("Nombre del libro: ").strip()
+        editorial = input("Editorial: ").strip()
+        categoria = input("Categoría: ").strip()
+        stock = enteroPositivo("Ingrese stock:") #Llamo a una funcion que valide que se ingrese un entero >=0
+        costo=enteroPositivo("Ingrese costo:")
+            
+
+        autor1 = input("Autor principal: ").strip()
+        autor2 = input("Segundo autor: ").strip()
+        autor3 = input("Tercer autor: ").strip()
+
+        resultado = altaLibro(nombre, editorial, categoria, stock, costo, autor1, autor2, autor3)
+        if not resultado["ok"]:
+            print(f"\n{resultado['mensaje']}\n")
+            return
+
+        print(f"\n El libro '{nombre}' (ID: {resultado['IdLibro']}) fue agregado con éxito.\n")
+        return
+    except(FileNotFoundError,OSError,json.JSONDecodeError,sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+def modificarLibro():
+    """
+    Funcion para modificar libros al sistema.
+    
+    PARÁMETROS:
+    SALIDA:
+            Mensaje informativo que el libro fue modificado correctamente. Ademas se carga el libro modificado en el archivo "Libros".
+    """
+    try:
+        print("\n=== Modificar Libro ===")
+        print("Libros disponibles:")
+        mostrarPaginado(f"{idLib}: {datos['nombre']}\n" for idLib, datos in recorrerRegistros("Libros.json"))
+        idLibro = input("Ingrese el ID del libro a modificar: ").strip()
+        libro = obtenerRegistro("Libros.json", idLibro)
+        if libro is None:
+            print("ID de libro no válido.")
+            return
+
+        print("\nDeje en blanco para no modificar ese campo.")
+
+        nombre = input(f"Nombre actual ({libro['nombre']}): ").strip()
+        editorial = input(f"Editorial actual ({libro['editorial']}): ").strip()
+        categoria = input(f"Categoría actual ({libro['categoria']}): ").strip()
+        stock = enteroPositivoOpcional((f"Stock actual ({libro['stock']}): "))
+        costo=enteroPositivoOpcional(f"Costo actual ({libro['costo']}): ")
+        activo = validarEstado(libro['activo'])
+
+        autor1 = input(f"Autor 1 actual ({libro['autores']['autor1']}): ").strip()
+        autor2 = input(f"Autor 2 actual ({libro['autores']['autor2']}): ").strip()
+        autor3 = input(f"Autor 3 actual ({libro['autores']['autor3']}): ").strip()
+
+        resultado = modificacionLibro(idLibro, nombre, editorial, categoria, stock, costo, activo, autor1, autor2, autor3)
+        if not resultado["ok"]:
+            print(f"\n{resultado['mensaje']}")
+            return
+        print("\nLibro modificado exitosamente.")
+        return
+    except(FileNotFoundError,OSError,json.JSONDecodeError,sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+
+def eliminarLibro():
+    
+    """
+    Función para Eliminar libros del sistema.
+
+    SALIDA:
+        Mensaje informativo de que el libro fue eliminado correctamente.
+        Además, se actualiza el valor del campo "activo" a False en el archivo "Libros"
+        en el registro con el idLibro ingresado por teclado.
+    """
+    try:
+        idLibro = input("Ingrese el ID del libro que desea desactivar: ").strip()
+
+        resultado = bajaLibro(idLibro)
+        if resultado["ok"]:
+            # Mostrar mensaje después de guardar
+            print(f"Libro '{resultado['libro']['nombre']}' con ID {idLibro} fue desactivado correctamente.")
+        else:
+            print(resultado["mensaje"])
+        return
+
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+
+def librosActivos():
+    """
+    Funcion para mostrar libros activos
+    
+    PARÁMETROS:
+    SALIDA:
+            Listado de libros que cumplen con la condicion campo "Activo" sea True.
+    """
+    try:
+        if not mostrarPaginado(textoLibro(datos, conCosto=True) for datos in fichasLibros(idsLibrosActivos())):
+            print("No hay libros activos para listar.")
+        return
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+def buscarLibrosPorAutor(): #Funcion para buscar libros en base a su autor
+    
+    '''
+    Solicita un autor a buscar y luego imprime por pantalla un listado de los libros que coinciden con el autor solicitado
+    
+    PARAMETROS:
+    SALIDA:
+    imprime un listado con los libros cuya categoria coincide con el autor buscado dentro del archivo Libros, en caso de no haber encontrado ninguno informa que no hay libros con ese autor
+    '''
+    try:
+        autorBuscado = input("Ingrese el nombre del autor a buscar: ").strip().lower()
+
+        # El índice de autores devuelve los libros ordenados por coincidencia, cada uno una sola vez
+        if not mostrarPaginado(textoLibro(datos) for datos in fichasLibros(librosPorAutor(autorBuscado))):
+            print(f"No se encontraron libros para el autor '{autorBuscado}'.")
+        return
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+
+def buscarLibrosPorCategoria():      #Funcion para buscar libros en base a su categoria
+    '''
+    Solicita una categoria a buscar y luego imprime por pantalla un listado de los libros que coinciden con la categoria solicitada
+    
+    PARÁMETROS:
+            No recibe, busca el archivo Libros y lo convierte en diccionario
+    SALIDA:
+    imprime un listado con los libros cuya categoria coincide con la categoria buscada, en caso de no haber encontrado ninguno informa que no hay libros con esa categoria
+    '''
+    try:
+        # Categorías disponibles con la cantidad de libros activos de cada una
+        conteo = consultaCategorias()["categorias"]
+        if conteo:
+            print("Categorías disponibles: " + ", ".join(f"{nombre} ({cantidad})" for nombre, cantidad in conteo.items()))
+
+        categoria = input("Ingrese la categoría a buscar: ").strip().lower()
+
+        if not mostrarPaginado(textoLibro(datos) for datos in fichasLibros(librosActivosPorCategoria(categoria))):
+            print(f"\nNo se encontraron libros en la categoría '{categoria}'.")
+        return
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+def buscarLibrosEnCatalogo():      #Funcion para buscar libros por cualquier dato del libro
+    '''
+    Solicita un texto y muestra los libros activos cuyo nombre, editorial, categoría o autores coinciden, del más al menos relevante
+    
+    PARAMETROS:
+    SALIDA:
+    imprime un listado con los libros encontrados, en caso de no haber encontrado ninguno lo informa
+    '''
+    try:
+        textoBuscado = input("Ingrese el texto a buscar (nombre, autor, editorial o categoría): ").strip()
+
+        if not mostrarPaginado(textoLibro(datos) for datos in consultaCatalogo(textoBuscado)["libros"]):
+            print(f"\nNo se encontraron libros para '{textoBuscado}'.")
+        return
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+#FUNCIONES PARA GESTIONAR PRESTAMOS
+       
+
+def sumarDias(fecha, dias): #Funcion auxiliar para calcular los dias para devolver un prestamo
+    return fecha + timedelta(days=dias)
+
+# Último ID de préstamo generado por esta terminal: (fecha, número de sufijo)
+_ultimoIdPrestamo = (None, 0)
+
+def nuevoIdPrestamo(fechaPrestamo, usados=()): #Funcion auxiliar para generar el ID de un prestamo nuevo
+    '''
+    Genera el ID de un préstamo nuevo: la fecha "AAAA.MM.DD hh.mm.ss" y, si en ese segundo ya hay un préstamo,
+    un sufijo ".001", ".002", etc. Los IDs siguen ordenados por fecha y los anteriores (sin sufijo) no cambian.
+    Si otra terminal toma el mismo ID al mismo tiempo, la transacción del préstamo falla y se genera el siguiente.
+
+    PARAMETROS:
+    fechaPrestamo: datetime del préstamo.
+    usados: IDs ya entregados que todavía no están guardados (por ejemplo, los de un mismo grupo de la importación).
+
+    SALIDA:
+    Devuelve el ID del préstamo.
+    '''
+    global _ultimoIdPrestamo
+    fecha = fechaPrestamo.strftime("%Y.%m.%d %H.%M.%S")
+    # Se sigue después del último sufijo entregado en ese segundo en lugar de probar todos desde el principio
+    # (ese ID puede no estar guardado todavía, por ejemplo dentro de un lote)
+    numero = _ultimoIdPrestamo[1] + 1 if _ultimoIdPrestamo[0] == fecha else 0
+    idPrestamo = f"{fecha}.{numero:03d}" if numero else fecha
+    while idPrestamo in usados or obtenerRegistro("Prestamos.json", idPrestamo) is not None:
+        numero += 1
+        idPrestamo = f"{fecha}.{numero:03d}"
+    _ultimoIdPrestamo = (fecha, numero)
+    return idPrestamo
+
+
+
+def registrarPrestamo(): #Funcion para registrar un nuevo prestamo
+    '''
+    Permite registrar un nuevo prestamo, solicitando el idAlumno, idLibro y tipo de prestamo para calcular la fecha de devolucion y el costo del prestamo en base a
+    la cantidad de dias del prestamo y el costo de la garantia del libro
+    
+    PARAMETROS:
+    SALIDA:
+    Carga un registro de prestamo nuevo en el archivo de Prestamos, en caso de ingresar un ID erroneo o tipo de prestamo erroneo devuelve un mensaje informando el error
+    '''
+    
+    try:
+        print("\n--- Registro de nuevo préstamo ---")
+
+        # Cada dato se verifica apenas se ingresa, para no pedir los siguientes si ya hay un error
+        idAlumno = input("ID del alumno (ej: 1001): ").strip()
+        error = verificarDatosPrestamo(idAlumno)
+        if error:
+            print(error["mensaje"])
+            return
+
+        idLibro = input("ID del libro (ej: L001): ").strip()
+        error = verificarDatosPrestamo(idAlumno, idLibro)
+        if error:
+            print(error["mensaje"])
+            return
+
+        tipoPrestamo = input("Tipo de préstamo (1 para semanal, 2 para 15 días y 3 para 30 días): ").strip()
+        resultado = altaPrestamo(idAlumno, idLibro, tipoPrestamo)
+        if not resultado["ok"]:
+            print(resultado["mensaje"])
+            return
+
+        print(f"✅ Préstamo registrado correctamente con ID: {resultado['idPrestamo']}")
+        print(resultado["prestamo"])
+        return
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+
+
+
+def devolverPrestamo():
+    '''
+    Solicita el id del prestamo a devolver y cambia su status de Devuelto=False a Devuelto=True
+    
+    PARAMETROS:
+    SALIDA:
+    Cambia el valor del atributo Devuelto a True, para identificar que un prestamo fue devuelto, en caso de no encontrar el prestamo informa que no fue encontrado ese ID
+    '''
+    try:
+        print("----- REGISTRAR DEVOLUCIÓN -----")
+        idPrestamo = input("Ingrese el ID del préstamo (formato AAAA.MM.DD hh.mm.ss, con el sufijo .NNN si lo tiene): ").strip()
+
+        resultado = devolucionPrestamo(idPrestamo)
+        if resultado["ok"]:
+            print("La devolución fue registrada correctamente.")
+        else:
+            print(resultado["mensaje"])
+        return
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+#FUNCIONES DE IMPORTACION MASIVA
+
+# La importación lee el archivo de a una fila, junta FILAS_POR_CAMBIO registros en cada línea del diario
+# (o transacción) y confirma un lote cada FILAS_POR_LOTE filas, con un solo fsync
+FILAS_POR_CAMBIO = 1000
+FILAS_POR_LOTE = 50000
+MAXIMO_ERRORES_MOSTRADOS = 20
+TIPOS_IMPORTACION = {"alumnos": "Alumnos.json", "libros": "Libros.json", "prestamos": "Prestamos.json"}
+
+def leerFilasImportacion(nombreArchivo):
+    '''
+    Recorre las filas de un archivo CSV (con encabezado) o JSONL (un objeto JSON por línea) sin cargarlo completo.
+    En JSONL los datos agrupados ("telefonos", "autores") se aplanan como en el CSV.
+
+    PARAMETROS:
+    nombreArchivo: archivo .csv o .jsonl.
+
+    SALIDA:
+    Genera tuplas (número de línea, diccionario con la fila), o (número de línea, None) si la línea no es un JSON válido.
+    '''
+    Archivo = open(nombreArchivo, mode="r", encoding="utf-8-sig", newline="")
+    try:
+        if nombreArchivo.lower().endswith(".csv"):
+            lector = csv.DictReader(Archivo)
+            for fila in lector:
+                yield lector.line_num, fila
+            return
+        for numeroLinea, linea in enumerate(Archivo, start=1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+            except json.JSONDecodeError:
+                yield numeroLinea, None
+                continue
+            if isinstance(fila, dict):
+                for grupo in ("telefonos", "autores"):
+                    if isinstance(fila.get(grupo), dict):
+                        fila.update(fila.pop(grupo))
+            yield numeroLinea, fila
+    finally:
+        Archivo.close()
+
+def textoFila(fila, campo):
+    '''
+    Devuelve un campo de la fila como texto sin espacios en los extremos ("" si falta).
+
+    PARAMETROS:
+    fila: diccionario con la fila.
+    campo: nombre del campo.
+
+    SALIDA:
+    Devuelve el texto.
+    '''
+    valor = fila.get(campo)
+    return "" if valor is None else str(valor).strip()
+
+def enteroFila(fila, campo):
+    '''
+    Devuelve un campo de la fila como entero mayor o igual a 0, con las mismas reglas que enteroPositivo.
+
+    PARAMETROS:
+    fila: diccionario con la fila.
+    campo: nombre del campo.
+
+    SALIDA:
+    Devuelve el entero, o None si no es válido.
+    '''
+    try:
+        valor = int(textoFila(fila, campo))
+    except ValueError:
+        return None
+    return valor if valor >= 0 else None
+
+def alumnoImportado(fila):
+    '''
+    Valida una fila de alumnos con las mismas reglas que el ingreso por teclado y arma el registro (sin ID).
+
+    PARAMETROS:
+    fila: diccionario con nombre, apellido, direccion, email, carrera, telefono1, telefono2 y telefono3.
+
+    SALIDA:
+    Devuelve una tupla (registro, None) o (None, mensaje de error).
+    '''
+    alumno = {
+        "IdAlumno": None,
+        "activo": True,
+        "nombre": textoFila(fila, "nombre"),
+        "apellido": textoFila(fila, "apellido"),
+        "direccion": textoFila(fila, "direccion"),
+        "email": textoFila(fila, "email"),
+        "carrera": textoFila(fila, "carrera"),
+        "telefonos": {campo: textoFila(fila, campo) for campo in ("telefono1", "telefono2", "telefono3")}
+    }
+    errores = erroresAlumno(alumno)
+    if errores:
+        campo, regla, valor = errores[0]
+        return None, f"{campo} inválido ('{valor}'): {REGLAS_ALUMNO[regla]}"
+    return alumno, None
+
+def libroImportado(fila):
+    '''
+    Valida una fila de libros con las mismas reglas que el ingreso por teclado y arma el registro.
+
+    PARAMETROS:
+    fila: diccionario con nombre, editorial, categoria, stock, costo, autor1, autor2 y autor3.
+
+    SALIDA:
+    Devuelve una tupla (registro, None) o (None, mensaje de error).
+    '''
+    stock = enteroFila(fila, "stock")
+    costo = enteroFila(fila, "costo")
+    if stock is None:
+        return None, f"Stock inválido: '{textoFila(fila, 'stock')}'"
+    if costo is None:
+        return None, f"Costo inválido: '{textoFila(fila, 'costo')}'"
+    libro = {
+        "activo": stock > 0,
+        "stock": stock,
+        "nombre": textoFila(fila, "nombre"),
+        "editorial": textoFila(fila, "editorial"),
+        "categoria": textoFila(fila, "categoria"),
+        "autores": {
+            "autor1": textoFila(fila, "autor1"),
+            "autor2": textoFila(fila, "autor2"),
+            "autor3": textoFila(fila, "autor3")
+        },
+        "costo": costo
+    }
+    return libro, None
+
+def prestamoImportado(fila):
+    '''
+    Valida el formato de una fila de préstamos. El alumno, el libro y el stock se verifican al confirmar,
+    sobre el estado actual.
+
+    PARAMETROS:
+    fila: diccionario con IdAlumno, IdLibro, tipoPrestamo y opcionalmente fechaPrestamo ("AAAA.MM.DD hh.mm.ss",
+          por defecto la fecha actual) y Devuelto ("true"/"false" o 1/0).
+
+    SALIDA:
+    Devuelve una tupla (datos del préstamo, None) o (None, mensaje de error).
+    '''
+    tipoPrestamo = textoFila(fila, "tipoPrestamo")
+    if tipoPrestamo not in ["1", "2", "3"]:
+        return None, f"Tipo de préstamo inválido: '{tipoPrestamo}'"
+    fechaTexto = textoFila(fila, "fechaPrestamo")
+    try:
+        fechaPrestamo = datetime.strptime(fechaTexto, "%Y.%m.%d %H.%M.%S") if fechaTexto else datetime.now()
+    except ValueError:
+        return None, f"Fecha de préstamo inválida: '{fechaTexto}'"
+    devuelto = textoFila(fila, "Devuelto").lower()
+    if devuelto not in ["", "true", "false", "1", "0"]:
+        return None, f"Valor de Devuelto inválido: '{devuelto}'"
+    datos = {
+        "IdAlumno": textoFila(fila, "IdAlumno"),
+        "IdLibro": textoFila(fila, "IdLibro"),
+        "tipoPrestamo": int(tipoPrestamo),
+        "fechaPrestamo": fechaPrestamo,
+        "Devuelto": devuelto in ["true", "1"]
+    }
+    return datos, None
+
+VALIDACIONES_IMPORTACION = {"alumnos": alumnoImportado, "libros": libroImportado, "prestamos": prestamoImportado}
+
+def validarBloqueImportacion(tipo, bloque):
+    '''
+    Valida un bloque de filas leídas del archivo a importar. Puede ejecutarse en otro proceso.
+
+    PARAMETROS:
+    tipo: "alumnos", "libros" o "prestamos".
+    bloque: lista de tuplas (número de línea, fila) como las de leerFilasImportacion.
+
+    SALIDA:
+    Devuelve la lista de tuplas (número de línea, registro validado o None, mensaje de error o None).
+    '''
+    validar = VALIDACIONES_IMPORTACION[tipo]
+    resultado = []
+    for numeroLinea, fila in bloque:
+        registro, error = (None, "La línea no es un objeto JSON válido") if not isinstance(fila, dict) else validar(fila)
+        resultado.append((numeroLinea, registro, error))
+    return resultado
+
+def cambiosImportacion(tipo, filas):
+    '''
+    Arma los cambios de un grupo de filas ya validadas: reserva de una vez los IDs de alumnos o libros y,
+    en los préstamos, verifica alumno, libro y stock y descuenta el stock de los no devueltos.
+
+    PARAMETROS:
+    tipo: "alumnos", "libros" o "prestamos".
+    filas: lista de tuplas (número de línea, registro validado).
+
+    SALIDA:
+    Devuelve una tupla (cambios, anteriores, rechazados) con los cambios para confirmarCambios
+    y la lista de (número de línea, mensaje) de los préstamos rechazados.
+    '''
+    nombreArchivo = TIPOS_IMPORTACION[tipo]
+    cambios = []
+    anteriores = {}
+    rechazados = []
+    if tipo != "prestamos":
+        for (numeroLinea, registro), nuevoId in zip(filas, reservarIds(nombreArchivo, len(filas))):
+            if tipo == "alumnos":
+                registro = dict(registro, IdAlumno=nuevoId)
+            cambios.append((nombreArchivo, nuevoId, registro))
+            anteriores[(nombreArchivo, nuevoId)] = None
+        return cambios, anteriores, rechazados
+
+    libros = {} # Libros ya modificados en este grupo, con el stock descontado
+    idsPrestamos = set() # IDs entregados en este grupo: dos filas con la misma fecha no deben pisarse
+    for numeroLinea, datos in filas:
+        alumno = obtenerRegistro("Alumnos.json", datos["IdAlumno"])
+        if alumno is None or not alumno["activo"]:
+            rechazados.append((numeroLinea, f"Alumno no válido o inactivo: '{datos['IdAlumno']}'"))
+            continue
+        idLibro = datos["IdLibro"]
+        if idLibro not in libros:
+            libro = obtenerRegistro("Libros.json", idLibro)
+            if libro is not None:
+                anteriores[("Libros.json", idLibro)] = libro
+                libros[idLibro] = copy.deepcopy(libro)
+        libro = libros.get(idLibro)
+        if libro is None or not libro["activo"] or (not datos["Devuelto"] and libro["stock"] <= 0):
+            rechazados.append((numeroLinea, f"Libro no válido, inactivo o sin stock: '{idLibro}'"))
+            continue
+        diasADevolver = DIAS_POR_TIPO_PRESTAMO[datos["tipoPrestamo"]]
+        idPrestamo = nuevoIdPrestamo(datos["fechaPrestamo"], idsPrestamos)
+        idsPrestamos.add(idPrestamo)
+        prestamo = {
+            "IdAlumno": datos["IdAlumno"],
+            "IdLibro": idLibro,
+            "tipoPrestamo": datos["tipoPrestamo"],
+            "costoPrestamo": libro.get("costo", 0) * diasADevolver,
+            "fechaDevolucion": sumarDias(datos["fechaPrestamo"], diasADevolver).strftime("%Y.%m.%d %H.%M.%S"),
+            "Devuelto": datos["Devuelto"]
+        }
+        if not datos["Devuelto"]:
+            libro["stock"] -= 1
+        cambios.append(("Prestamos.json", idPrestamo, prestamo))
+        anteriores[("Prestamos.json", idPrestamo)] = None
+    for idLibro, libro in libros.items():
+        if libro != anteriores[("Libros.json", idLibro)]:
+            cambios.append(("Libros.json", idLibro, libro))
+    return cambios, anteriores, rechazados
+
+def importarRegistros(tipo, nombreArchivo, procesos=1):
+    '''
+    Importa alumnos, libros o préstamos desde un archivo CSV o JSONL sin pasar por el menú. Cada fila se valida
+    con las mismas reglas que el ingreso por teclado; las filas inválidas se informan y se saltean.
+    Los registros se confirman por grupos dentro de lotes, así cada lote cuesta una sola escritura en disco.
+
+    PARAMETROS:
+    tipo: "alumnos", "libros" o "prestamos".
+    nombreArchivo: archivo .csv o .jsonl a importar.
+    procesos: cantidad de procesos que validan las filas en paralelo (1 para validarlas en este proceso).
+
+    SALIDA:
+    Muestra la cantidad de registros importados y los errores encontrados. Si falla a mitad de la importación, lanza
+    RuntimeError indicando cuántos registros ya habían quedado guardados y desde qué línea no se importó nada.
+    '''
+    if tipo not in TIPOS_IMPORTACION:
+        print(f"Tipo de importación inválido: '{tipo}'. Debe ser alumnos, libros o prestamos.")
+        return
+    importados = 0
+    confirmados = 0 # Registros de los lotes ya confirmados, que quedan guardados aunque falle un lote posterior
+    primeraLineaLote = None # Primera línea leída del lote abierto
+    errores = []
+    filas = []
+    filasEnLote = 0
+
+    def confirmarGrupo():
+        rechazados = []
+        def calcularCambios():
+            cambios, anteriores, rechazadosGrupo = cambiosImportacion(tipo, filas)
+            rechazados[:] = rechazadosGrupo
+            return cambios, anteriores
+        cambios = ejecutarTransaccion(calcularCambios)
+        if cambios is False:
+            raise RuntimeError("No se pudo importar porque otras terminales estaban modificando los mismos datos.")
+        errores.extend(rechazados)
+        importadosGrupo = len({clave for archivo, clave, registro in cambios if archivo == TIPOS_IMPORTACION[tipo]})
+        if importadosGrupo != len(filas) - len(rechazados):
+            # Nunca debería pasar: significaría que dos filas quedaron con la misma clave y una pisó a la otra
+            raise RuntimeError(f"Se armaron {importadosGrupo} registros para {len(filas) - len(rechazados)} filas aceptadas; no se importó el lote.")
+        return importadosGrupo
+
+    bloques = dividirEnBloques(leerFilasImportacion(nombreArchivo), FILAS_POR_CAMBIO)
+    validados = (fila for bloque in procesarEnParalelo(validarBloqueImportacion, tipo, bloques, procesos) for fila in bloque)
+    iniciarLote()
+    try:
+        for numeroLinea, registro, error in validados:
+            if primeraLineaLote is None:
+                primeraLineaLote = numeroLinea
+            if error:
+                errores.append((numeroLinea, error))
+                continue
+            filas.append((numeroLinea, registro))
+            if len(filas) == FILAS_POR_CAMBIO:
+                importados += confirmarGrupo()
+                filasEnLote += len(filas)
+                filas = []
+                if filasEnLote >= FILAS_POR_LOTE:
+                    confirmarLote(compactar=False)
+                    confirmados = importados
+                    primeraLineaLote = None
+                    iniciarLote()
+                    filasEnLote = 0
+        if filas:
+            importados += confirmarGrupo()
+        confirmarLote(compactar=False)
+    except BaseException as detalle:
+        if _lote is not None:
+            descartarLote()
+        if not isinstance(detalle, Exception) or (confirmados == 0 and primeraLineaLote is None):
+            raise
+        pendientes = f"desde la línea {primeraLineaLote}" if primeraLineaLote is not None else "de las líneas siguientes"
+        raise RuntimeError(f"{detalle}. Quedaron importados {confirmados} {tipo} de los lotes ya confirmados; "
+                           f"{pendientes} no se importó nada.") from detalle
+    if ALMACENAMIENTO == "json":
+        compactarSiCorresponde()
+
+    print(f"{importados} {tipo} importados desde {nombreArchivo}.")
+    if errores:
+        print(f"{len(errores)} filas rechazadas:")
+        for numeroLinea, error in errores[:MAXIMO_ERRORES_MOSTRADOS]:
+            print(f"  Línea {numeroLinea}: {error}")
+        if len(errores) > MAXIMO_ERRORES_MOSTRADOS:
+            print(f"  ... y {len(errores) - MAXIMO_ERRORES_MOSTRADOS} más.")
+
+
+#VALIDACION MASIVA EN PARALELO
+
+FILAS_POR_BLOQUE_VALIDACION = 5000
+BLOQUES_EN_CURSO_POR_PROCESO = 2 # Bloques enviados a cada proceso sin esperar resultados, para no cargar todo en memoria
+
+def dividirEnBloques(elementos, tamaño):
+    '''
+    Agrupa los elementos de un iterable en listas de a lo sumo tamaño elementos, sin recorrerlo completo de antemano.
+
+    PARAMETROS:
+    elementos: iterable.
+    tamaño: cantidad de elementos por bloque.
+
+    SALIDA:
+    Genera las listas.
+    '''
+    elementos = iter(elementos)
+    while True:
+        bloque = list(itertools.islice(elementos, tamaño))
+        if not bloque:
+            return
+        yield bloque
+
+def procesarEnParalelo(funcion, argumento, bloques, procesos):
+    '''
+    Aplica funcion(argumento, bloque) a cada bloque repartiendo los bloques entre varios procesos, y devuelve
+    los resultados en el mismo orden. Solo se leen por adelantado unos pocos bloques por proceso.
+
+    PARAMETROS:
+    funcion: función definida en este módulo (tiene que poder enviarse a otro proceso).
+    argumento: primer argumento de la función.
+    bloques: iterable de bloques.
+    procesos: cantidad de procesos; con 1 se ejecuta todo en este proceso.
+
+    SALIDA:
+    Genera el resultado de cada bloque.
+    '''
+    if procesos <= 1:
+        for bloque in bloques:
+            yield funcion(argumento, bloque)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        enCurso = []
+        for bloque in bloques:
+            enCurso.append(ejecutor.submit(funcion, argumento, bloque))
+            if len(enCurso) >= procesos * BLOQUES_EN_CURSO_POR_PROCESO:
+                yield enCurso.pop(0).result()
+        for futuro in enCurso:
+            yield futuro.result()
+
+def erroresBloqueAlumnos(campos, bloque):
+    '''
+    Verifica un bloque de alumnos. Se ejecuta en los procesos de validarAlumnos.
+
+    PARAMETROS:
+    campos: campos a verificar (None para todos).
+    bloque: lista de tuplas (IdAlumno, registro).
+
+    SALIDA:
+    Devuelve la lista de errores {"IdAlumno", "campo", "regla", "valor"}.
+    '''
+    informe = []
+    for idAlumno, alumno in bloque:
+        for campo, regla, valor in erroresAlumno(alumno):
+            if campos is None or campo.split(".")[0] in campos:
+                informe.append({"IdAlumno": idAlumno, "campo": campo, "regla": regla, "valor": valor})
+    return informe
+
+def validarAlumnos(alumnos=None, procesos=None, campos=None):
+    '''
+    Verifica muchos alumnos repartiendo el trabajo entre varios procesos (por ejemplo, un control de calidad
+    de toda la tabla de Alumnos).
+
+    PARAMETROS:
+    alumnos: iterable de tuplas (IdAlumno, registro); por defecto, todos los alumnos guardados.
+    procesos: cantidad de procesos; por defecto, uno por núcleo.
+    campos: campos a verificar ("nombre", "apellido", "email", "telefonos"); por defecto, todos.
+
+    SALIDA:
+    Devuelve la lista de errores {"IdAlumno", "campo", "regla", "valor"}, en el orden de los alumnos.
+    '''
+    if alumnos is None:
+        alumnos = recorrerRegistros("Alumnos.json")
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    informe = []
+    for errores in procesarEnParalelo(erroresBloqueAlumnos, campos, dividirEnBloques(alumnos, FILAS_POR_BLOQUE_VALIDACION), procesos):
+        informe.extend(errores)
+    return informe
+
+def mostrarValidacionAlumnos(procesos=None):
+    '''
+    Verifica todos los alumnos guardados y muestra un resumen de los errores encontrados.
+
+    PARAMETROS:
+    procesos: cantidad de procesos; por defecto, uno por núcleo.
+
+    SALIDA:
+    Muestra la cantidad de errores por campo y regla, y los primeros errores.
+    '''
+    informe = validarAlumnos(procesos=procesos)
+    if not informe:
+        print("Todos los alumnos cumplen las reglas de validación.")
+        return
+    conteo = {}
+    for error in informe:
+        conteo[(error["campo"], error["regla"])] = conteo.get((error["campo"], error["regla"]), 0) + 1
+    print(f"{len(informe)} errores en {len({error['IdAlumno'] for error in informe})} alumnos:")
+    for (campo, regla), cantidad in sorted(conteo.items()):
+        print(f"  {campo:<22} {REGLAS_ALUMNO[regla]:<62} {cantidad:>8}")
+    for error in informe[:MAXIMO_ERRORES_MOSTRADOS]:
+        print(f"  Alumno {error['IdAlumno']}: {error['campo']} = '{error['valor']}' ({REGLAS_ALUMNO[error['regla']]})")
+    if len(informe) > MAXIMO_ERRORES_MOSTRADOS:
+        print(f"  ... y {len(informe) - MAXIMO_ERRORES_MOSTRADOS} más.")
+
+
+#SERVIDOR HTTP
+
+# Con --servidor el programa atiende pedidos HTTP con cuerpo JSON en lugar de abrir el menú, así las terminales y el
+# portal web comparten una sola copia en memoria de los datos. Todo corre en un único bucle de asyncio:
+# - las consultas se resuelven en el bucle, entre una escritura y la siguiente, sin esperar a las demás conexiones;
+# - las modificaciones se encolan y un único escritor las ejecuta en un hilo aparte, todas las que se juntaron
+#   en un mismo lote (una sola escritura y un solo fsync del diario). Mientras el lote se aplica las consultas
+#   nuevas esperan, así nunca ven un cambio a medio confirmar, pero el bucle sigue atendiendo las conexiones.
+# Mientras el servidor está activo, las modificaciones deben hacerse a través de él.
+SERVIDOR_DIRECCION = os.environ.get("BIBLIOTECA_SERVIDOR_DIRECCION", "127.0.0.1")
+SERVIDOR_PUERTO = int(os.environ.get("BIBLIOTECA_SERVIDOR_PUERTO", "8080"))
+MAXIMO_CUERPO_SERVIDOR = 1024 * 1024
+MAXIMO_ESCRITURAS_POR_LOTE = 500
+ESTADOS_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+# Estado HTTP de cada código de error de los servicios
+ESTADOS_ERRORES = {"noEncontrado": 404, "datosInvalidos": 400, "inactivo": 409, "sinStock": 409, "yaRealizado": 409, "conflicto": 409}
+
+# Cola de modificaciones pendientes y evento que está activo mientras no se está aplicando ningún lote
+_colaEscrituras = None
+_sinEscrituras = None
+# Las consultas corren en un hilo lector aparte, para que una consulta lenta no detenga el bucle. Es uno solo:
+# las consultas también actualizan los datos compartidos en memoria (cambios del diario, índices), y con el GIL
+# varios hilos no harían más rápidas las consultas. El escritor espera a que terminen las consultas en curso.
+_hiloLector = None
+_lecturasEnCurso = 0
+_sinLecturas = None
+
+def paginaConsulta(consulta):
+    '''
+    Lee la página pedida en los parámetros de la URL: desde (por defecto 0) y cantidad (por defecto, todos).
+
+    PARAMETROS:
+    consulta: diccionario con los parámetros de la URL.
+
+    SALIDA:
+    Devuelve un diccionario {"desde", "cantidad"} para pasar a las consultas paginadas.
+    '''
+    cantidad = int(consulta["cantidad"]) if "cantidad" in consulta else None
+    return {"desde": int(consulta.get("desde", 0)), "cantidad": cantidad}
+
+def consultaLibrosServidor(consulta):
+    '''
+    Resuelve GET /libros según los parámetros de la consulta: autor, categoria o texto (con cantidad opcional).
+    Sin parámetros devuelve los libros activos. Salvo la búsqueda por texto, se aceptan desde y cantidad.
+
+    PARAMETROS:
+    consulta: diccionario con los parámetros de la URL.
+
+    SALIDA:
+    Devuelve el resultado del servicio correspondiente.
+    '''
+    if "texto" in consulta:
+        return consultaCatalogo(consulta["texto"], int(consulta.get("cantidad", 20)))
+    if "autor" in consulta:
+        return consultaLibrosPorAutor(consulta["autor"].lower(), **paginaConsulta(consulta))
+    if "categoria" in consulta:
+        return consultaLibrosPorCategoria(consulta["categoria"].lower(), **paginaConsulta(consulta))
+    return consultaLibrosActivos(**paginaConsulta(consulta))
+
+# Rutas del servidor: (método, ruta, es una modificación, función (parámetros de la ruta, consulta, cuerpo)).
+# Los segmentos "{id}" de la ruta aceptan cualquier valor y se pasan en orden en los parámetros de la ruta.
+# Los listados aceptan ?desde=N&cantidad=M y devuelven en "siguiente" el desde de la página siguiente.
+RUTAS_SERVIDOR = [
+    ("GET", "/alumnos", False, lambda ruta, consulta, cuerpo: consultaAlumnos(consulta.get("activos") != "no", **paginaConsulta(consulta))),
+    ("POST", "/alumnos", True, lambda ruta, consulta, cuerpo: altaAlumno(**cuerpo)),
+    ("PUT", "/alumnos/{id}", True, lambda ruta, consulta, cuerpo: modificacionAlumno(ruta[0], **cuerpo)),
+    ("DELETE", "/alumnos/{id}", True, lambda ruta, consulta, cuerpo: bajaAlumno(ruta[0])),
+    ("GET", "/libros", False, lambda ruta, consulta, cuerpo: consultaLibrosServidor(consulta)),
+    ("GET", "/libros/categorias", False, lambda ruta, consulta, cuerpo: consultaCategorias()),
+    ("POST", "/libros", True, lambda ruta, consulta, cuerpo: altaLibro(**cuerpo)),
+    ("PUT", "/libros/{id}", True, lambda ruta, consulta, cuerpo: modificacionLibro(ruta[0], **cuerpo)),
+    ("DELETE", "/libros/{id}", True, lambda ruta, consulta, cuerpo: bajaLibro(ruta[0])),
+    ("POST", "/prestamos", True, lambda ruta, consulta, cuerpo: altaPrestamo(**cuerpo)),
+    ("POST", "/prestamos/{id}/devolucion", True, lambda ruta, consulta, cuerpo: devolucionPrestamo(ruta[0])),
+    ("GET", "/informes/prestamos-del-mes", False, lambda ruta, consulta, cuerpo: consultaPrestamosDelMes(**paginaConsulta(consulta))),
+    ("GET", "/informes/resumen-anual", False, lambda ruta, consulta, cuerpo: consultaResumenAnual(consulta.get("año", str(datetime.now().year)))),
+    ("GET", "/informes/atrasados", False, lambda ruta, consulta, cuerpo: consultaPrestamosAtrasados(**paginaConsulta(consulta))),
+    ("GET", "/informes/indicadores", False, lambda ruta, consulta, cuerpo: consultaIndicadores()),
+    ("GET", "/metricas", False, lambda ruta, consulta, cuerpo: consultaMetricas()),
+    ("GET", "/perfiles", False, lambda ruta, consulta, cuerpo: consultaPerfiles()),
+    ("PUT", "/perfiles", False, lambda ruta, consulta, cuerpo: cambioPerfiles(**cuerpo))
+]
+
+# Datos que acepta el cuerpo de cada ruta y sus tipos JSON. Se verifican antes de encolar el pedido: en el escritor,
+# un dato inesperado que falle a mitad de un cambio obliga a descartar el lote entero.
+TEXTOS_ALUMNO_SERVIDOR = {campo: (str,) for campo in ("nombre", "apellido", "direccion", "email", "carrera", "telefono1", "telefono2", "telefono3")}
+TEXTOS_LIBRO_SERVIDOR = {campo: (str,) for campo in ("nombre", "editorial", "categoria", "autor1", "autor2", "autor3")}
+CUERPOS_SERVIDOR = {
+    ("POST", "/alumnos"): TEXTOS_ALUMNO_SERVIDOR,
+    ("PUT", "/alumnos/{id}"): TEXTOS_ALUMNO_SERVIDOR,
+    ("POST", "/libros"): dict(TEXTOS_LIBRO_SERVIDOR, stock=(int,), costo=(int,)),
+    ("PUT", "/libros/{id}"): dict(TEXTOS_LIBRO_SERVIDOR, stock=(int, type(None)), costo=(int, type(None)), activo=(bool, type(None))),
+    ("POST", "/prestamos"): {"idAlumno": (str,), "idLibro": (str,), "tipoPrestamo": (int, str)},
+    ("PUT", "/perfiles"): {"activos": (bool,), "operaciones": (list, type(None))}
+}
+
+def buscarRutaServidor(metodo, segmentos):
+    '''
+    Busca la ruta que corresponde a un pedido.
+
+    PARAMETROS:
+    metodo: método HTTP del pedido.
+    segmentos: lista con los segmentos de la ruta pedida, ya decodificados.
+
+    SALIDA:
+    Devuelve la tupla (es una modificación, función, parámetros de la ruta, ruta), o None si no hay ninguna ruta.
+    '''
+    for metodoRuta, ruta, escritura, funcion in RUTAS_SERVIDOR:
+        segmentosRuta = ruta.strip("/").split("/")
+        if metodoRuta != metodo or len(segmentosRuta) != len(segmentos):
+            continue
+        parametros = []
+        for esperado, segmento in zip(segmentosRuta, segmentos):
+            if esperado == "{id}":
+                parametros.append(segmento)
+            elif esperado != segmento:
+                break
+        else:
+            return escritura, funcion, parametros, ruta
+    return None
+
+def erroresCuerpoServidor(metodo, ruta, cuerpo):
+    '''
+    Verifica que el cuerpo de un pedido solo tenga los datos que acepta su ruta, cada uno con su tipo.
+
+    PARAMETROS:
+    metodo: método HTTP del pedido.
+    ruta: ruta encontrada por buscarRutaServidor (por ejemplo "/libros/{id}").
+    cuerpo: diccionario con el cuerpo del pedido.
+
+    SALIDA:
+    Devuelve None si el cuerpo es válido o un resultado de error "datosInvalidos".
+    '''
+    campos = CUERPOS_SERVIDOR.get((metodo, ruta), {})
+    for campo, valor in cuerpo.items():
+        if campo not in campos:
+            return resultadoError("datosInvalidos", f"Dato no permitido en {metodo} {ruta}: '{campo}'")
+        # True y False son int en Python, pero en JSON no son números
+        if not isinstance(valor, campos[campo]) or (isinstance(valor, bool) and bool not in campos[campo]):
+            tipos = " o ".join(sorted({str: "texto", int: "número", bool: "verdadero/falso", list: "lista", type(None): "null"}[tipo] for tipo in campos[campo]))
+            return resultadoError("datosInvalidos", f"{campo} inválido ('{valor}'): debe ser {tipos}")
+    return None
+
+def ejecutarEscriturasServidor(operaciones):
+    '''
+    Ejecuta un grupo de modificaciones dentro de un lote y lo confirma con una sola escritura del diario.
+    Corre en el hilo del escritor, mientras ninguna consulta usa los datos en memoria.
+
+    PARAMETROS:
+    operaciones: lista de funciones sin parámetros que llaman a un servicio.
+
+    SALIDA:
+    Devuelve una lista con una tupla (True, resultado) o (False, excepción) por operación, en el mismo orden.
+    Si falla la lectura o escritura de los archivos se descarta todo el lote y se propaga la excepción: en ese caso
+    nada quedó guardado, porque confirmarLote ya no lanza errores una vez que escribió el diario.
+    '''
+    global _lote
+    resultados = []
+    iniciarLote()
+    try:
+        for operacion in operaciones:
+            try:
+                resultados.append((True, operacion()))
+            except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error):
+                raise
+            except (TypeError, ValueError) as detalle: # Datos mal formados en ese pedido
+                resultados.append((False, detalle))
+    except BaseException:
+        descartarLote()
+        raise
+    pendiente = _lote
+    try:
+        confirmarLote()
+    except BaseException:
+        # No se pudo escribir el diario: se descartan también los cambios ya aplicados en memoria
+        _lote = pendiente
+        descartarLote()
+        raise
+    return resultados
+
+async def escritorServidor():
+    '''
+    Tarea que toma las modificaciones encoladas, todas las que haya en el momento (hasta MAXIMO_ESCRITURAS_POR_LOTE),
+    y las ejecuta juntas en un hilo aparte para no detener el bucle durante la escritura en disco. Antes de empezar
+    deja de dar paso a nuevas consultas y espera a que terminen las que están en curso.
+
+    PARAMETROS:
+    SALIDA:
+    Entrega el resultado (o la excepción) de cada modificación en su futuro.
+    '''
+    bucle = asyncio.get_running_loop()
+    hilo = ThreadPoolExecutor(max_workers=1)
+    while True:
+        pendientes = [await _colaEscrituras.get()]
+        while not _colaEscrituras.empty() and len(pendientes) < MAXIMO_ESCRITURAS_POR_LOTE:
+            pendientes.append(_colaEscrituras.get_nowait())
+        _sinEscrituras.clear()
+        while not _sinLecturas.is_set():
+            await _sinLecturas.wait()
+        try:
+            resultados = await bucle.run_in_executor(hilo, ejecutarEscriturasServidor, [operacion for operacion, futuro in pendientes])
+        except Exception as detalle:
+            if len(pendientes) == 1:
+                resultados = [(False, detalle)]
+            else:
+                # El lote se descartó entero sin guardar nada: cada modificación se reintenta en su propio lote,
+                # así la que falla no arrastra a las de los demás clientes
+                resultados = []
+                for operacion, futuro in pendientes:
+                    try:
+                        resultados.extend(await bucle.run_in_executor(hilo, ejecutarEscriturasServidor, [operacion]))
+                    except Exception as detalleOperacion:
+                        resultados.append((False, detalleOperacion))
+        finally:
+            _sinEscrituras.set()
+        for (operacion, futuro), (correcto, valor) in zip(pendientes, resultados):
+            if futuro.cancelled():
+                continue # La conexión se cerró mientras tanto
+            if correcto:
+                futuro.set_result(valor)
+            else:
+                futuro.set_exception(valor)
+        await asyncio.sleep(0) # Deja pasar a las consultas que esperaban antes del próximo lote
+
+async def ejecutarPedidoServidor(escritura, operacion):
+    '''
+    Ejecuta la operación de un pedido: las modificaciones se encolan para el escritor y las consultas
+    se resuelven en el hilo lector en cuanto no hay un lote aplicándose.
+
+    PARAMETROS:
+    escritura: True si la operación modifica datos.
+    operacion: función sin parámetros que llama al servicio.
+
+    SALIDA:
+    Devuelve el resultado del servicio.
+    '''
+    if escritura:
+        futuro = asyncio.get_running_loop().create_future()
+        await _colaEscrituras.put((operacion, futuro))
+        return await futuro
+    global _lecturasEnCurso
+    # Se vuelve a verificar al despertar: el escritor pudo empezar otro lote antes de que llegue el turno
+    while not _sinEscrituras.is_set():
+        await _sinEscrituras.wait()
+    _lecturasEnCurso += 1
+    _sinLecturas.clear()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hiloLector, operacion)
+    finally:
+        _lecturasEnCurso -= 1
+        if _lecturasEnCurso == 0:
+            _sinLecturas.set()
+
+async def resolverPedido(metodo, destino, cuerpo):
+    '''
+    Resuelve un pedido HTTP: busca la ruta, interpreta el cuerpo JSON y ejecuta el servicio.
+
+    PARAMETROS:
+    metodo: método HTTP.
+    destino: ruta con los parámetros de la consulta (por ejemplo "/libros?autor=borges").
+    cuerpo: bytes del cuerpo del pedido.
+
+    SALIDA:
+    Devuelve la tupla (estado HTTP, resultado).
+    '''
+    partes = urlsplit(destino)
+    segmentos = [unquote(segmento) for segmento in partes.path.strip("/").split("/")]
+    ruta = buscarRutaServidor(metodo, segmentos)
+    if ruta is None:
+        return 404, resultadoError("noEncontrado", f"No existe la ruta {metodo} {partes.path}.")
+    escritura, funcion, parametros, rutaEncontrada = ruta
+    consulta = dict(parse_qsl(partes.query))
+    try:
+        datos = json.loads(cuerpo) if cuerpo else {}
+        if not isinstance(datos, dict):
+            raise ValueError("el cuerpo debe ser un objeto JSON")
+    except ValueError as detalle:
+        return 400, resultadoError("datosInvalidos", f"Cuerpo del pedido inválido: {detalle}")
+    error = erroresCuerpoServidor(metodo, rutaEncontrada, datos)
+    if error:
+        return 400, error
+
+    try:
+        resultado = await ejecutarPedidoServidor(escritura, lambda: ejecutarOperacion(f"http {metodo} {rutaEncontrada}", funcion, parametros, consulta, datos))
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        return 500, resultadoError("almacenamiento", f"Error al intentar abrir archivo(s): {detalle}")
+    except (TypeError, ValueError) as detalle:
+        return 400, resultadoError("datosInvalidos", f"Datos del pedido inválidos: {detalle}")
+    except Exception as detalle: # Cualquier otro error igual recibe una respuesta
+        return 500, resultadoError("interno", f"Error interno al resolver el pedido: {type(detalle).__name__}: {detalle}")
+    return (200 if resultado["ok"] else ESTADOS_ERRORES.get(resultado["error"], 400)), resultado
+
+def respuestaHttp(estado, resultado, mantenerConexion):
+    '''
+    Arma la respuesta HTTP con el resultado en JSON.
+
+    PARAMETROS:
+    estado: código de estado HTTP.
+    resultado: diccionario del resultado.
+    mantenerConexion: True si la conexión queda abierta para más pedidos.
+
+    SALIDA:
+    Devuelve los bytes de la respuesta.
+    '''
+    contenido = json.dumps(resultado, ensure_ascii=False).encode("utf-8")
+    encabezado = (f"HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}\r\n"
+                  "Content-Type: application/json; charset=utf-8\r\n"
+                  f"Content-Length: {len(contenido)}\r\n"
+                  f"Connection: {'keep-alive' if mantenerConexion else 'close'}\r\n\r\n")
+    return encabezado.encode("latin-1") + contenido
+
+async def atenderConexion(lector, escritor):
+    '''
+    Atiende una conexión HTTP/1.1: lee los pedidos de a uno y responde cada uno, manteniendo la conexión
+    abierta salvo que el cliente pida cerrarla.
+
+    PARAMETROS:
+    lector, escritor: flujos de la conexión.
+
+    SALIDA:
+    '''
+    try:
+        while True:
+            try:
+                encabezado = await lector.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break # El cliente cerró la conexión
+            lineas = encabezado.decode("latin-1").split("\r\n")
+            campos = {}
+            for linea in lineas[1:]:
+                nombre, separador, valor = linea.partition(":")
+                campos[nombre.strip().lower()] = valor.strip()
+            conexion = campos.get("connection", "").lower()
+            try:
+                metodo, destino, version = lineas[0].split(" ")
+                largo = int(campos.get("content-length", "0"))
+            except ValueError:
+                escritor.write(respuestaHttp(400, resultadoError("datosInvalidos", "Pedido HTTP mal formado."), False))
+                break
+            if largo > MAXIMO_CUERPO_SERVIDOR:
+                escritor.write(respuestaHttp(413, resultadoError("datosInvalidos", "El cuerpo del pedido es demasiado grande."), False))
+                break
+            cuerpo = await lector.readexactly(largo) if largo > 0 else b""
+            mantenerConexion = conexion == "keep-alive" or (version == "HTTP/1.1" and conexion != "close")
+
+            estado, resultado = await resolverPedido(metodo, destino, cuerpo)
+            escritor.write(respuestaHttp(estado, resultado, mantenerConexion))
+            await escritor.drain()
+            if not mantenerConexion:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass # Conexión cortada o encabezado demasiado largo
+    finally:
+        escritor.close()
+
+async def servidorBiblioteca(direccion, puerto):
+    '''
+    Arranca el escritor y el servidor HTTP y atiende pedidos hasta que se interrumpa el programa.
+
+    PARAMETROS:
+    direccion: dirección en la que se escucha.
+    puerto: puerto en el que se escucha.
 
+    SALIDA:
+    '''
+    global _colaEscrituras, _sinEscrituras, _hiloLector, _sinLecturas
+    _colaEscrituras = asyncio.Queue()
+    _sinEscrituras = asyncio.Event()
+    _sinEscrituras.set()
+    _hiloLector = ThreadPoolExecutor(max_workers=1)
+    _sinLecturas = asyncio.Event()
+    _sinLecturas.set()
+    tareaEscritor = asyncio.create_task(escritorServidor())
+    servidor = await asyncio.start_server(atenderConexion, direccion, puerto, backlog=1024)
+    print(f"Servidor de la biblioteca en http://{direccion}:{puerto} (Ctrl+C para terminar)")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        tareaEscritor.cancel()
+        _hiloLector.shutdown(wait=False)
 
-def buscarLibrosPorAutor(): #Funcion para buscar libros en base a su autor
-    
+def iniciarServidor(direccion=SERVIDOR_DIRECCION, puerto=SERVIDOR_PUERTO):
     '''
-    Solicita un autor a buscar y luego imprime por pantalla un listado de los libros que coinciden con el autor solicitado
-    
+    Atiende los pedidos HTTP de las terminales y el portal hasta que se presione Ctrl+C.
+
     PARAMETROS:
+    direccion: dirección en la que se escucha (por defecto BIBLIOTECA_SERVIDOR_DIRECCION o 127.0.0.1).
+    puerto: puerto en el que se escucha (por defecto BIBLIOTECA_SERVIDOR_PUERTO o 8080).
+
     SALIDA:
-    imprime un listado con los libros cuya categoria coincide con el autor buscado dentro del archivo Libros, en caso de no haber encontrado ninguno informa que no hay libros con ese autor
     '''
     try:
-        # Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
-        
-        autorBuscado = input("Ingrese el nombre del autor a buscar: ").strip().lower()
-        encontrados = False
-
-        for idLibro, datos in libros.items():
-            for key in ['autor1', 'autor2', 'autor3']:
-                autor = datos["autores"].get(key, "").strip().lower()
-                if autor and autorBuscado in autor:
-                    encontrados = True
-                    print("-" * 30)
-                    print(f"ID del Libro: {idLibro}")
-                    print(f"Nombre: {datos['nombre']}")
-                    print(f"Editorial: {datos['editorial']}")
-                    print(f"Categoría: {datos['categoria']}")
-                    print(f"Stock: {datos['stock']}")
-                    print(f"Autor 1: {datos['autores']['autor1']}")
-                    print(f"Autor 2: {datos['autores']['autor2']}")
-                    print(f"Autor 3: {datos['autores']['autor3']}")
-                    print("-" * 30)
-                    break  # Evita duplicar si el autor aparece más de una vez en el mismo libro
-
-        if not encontrados:
-            print(f"No se encontraron libros para el autor '{autorBuscado}'.")
-        return
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+        asyncio.run(servidorBiblioteca(direccion, puerto))
+    except KeyboardInterrupt:
+        print("\nServidor detenido.")
+
+
+#EXPORTACION DE INFORMES
+
+# Los informes se pueden exportar en CSV, JSONL o en un archivo columnar compacto. Las filas salen de generadores y
+# se escriben a medida que se arman (en el formato columnar, de a un grupo de FILAS_POR_GRUPO filas), así que
+# ni el historial completo de préstamos se arma entero en memoria ni se formatea como texto.
+#
+# Formato columnar de los informes (los bloques, como en Prestamos.col, alineados a 8 bytes):
+#   "INFORCOL" | bloques de cada grupo | pie JSON | largo del pie (8 bytes) | "INFORCOL"
+# El pie, escrito al final porque recién ahí se conocen todos los grupos, indica las columnas con su tipo y la
+# ubicación de cada bloque. Cada columna se guarda como en Prestamos.col: los textos con agregarTextos, los
+# números con bytesArreglo y, si en el grupo falta algún valor, un bloque "presentes" con 1 o 0 por fila.
+MAGICO_INFORME = b"INFORCOL"
+FORMATOS_EXPORTACION = {"csv": ".csv", "jsonl": ".jsonl", "columnar": ".col"}
+# Tipo de array de cada tipo de columna (q: int64, d: float64, B: uint8); los textos no tienen
+TIPOS_EXPORTACION = {"texto": None, "entero": "q", "numero": "d", "logico": "B"}
+
+COLUMNAS_PRESTAMO_EXPORTADO = [("idPrestamo", "texto"), ("IdAlumno", "texto"), ("IdLibro", "texto"), ("tipoPrestamo", "entero"),
+                               ("costoPrestamo", "numero"), ("fechaDevolucion", "texto"), ("Devuelto", "logico")]
+# Columnas de cada informe exportable
+COLUMNAS_INFORMES = {
+    "prestamos-del-mes": COLUMNAS_PRESTAMO_EXPORTADO,
+    "resumen-anual": [("año", "texto"), ("mes", "entero"), ("IdLibro", "texto"), ("nombre", "texto"),
+                      ("cantidad", "entero"), ("pesos", "numero")],
+    "atrasados": [("idPrestamo", "texto"), ("IdAlumno", "texto"), ("nombreAlumno", "texto"), ("IdLibro", "texto"),
+                  ("tipoPrestamo", "entero"), ("costoPrestamo", "numero"), ("fechaDevolucion", "texto"), ("diasAtraso", "entero")],
+    "historial-prestamos": COLUMNAS_PRESTAMO_EXPORTADO
+}
 
+def filasResumenAnual(año):
+    '''
+    Recorre el resumen anual de préstamos con una fila por libro y mes (los dos resúmenes del menú en una sola tabla).
 
+    PARAMETROS:
+    año: texto con el año.
 
-def buscarLibrosPorCategoria():      #Funcion para buscar libros en base a su categoria
+    SALIDA:
+    Genera diccionarios {"año", "mes", "IdLibro", "nombre", "cantidad", "pesos"}.
     '''
-    Solicita una categoria a buscar y luego imprime por pantalla un listado de los libros que coinciden con la categoria solicitada
-    
-    PARÁMETROS:
-            No recibe, busca el archivo Libros y lo convierte en diccionario
+    porLibro, totales = resumenMensualPrestamos(año)
+    for idLibro, libro in recorrerRegistros("Libros.json"):
+        cantidades, pesos = porLibro.get(idLibro, ([0] * 12, [0] * 12))
+        for mes in range(12):
+            yield {"año": año, "mes": mes + 1, "IdLibro": idLibro, "nombre": libro["nombre"],
+                   "cantidad": cantidades[mes], "pesos": pesos[mes]}
+
+def filasHistorialPrestamos():
+    '''
+    Recorre todos los préstamos registrados, en orden de fecha de ingreso.
+
+    PARAMETROS:
     SALIDA:
-    imprime un listado con los libros cuya categoria coincide con la categoria buscada, en caso de no haber encontrado ninguno informa que no hay libros con esa categoria
+    Genera los registros de los préstamos, cada uno con su "idPrestamo".
     '''
-    try:
-        # Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
-        
-        categoria = input("Ingrese la categoría a buscar: ").strip().lower()
-        encontrados = False
-
-        for idLibro, datos in libros.items():
-            if datos["activo"] and categoria in datos["categoria"].lower():
-                encontrados = True
-                print("-" * 30)
-                print(f"ID del Libro: {idLibro}")
-                print(f"Nombre: {datos['nombre']}")
-                print(f"Editorial: {datos['editorial']}")
-                print(f"Categoría: {datos['categoria']}")
-                print(f"Stock: {datos['stock']}")
-                print(f"Autor 1: {datos['autores']['autor1']}")
-                print(f"Autor 2: {datos['autores']['autor2']}")
-                print(f"Autor 3: {datos['autores']['autor3']}")
-                print("-" * 30)
-
-        if not encontrados:
-            print(f"\nNo se encontraron libros en la categoría '{categoria}'.")
-        return
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    for idPrestamo, prestamo in recorrerRegistros("Prestamos.json"):
+        yield dict(prestamo, idPrestamo=idPrestamo)
 
-#FUNCIONES PARA GESTIONAR PRESTAMOS
-       
+def filasInforme(informe, año=None):
+    '''
+    Devuelve el generador de filas de un informe exportable.
 
-def sumarDias(fecha, dias): #Funcion auxiliar para calcular los dias para devolver un prestamo
-    return fecha + timedelta(days=dias)
+    PARAMETROS:
+    informe: nombre del informe (una clave de COLUMNAS_INFORMES).
+    año: año del resumen anual (por defecto, el actual).
 
+    SALIDA:
+    Devuelve el generador. Lanza ValueError si el informe no existe.
+    '''
+    if informe == "prestamos-del-mes":
+        return recorrerPrestamosDelMes()
+    if informe == "resumen-anual":
+        return filasResumenAnual(año or str(datetime.now().year))
+    if informe == "atrasados":
+        return recorrerPrestamosAtrasados()
+    if informe == "historial-prestamos":
+        return filasHistorialPrestamos()
+    raise ValueError(f"Informe desconocido: {informe}. Puede ser " + ", ".join(COLUMNAS_INFORMES) + ".")
+
+def escribirFilasCsv(Archivo, columnas, filas):
+    '''
+    Escribe las filas en CSV (UTF-8, con una fila de encabezado). Los valores lógicos se escriben como true/false.
 
+    PARAMETROS:
+    Archivo: archivo binario abierto para escribir.
+    columnas: lista de (nombre, tipo).
+    filas: iterable de diccionarios.
 
-def registrarPrestamo(): #Funcion para registrar un nuevo prestamo
+    SALIDA:
+    Devuelve la cantidad de filas escritas.
     '''
-    Permite registrar un nuevo prestamo, solicitando el idAlumno, idLibro y tipo de prestamo para calcular la fecha de devolucion y el costo del prestamo en base a
-    la cantidad de dias del prestamo y el costo de la garantia del libro
-    
+    Texto = io.TextIOWrapper(Archivo, encoding="utf-8", newline="")
+    escritor = csv.writer(Texto)
+    escritor.writerow([nombre for nombre, tipo in columnas])
+    cantidad = 0
+    for fila in filas:
+        valores = [fila.get(nombre) for nombre, tipo in columnas]
+        escritor.writerow(["" if valor is None else ("true" if valor else "false") if tipo == "logico" else valor
+                           for valor, (nombre, tipo) in zip(valores, columnas)])
+        cantidad += 1
+    Texto.flush()
+    Texto.detach() # El archivo lo cierra quien lo abrió
+    return cantidad
+
+def escribirFilasJsonl(Archivo, columnas, filas):
+    '''
+    Escribe las filas en JSONL: un objeto JSON por línea con las columnas del informe.
+
     PARAMETROS:
+    Archivo: archivo binario abierto para escribir.
+    columnas: lista de (nombre, tipo).
+    filas: iterable de diccionarios.
+
     SALIDA:
-    Carga un registro de prestamo nuevo en el archivo de Prestamos, en caso de ingresar un ID erroneo o tipo de prestamo erroneo devuelve un mensaje informando el error
+    Devuelve la cantidad de filas escritas.
     '''
-    
-    try:
-        #Leo archivo json de Alumnos y lo paso a un diccionario
-        Alumnos=open("Alumnos.json",mode="r",encoding="utf-8")
-        alumnos=json.load(Alumnos)
-        Alumnos.close()
-        # Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
-        #Leo archivo json de Prestamos y lo paso a un diccionario
-        Prestamos=open("Prestamos.json",mode="r",encoding="utf-8")
-        prestamos=json.load(Prestamos)
-        Prestamos.close()
-        
-        
-        
-        print("\n--- Registro de nuevo préstamo ---")
-
-        idAlumno = input("ID del alumno (ej: 1001): ").strip()
-        if idAlumno not in alumnos or not alumnos[idAlumno]["activo"]:
-            print("Alumno no válido o inactivo.")
-            return
+    cantidad = 0
+    for fila in filas:
+        Archivo.write(json.dumps({nombre: fila.get(nombre) for nombre, tipo in columnas}, ensure_ascii=False).encode("utf-8") + b"\n")
+        cantidad += 1
+    return cantidad
 
-        idLibro = input("ID del libro (ej: L001): ").strip()
-        if idLibro not in libros or not libros[idLibro]["activo"] or libros[idLibro]["stock"] <= 0:
-            print("Libro no válido, inactivo o sin stock.")
-            return
+def escribirFilasColumnar(Archivo, columnas, filas, informe):
+    '''
+    Escribe las filas en el formato columnar de informes, de a un grupo de FILAS_POR_GRUPO filas.
 
-        tipoPrestamo = input("Tipo de préstamo (1 para semanal, 2 para 15 días y 3 para 30 días): ").strip()
-        if tipoPrestamo not in ["1", "2", "3"]:
-            print("Tipo de préstamo inválido.")
-            return
-        tipoPrestamo = int(tipoPrestamo)
+    PARAMETROS:
+    Archivo: archivo binario abierto para escribir.
+    columnas: lista de (nombre, tipo).
+    filas: iterable de diccionarios.
+    informe: nombre del informe, para el pie.
 
-        # Calcular costoPrestamo basado en costoGarantia * tipoPrestamo
-        costo = libros[idLibro].get("costo", 0)
-        
+    SALIDA:
+    Devuelve la cantidad de filas escritas. Lanza ValueError si un valor no corresponde al tipo de su columna.
+    '''
+    Archivo.write(MAGICO_INFORME)
+    salida = {"bloques": [], "tamaño": len(MAGICO_INFORME)}
+    grupos = []
+    cantidad = 0
+    filas = iter(filas)
+    while True:
+        grupoFilas = list(itertools.islice(filas, FILAS_POR_GRUPO))
+        if not grupoFilas:
+            break
+        grupo = {"filas": len(grupoFilas), "columnas": {}, "presentes": {}}
+        for nombre, tipo in columnas:
+            valores = [fila.get(nombre) for fila in grupoFilas]
+            if None in valores:
+                grupo["presentes"][nombre] = agregarBloque(salida, bytesArreglo("B", [valor is not None for valor in valores]))
+            try:
+                if tipo == "texto":
+                    grupo["columnas"][nombre] = agregarTextos(salida, ["" if valor is None else str(valor) for valor in valores])
+                else:
+                    grupo["columnas"][nombre] = agregarBloque(salida, bytesArreglo(TIPOS_EXPORTACION[tipo], [valor or 0 for valor in valores]))
+            except (TypeError, OverflowError):
+                raise ValueError(f"La columna {nombre} tiene valores que no son de tipo {tipo}.")
+        grupos.append(grupo)
+        cantidad += len(grupoFilas)
+        # El grupo ya está armado: se escribe y se libera antes de leer el siguiente
+        Archivo.write(b"".join(salida["bloques"]))
+        salida["bloques"] = []
+
+    pie = json.dumps({"formato": 1, "informe": informe, "columnas": columnas, "filas": cantidad, "grupos": grupos},
+                     ensure_ascii=False).encode("utf-8")
+    Archivo.write(pie + struct.pack("<Q", len(pie)) + MAGICO_INFORME)
+    return cantidad
+
+@medirTiempo
+def exportarInforme(informe, formato, nombreArchivo, año=None):
+    '''
+    Exporta un informe a un archivo, escribiendo las filas a medida que se generan. El archivo se reemplaza
+    recién al terminar, así un corte nunca deja una exportación a medias.
 
-        fechaPrestamo = datetime.now()
+    PARAMETROS:
+    informe: "prestamos-del-mes", "resumen-anual", "atrasados" o "historial-prestamos".
+    formato: "csv", "jsonl" o "columnar".
+    nombreArchivo: archivo a escribir.
+    año: año del resumen anual (por defecto, el actual).
 
-        if tipoPrestamo == 1:
-            diasADevolver = 7
-        elif tipoPrestamo == 2:
-            diasADevolver = 15
+    SALIDA:
+    Devuelve la cantidad de filas exportadas. Lanza ValueError si el informe o el formato no existen.
+    '''
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValueError(f"Formato desconocido: {formato}. Puede ser " + ", ".join(FORMATOS_EXPORTACION) + ".")
+    columnas = COLUMNAS_INFORMES.get(informe)
+    filas = filasInforme(informe, año)
+    cantidad = []
+
+    def escribirContenido(Archivo):
+        if formato == "csv":
+            cantidad.append(escribirFilasCsv(Archivo, columnas, filas))
+        elif formato == "jsonl":
+            cantidad.append(escribirFilasJsonl(Archivo, columnas, filas))
         else:
-            diasADevolver = 30
-            
-        costoPrestamo = costo * diasADevolver
+            cantidad.append(escribirFilasColumnar(Archivo, columnas, filas, informe))
 
-        fechaDevolucion = sumarDias(fechaPrestamo, diasADevolver)
+    reemplazarArchivoPorPartes(nombreArchivo, escribirContenido)
+    return cantidad[0]
 
-        idPrestamo = fechaPrestamo.strftime("%Y.%m.%d %H.%M.%S")
-        nuevoPrestamo = {
-            "IdAlumno": idAlumno,
-            "IdLibro": idLibro,
-            "tipoPrestamo": tipoPrestamo,
-            "costoPrestamo": costoPrestamo,
-            "fechaDevolucion": fechaDevolucion.strftime("%Y.%m.%d %H.%M.%S"),
-            "Devuelto": False
-        }
+def leerInformeColumnar(ruta):
+    '''
+    Recorre las filas de un informe exportado en formato columnar, leyendo de a un grupo.
 
-        prestamos[idPrestamo] = nuevoPrestamo
-        libros[idLibro]["stock"] -= 1
+    PARAMETROS:
+    ruta: archivo columnar del informe.
 
-        print(f"✅ Préstamo registrado correctamente con ID: {idPrestamo}")
-        print(nuevoPrestamo)
-        # Guardar el diccionario actualizado en el archivo JSON
-        Prestamos = open("Prestamos.json", mode="w", encoding="utf-8")
-        json.dump(prestamos, Prestamos, ensure_ascii=False, indent=4)
-        Prestamos.close()
-        return
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    SALIDA:
+    Genera un diccionario por fila con las columnas del informe (None para los valores que faltaban).
+    Lanza ValueError si el archivo no tiene el formato esperado.
+    '''
+    Archivo = open(ruta, mode="rb")
+    try:
+        if os.fstat(Archivo.fileno()).st_size < 2 * len(MAGICO_INFORME) + 8:
+            raise ValueError(f"{ruta} no es un informe en formato columnar.")
+        mapa = mmap.mmap(Archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        Archivo.close()
+    try:
+        if mapa[:8] != MAGICO_INFORME or mapa[-8:] != MAGICO_INFORME:
+            raise ValueError(f"{ruta} no es un informe en formato columnar.")
+        largo = struct.unpack("<Q", mapa[-16:-8])[0]
+        pie = json.loads(mapa[len(mapa) - 16 - largo:len(mapa) - 16].decode("utf-8"))
+        copia = {"mapa": mapa, "base": 0} # Las ubicaciones del pie se cuentan desde el comienzo del archivo
+        for grupo in pie["grupos"]:
+            valores = {}
+            for nombre, tipo in pie["columnas"]:
+                if tipo == "texto":
+                    columna = textosColumnar(copia, grupo["columnas"][nombre])
+                else:
+                    columna = columnaColumnar(copia, grupo["columnas"][nombre], TIPOS_EXPORTACION[tipo])
+                    if tipo == "logico":
+                        columna = [bool(valor) for valor in columna]
+                if nombre in grupo["presentes"]:
+                    presentes = columnaColumnar(copia, grupo["presentes"][nombre], "B")
+                    columna = [valor if presente else None for valor, presente in zip(columna, presentes)]
+                valores[nombre] = columna
+            for fila in range(grupo["filas"]):
+                yield {nombre: valores[nombre][fila] for nombre, tipo in pie["columnas"]}
+    finally:
+        mapa.close()
+
+def informeColumnarAJsonl(origen, destino):
+    '''
+    Convierte un informe exportado en formato columnar a JSONL, con las mismas filas y columnas.
 
+    PARAMETROS:
+    origen: archivo columnar del informe.
+    destino: archivo JSONL a escribir.
 
+    SALIDA:
+    Escribe el archivo JSONL e informa la cantidad de filas convertidas.
+    Lanza ValueError si el origen no es un informe en formato columnar.
+    '''
+    cantidad = []
 
+    def escribirContenido(Archivo):
+        filas = 0
+        for fila in leerInformeColumnar(origen):
+            Archivo.write(json.dumps(fila, ensure_ascii=False).encode("utf-8") + b"\n")
+            filas += 1
+        cantidad.append(filas)
 
+    reemplazarArchivoPorPartes(destino, escribirContenido)
+    print(f"{cantidad[0]} filas convertidas de {origen} a {destino}.")
 
-def devolverPrestamo():
+def exportarInformeMenu():
     '''
-    Solicita el id del prestamo a devolver y cambia su status de Devuelto=False a Devuelto=True
-    
+    Pide el informe, el formato y el archivo, y exporta el informe.
+
     PARAMETROS:
     SALIDA:
-    Cambia el valor del atributo Devuelto a True, para identificar que un prestamo fue devuelto, en caso de no encontrar el prestamo informa que no fue encontrado ese ID
+    Informa la cantidad de filas exportadas o el error.
     '''
-    try:
-        #Leo archivo json de Prestamos y lo paso a un diccionario
-        Prestamos=open("Prestamos.json",mode="r",encoding="utf-8")
-        prestamos=json.load(Prestamos)
-        Prestamos.close()
-        print("----- REGISTRAR DEVOLUCIÓN -----")
-        idPrestamo = input("Ingrese el ID del préstamo (formato AAAA.MM.DD hh.mm.ss): ").strip()
-
-        if idPrestamo in prestamos:
-            if prestamos[idPrestamo].get("Devuelto", False):
-                print("Este préstamo ya fue registrado como devuelto.")
-            else:
-                prestamos[idPrestamo]["Devuelto"] = True
-                print("La devolución fue registrada correctamente.")
-                # Guardar el diccionario actualizado en el archivo JSON
-                Prestamos = open("Prestamos.json", mode="w", encoding="utf-8")
-                json.dump(prestamos, Prestamos, ensure_ascii=False, indent=4)
-                Prestamos.close()
-        else:
-            print("No se encontró un préstamo con ese ID.")
+    informes = list(COLUMNAS_INFORMES)
+    for numero, informe in enumerate(informes, start=1):
+        print(f"[{numero}] {informe}")
+    opcion = input("Informe a exportar: ").strip()
+    if opcion not in [str(numero) for numero in range(1, len(informes) + 1)]:
+        print("Opción inválida.")
         return
-    except (FileNotFoundError, OSError) as detalle:
-        print("Error al intentar abrir archivo(s):", detalle)
+    informe = informes[int(opcion) - 1]
+    formato = input("Formato (" + ", ".join(FORMATOS_EXPORTACION) + "): ").strip().lower()
+    if formato not in FORMATOS_EXPORTACION:
+        print("Formato inválido.")
+        return
+    año = None
+    if informe == "resumen-anual":
+        año = input("Año del resumen: ").strip()
+        if not (año.isdigit() and len(año) == 4):
+            print("Año inválido.")
+            return
+    nombreArchivo = input(f"Archivo (Enter para {informe}{FORMATOS_EXPORTACION[formato]}): ").strip() or informe + FORMATOS_EXPORTACION[formato]
+    try:
+        cantidad = exportarInforme(informe, formato, nombreArchivo, año)
+        print(f"Se exportaron {cantidad} filas a {nombreArchivo}.")
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error, ValueError) as detalle:
+        print("Error al exportar el informe:", detalle)
 
 
 #-------------------------------
@@ -919,31 +5680,59 @@ def listarPrestamosMesActual(): #11 FUNCION PARA MOSTRAR LOS PRESTAMOS DEL MES A
     Imprime un listado con la informacion de todos los prestamos del mes actual
     '''
     try:
-        #Leo archivo json de Prestamos y lo paso a un diccionario
-        Prestamos=open("Prestamos.json",mode="r",encoding="utf-8")
-        prestamos=json.load(Prestamos)
-        Prestamos.close()
-        
-    
-    
         tipoDict = {1: "Semanal", 2: "15 días", 3: "Mensual"}
-        hoy = datetime.now()
 
         print(f"{'Prestamo':<20} {'Alumno':<8} {'Libro':<6} {'TipoPrestamo':<12} {'FechaDevolucion':<20} {'Devuelto':<8} {'PrecioGarantía':>15}")
         print("-" * 100)
 
-        for fechaStr, datos in prestamos.items():
-            fecha = datetime.strptime(fechaStr, "%Y.%m.%d %H.%M.%S")
-            if fecha.year == hoy.year and fecha.month == hoy.month:
-                tipoTexto = tipoDict.get(datos["tipoPrestamo"], "Desconocido")
-                precio = f"{datos['costoPrestamo']:,.2f}"
-                print(f"{fechaStr:<20} {datos['IdAlumno']:<8} {datos['IdLibro']:<6} {tipoTexto:<12} {datos['fechaDevolucion']:<20} {str(datos['Devuelto']):<8} {precio:>15}")
+        mostrarPaginado(f"{datos['idPrestamo']:<20} {datos['IdAlumno']:<8} {datos['IdLibro']:<6} {tipoDict.get(datos['tipoPrestamo'], 'Desconocido'):<12} "
+                        f"{datos['fechaDevolucion']:<20} {str(datos['Devuelto']):<8} {datos['costoPrestamo']:>15,.2f}\n"
+                        for datos in recorrerPrestamosDelMes())
         return
-    except (FileNotFoundError, OSError) as detalle:
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
 
 
 
+def imprimirResumenAnual(año, posicion):
+    '''
+    Imprime el resumen anual de préstamos por libro en formato de matriz de tabla mensual.
+
+    PARAMETROS:
+    año: texto con el año del resumen.
+    posicion: 0 para imprimir las cantidades o 1 para imprimir los pesos.
+
+    SALIDA:
+    Imprime una fila por libro con sus valores mes a mes y una fila con los totales.
+    '''
+    meses = [
+        "ENE", "FEB", "MAR", "ABR", "MAY", "JUN",
+        "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"
+    ]
+    resumen = consultaResumenAnual(año)
+    campo = ("cantidades", "pesos")[posicion]
+
+    # Imprimir encabezado
+    print(f"\n{'Producto':<25}", end="")
+    for m in meses:
+        print(f"{m+'.'+año[-2:]:>9}", end="")
+    print()
+
+    # Imprimir filas por libro, con salto de línea entre filas
+    for libro in resumen["libros"]:
+        nombre = libro["nombre"][:23]
+        print(f"{nombre:<25}", end="")
+        for v in libro[campo]:
+            print(f"{v:>9}", end="")
+        print("\n")  # Salto de línea extra entre filas
+
+    # (Opcional) Totales por mes
+    print(f"{'TOTAL':<25}", end="")
+    for totalMes in resumen["totales"][posicion]:
+        print(f"{totalMes:>9}", end="")
+    print("\n")
+
+
 def resumenAnualPrestamosCantidadTabla(año):  #FUNCION PARA IMPRIMIR UN RESUMEN ANUAL POR LIBROS SEGUN CANTIDAD EN FORMATO DE MATRIZ
     '''
     Genera un resumen anual de préstamos por libro en base a la cantidad de veces que fue prestado, en formato de matriz de tabla mensual, permitiendo elegir el año deseado 
@@ -954,54 +5743,9 @@ def resumenAnualPrestamosCantidadTabla(año):  #FUNCION PARA IMPRIMIR UN RESUMEN
     Imprime un resumen en base a la cantidad de veces que un libro fue prestado por libro de los prestamos del año seleccionado en un formato de matriz mes a mes
     '''
     try:
-        # Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
-        #Leo archivo json de Prestamos y lo paso a un diccionario
-        Prestamos=open("Prestamos.json",mode="r",encoding="utf-8")
-        prestamos=json.load(Prestamos)
-        Prestamos.close()
-        meses = [
-            "ENE", "FEB", "MAR", "ABR", "MAY", "JUN",
-            "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"
-        ]
-        # Inicializar estructura: {idLibro: [0, 0, ..., 0] (12 meses)}
-        resumen = {}
-        for idLibro, info in libros.items():
-            resumen[idLibro] = [0] * 12
-
-        # Procesar préstamos
-        for fechaPrestamo, datos in prestamos.items():
-            añoPrestamo, mesPrestamo = fechaPrestamo.split('.')[:2]
-            if añoPrestamo == año:
-                idLibro = datos["IdLibro"]
-                mesIdx = int(mesPrestamo) - 1  # 0-indexed
-                if idLibro in resumen:
-                    resumen[idLibro][mesIdx] += 1
-
-        # Imprimir encabezado
-        print(f"\n{'Producto':<25}", end="")
-        for m in meses:
-            print(f"{m+'.'+año[-2:]:>9}", end="")
-        print()
-
-        # Imprimir filas por libro, con salto de línea entre filas
-        for idLibro, valores in resumen.items():
-            nombre = libros[idLibro]["nombre"][:23]
-            print(f"{nombre:<25}", end="")
-            for v in valores:
-                print(f"{v:>9}", end="")
-            print("\n")  # Salto de línea extra entre filas
-
-        # (Opcional) Totales por mes
-        print(f"{'TOTAL':<25}", end="")
-        for i in range(12):
-            totalMes = sum(resumen[libro][i] for libro in resumen)
-            print(f"{totalMes:>9}", end="")
-        print("\n")
+        imprimirResumenAnual(año, 0)
         return
-    except (FileNotFoundError, OSError) as detalle:
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
 
 
@@ -1016,56 +5760,9 @@ def resumenAnualPrestamosPesosTabla(año):   #FUNCION PARA IMPRIMIR UN RESUMEN D
     Imprime un resumen en pesos por libro de los prestamos del año seleccionado en un formato de matriz mes a mes
     '''
     try:
-        # Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
-        #Leo archivo json de Prestamos y lo paso a un diccionario
-        Prestamos=open("Prestamos.json",mode="r",encoding="utf-8")
-        prestamos=json.load(Prestamos)
-        Prestamos.close()
-        
-        meses = [
-            "ENE", "FEB", "MAR", "ABR", "MAY", "JUN",
-            "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"
-        ]
-        # Inicializar estructura: {idLibro: [0, 0, ..., 0] (12 meses)}
-        resumen = {}
-        for idLibro, info in libros.items():
-            resumen[idLibro] = [0] * 12
-
-        # Procesar préstamos
-        for fechaPrestamo, datos in prestamos.items():
-            añoPrestamo, mesPrestamo = fechaPrestamo.split('.')[:2]
-            if añoPrestamo == año:
-                idLibro = datos["IdLibro"]
-                costo = datos["costoPrestamo"]
-                mesIdx = int(mesPrestamo) - 1  # 0-indexed
-                if idLibro in resumen:
-                    resumen[idLibro][mesIdx] += costo
-
-        # Imprimir encabezado
-        print(f"\n{'Producto':<25}", end="")
-        for m in meses:
-            print(f"{m+'.'+año[-2:]:>9}", end="")
-        print()
-
-        # Imprimir filas por libro, con salto de línea entre filas
-        for idLibro, valores in resumen.items():
-            nombre = libros[idLibro]["nombre"][:23]
-            print(f"{nombre:<25}", end="")
-            for v in valores:
-                print(f"{v:>9}", end="")
-            print("\n")  # Salto de línea extra entre filas
-
-        # (Opcional) Totales por mes
-        print(f"{'TOTAL':<25}", end="")
-        for i in range(12):
-            totalMes = sum(resumen[libro][i] for libro in resumen)
-            print(f"{totalMes:>9}", end="")
-        print("\n")
+        imprimirResumenAnual(año, 1)
         return
-    except (FileNotFoundError, OSError) as detalle:
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
 
 
@@ -1078,47 +5775,439 @@ def listarPrestamosAtrasados(): #Funcion para listar los prestamos atrasados
     Imprime un listado de todos los prestamos atrasados
     '''
     try:
-        #Leo archivo json de Alumnos y lo paso a un diccionario
-        Alumnos=open("Alumnos.json",mode="r",encoding="utf-8")
-        alumnos=json.load(Alumnos)
-        Alumnos.close()
-        #Leer archivo json de Libros y cargar en un diccionario
-        Libros = open("Libros.json", mode="r", encoding="utf-8")
-        libros = json.load(Libros)
-        Libros.close()
-        #Leo archivo json de Prestamos y lo paso a un diccionario
-        Prestamos=open("Prestamos.json",mode="r",encoding="utf-8")
-        prestamos=json.load(Prestamos)
-        Prestamos.close()
         fechaActual = datetime.now()
         print("Listado de préstamos atrasados al", fechaActual.strftime("%Y-%m-%d %H:%M:%S"))
         print("-" * 55)
 
-        for idPrestamo in prestamos:
-            datosPrestamo = prestamos[idPrestamo]
-            fechaDevolucion = datetime.strptime(datosPrestamo["fechaDevolucion"], "%Y.%m.%d %H.%M.%S")
-
-            if fechaDevolucion < fechaActual and datosPrestamo.get("Devuelto") == False:
-                idAlumno = datosPrestamo["IdAlumno"]
-                nombreAlumno = alumnos[idAlumno]["nombre"] + " " + alumnos[idAlumno]["apellido"]
-                diasAtraso = (fechaActual - fechaDevolucion).days
-
-                print(f"ID Préstamo: {idPrestamo}")
-                print(f"Alumno: {nombreAlumno}")
-                print(f"ID Alumno: {idAlumno}")
-                print(f"ID Libro: {datosPrestamo['IdLibro']}")
-                print(f"Tipo de préstamo: {datosPrestamo['tipoPrestamo']}")
-                print(f"Costo del préstamo: ${datosPrestamo['costoPrestamo']}")
-                print(f"Fecha de devolución: {datosPrestamo['fechaDevolucion']}")
-                print(f"Días de atraso: {diasAtraso}")
-                print("-" * 55)
+        mostrarPaginado(textoPrestamoAtrasado(datos) for datos in recorrerPrestamosAtrasados(fechaActual))
+        return
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+        print("Error al intentar abrir archivo(s):", detalle)
+
+
+def mostrarIndicadoresPrestamos(): #Funcion para mostrar los indicadores generales de los prestamos
+    '''
+    Muestra la cantidad total de préstamos, los pendientes de devolución, los atrasados con su importe y
+    la cantidad e importe de préstamos de cada año
+    
+    PARAMETROS:
+    SALIDA:
+    Imprime los indicadores
+    '''
+    try:
+        fechaActual = datetime.now()
+        indicadores = consultaIndicadores(fechaActual)
+        print("Indicadores de préstamos al", fechaActual.strftime("%Y-%m-%d %H:%M:%S"))
+        print("-" * 55)
+        print(f"Préstamos registrados: {indicadores['prestamos']}")
+        print(f"Pendientes de devolución: {indicadores['pendientes']}")
+        print(f"Atrasados: {indicadores['atrasados']} (${indicadores['importeAtrasado']})")
+        print("-" * 55)
+        print(f"{'Año':<6} {'Préstamos':>10} {'Importe':>15}")
+        for año, (cantidad, importe) in indicadores["porAño"].items():
+            print(f"{año:<6} {cantidad:>10} {importe:>15,.2f}")
         return
-    except (FileNotFoundError, OSError) as detalle:
+    except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
         print("Error al intentar abrir archivo(s):", detalle)
 
         
         
 
+#BANCO DE PRUEBAS DE RENDIMIENTO
+
+# Con --generar-datos se crean Alumnos, Libros y Prestamos sintéticos (con la misma forma que los reales) y con
+# --medir-rendimiento se generan en un directorio aparte y se mide cada operación a través de los servicios, sin menú.
+# Los datos dependen solo de la semilla y de la cantidad de préstamos: la misma semilla da exactamente los mismos
+# archivos, así dos mediciones (por ejemplo, antes y después de un cambio, o en dos equipos) son comparables.
+# La popularidad de los libros y la actividad de los alumnos siguen una ley de Zipf: pocos títulos concentran
+# la mayoría de los préstamos, como en una biblioteca real.
+PRESTAMOS_SINTETICOS = 10000
+SEMILLA_SINTETICA = 1
+PRESTAMOS_POR_ALUMNO = 20
+PRESTAMOS_POR_LIBRO = 100
+EXPONENTE_ZIPF_LIBROS = 1.1
+EXPONENTE_ZIPF_ALUMNOS = 0.6
+# Los préstamos se reparten en los años anteriores a una fecha fija, no a hoy, para que los datos no cambien de un día a otro
+FECHA_REFERENCIA_SINTETICA = datetime(2025, 7, 1)
+AÑOS_HISTORIAL_SINTETICO = 3
+REPETICIONES_RENDIMIENTO = 50
+TOLERANCIA_RENDIMIENTO = 1.25 # Una operación empeoró si su mediana es más de un 25% mayor que en la medición anterior
+
+NOMBRES_SINTETICOS = ["Sofía", "Lucas", "María", "Tomás", "Camila", "Mateo", "Valentina", "Julián", "Martina", "Benjamín",
+                      "Lucía", "Santiago", "Emma", "Joaquín", "Catalina", "Felipe", "Julieta", "Nicolás", "Agustina", "Bruno"]
+APELLIDOS_SINTETICOS = ["Martínez", "Fernández", "Gómez", "Pérez", "López", "Rodríguez", "Díaz", "Sánchez", "Romero", "Ruiz",
+                        "Álvarez", "Torres", "Suárez", "Castro", "Molina", "Ortiz", "Silva", "Núñez", "Rojas", "Medina"]
+CARRERAS_SINTETICAS = ["Ingeniería en Sistemas", "Licenciatura en Sistemas", "Ingeniería Industrial", "Contador Público", "Derecho",
+                       "Medicina", "Arquitectura", "Psicología", "Diseño Gráfico", "Ingeniería Civil"]
+CATEGORIAS_SINTETICAS = ["Novela", "Distopía", "Fantasía", "Clásico", "Misterio", "Cuentos", "Ciencia Ficción", "Romance",
+                         "Historia", "Poesía", "Ensayo", "Biografía"]
+EDITORIALES_SINTETICAS = ["Sudamericana", "Planeta", "Salamandra", "Sur", "Alfaguara", "Anagrama", "Emecé", "Tusquets"]
+PALABRAS_TITULOS = ["sombra", "viento", "ciudad", "noche", "memoria", "jardín", "río", "silencio", "invierno", "espejo",
+                    "laberinto", "isla", "fuego", "mar", "tiempo", "luz", "camino", "casa", "bosque", "sueño",
+                    "piedra", "cielo", "puerta", "historia", "guerra", "amor", "secreto", "tierra", "reino", "voz"]
+
+def pesosZipf(cantidad, exponente):
+    '''
+    Calcula los pesos acumulados de una ley de Zipf, para elegir con random.choices.
+
+    PARAMETROS:
+    cantidad: cantidad de elementos (el de rango 1 es el más elegido).
+    exponente: cuanto más alto, más se concentran las elecciones en los primeros.
+
+    SALIDA:
+    Devuelve la lista de pesos acumulados.
+    '''
+    return list(itertools.accumulate(1 / rango ** exponente for rango in range(1, cantidad + 1)))
+
+def escribirRegistrosJson(Archivo, registros):
+    '''
+    Escribe un diccionario JSON de a un registro, con el mismo formato que guardarArchivo (json.dumps con indent=4),
+    sin armar el diccionario completo en memoria.
+
+    PARAMETROS:
+    Archivo: archivo abierto en modo binario.
+    registros: iterable de tuplas (clave, registro).
+
+    SALIDA:
+    '''
+    separador = b"{\n"
+    for clave, registro in registros:
+        texto = json.dumps(registro, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+        Archivo.write(separador + f"    {json.dumps(clave, ensure_ascii=False)}: {texto}".encode("utf-8"))
+        separador = b",\n"
+    Archivo.write(b"{}" if separador == b"{\n" else b"\n}")
+
+def alumnosSinteticos(cantidad, semilla):
+    '''
+    Genera alumnos sintéticos válidos (los IDs empiezan en 1001, como los reales).
+
+    PARAMETROS:
+    cantidad: cantidad de alumnos.
+    semilla: semilla de los datos.
+
+    SALIDA:
+    Genera tuplas (IdAlumno, registro).
+    '''
+    azar = random.Random(f"{semilla}-alumnos")
+    for numero in range(cantidad):
+        nombre = azar.choice(NOMBRES_SINTETICOS)
+        apellido = azar.choice(APELLIDOS_SINTETICOS)
+        idAlumno = formatearId("Alumnos.json", FORMATOS_ID["Alumnos.json"]["primero"] + numero)
+        yield idAlumno, {
+            "activo": azar.random() < 0.97,
+            "nombre": nombre,
+            "apellido": apellido,
+            "direccion": f"Calle {azar.choice(APELLIDOS_SINTETICOS)} {azar.randint(1, 9999)}",
+            "email": f"{normalizarTexto(nombre)}.{normalizarTexto(apellido)}{idAlumno}@example.com",
+            "carrera": azar.choice(CARRERAS_SINTETICAS),
+            "telefonos": {"telefono1": f"11{azar.randrange(10 ** 8):08d}", "telefono2": "", "telefono3": ""}
+        }
+
+def librosSinteticos(cantidad, semilla):
+    '''
+    Arma libros sintéticos: títulos de dos a cuatro palabras y autores repetidos entre varios libros.
+
+    PARAMETROS:
+    cantidad: cantidad de libros.
+    semilla: semilla de los datos.
+
+    SALIDA:
+    Devuelve el diccionario de libros.
+    '''
+    azar = random.Random(f"{semilla}-libros")
+    autores = [f"{azar.choice(NOMBRES_SINTETICOS)} {azar.choice(APELLIDOS_SINTETICOS)}" for numero in range(max(1, cantidad // 5))]
+    libros = {}
+    for numero in range(cantidad):
+        idLibro = formatearId("Libros.json", FORMATOS_ID["Libros.json"]["primero"] + numero)
+        libros[idLibro] = {
+            "activo": azar.random() < 0.98,
+            "stock": azar.randint(5, 50),
+            "nombre": " ".join(azar.sample(PALABRAS_TITULOS, azar.randint(2, 4))).capitalize(),
+            "editorial": azar.choice(EDITORIALES_SINTETICAS),
+            "categoria": azar.choice(CATEGORIAS_SINTETICAS),
+            "autores": {"autor1": azar.choice(autores), "autor2": azar.choice(autores) if azar.random() < 0.2 else "", "autor3": ""},
+            "costo": azar.randrange(100, 1000, 10)
+        }
+    return libros
+
+def prestamosSinteticos(cantidad, idsAlumnos, libros, semilla):
+    '''
+    Genera préstamos sintéticos en orden de fecha, uno cada pocos segundos durante los AÑOS_HISTORIAL_SINTETICO años
+    anteriores a FECHA_REFERENCIA_SINTETICA. Casi todos los vencidos están devueltos; los más recientes, no siempre.
+
+    PARAMETROS:
+    cantidad: cantidad de préstamos.
+    idsAlumnos: lista con los IDs de los alumnos.
+    libros: diccionario de libros.
+    semilla: semilla de los datos.
+
+    SALIDA:
+    Genera tuplas (idPrestamo, registro).
+    '''
+    azar = random.Random(f"{semilla}-prestamos")
+    idsLibros = list(libros)
+    # El orden de popularidad no sigue el de los IDs
+    azar.shuffle(idsAlumnos)
+    azar.shuffle(idsLibros)
+    pesosAlumnos = pesosZipf(len(idsAlumnos), EXPONENTE_ZIPF_ALUMNOS)
+    pesosLibros = pesosZipf(len(idsLibros), EXPONENTE_ZIPF_LIBROS)
+    # Un paso entero de segundos por préstamo asegura IDs distintos sin necesitar sufijos
+    paso = max(1, AÑOS_HISTORIAL_SINTETICO * 365 * 86400 // max(1, cantidad))
+    inicio = FECHA_REFERENCIA_SINTETICA - timedelta(seconds=paso * cantidad)
+    devueltosHasta = FECHA_REFERENCIA_SINTETICA - timedelta(days=7)
+    for numero in range(cantidad):
+        fechaPrestamo = inicio + timedelta(seconds=numero * paso + azar.randrange(paso))
+        idLibro = azar.choices(idsLibros, cum_weights=pesosLibros)[0]
+        tipoPrestamo = azar.choices((1, 2, 3), (5, 3, 2))[0]
+        fechaDevolucion = fechaPrestamo + timedelta(days=DIAS_POR_TIPO_PRESTAMO[tipoPrestamo])
+        yield fechaPrestamo.strftime("%Y.%m.%d %H.%M.%S"), {
+            "IdAlumno": azar.choices(idsAlumnos, cum_weights=pesosAlumnos)[0],
+            "IdLibro": idLibro,
+            "tipoPrestamo": tipoPrestamo,
+            "costoPrestamo": libros[idLibro]["costo"] * DIAS_POR_TIPO_PRESTAMO[tipoPrestamo],
+            "fechaDevolucion": fechaDevolucion.strftime("%Y.%m.%d %H.%M.%S"),
+            "Devuelto": azar.random() < (0.98 if fechaDevolucion < devueltosHasta else 0.4)
+        }
+
+def tamañoSintetico(prestamos):
+    '''
+    Calcula la cantidad de alumnos y de libros que acompaña a una cantidad de préstamos.
+
+    PARAMETROS:
+    prestamos: cantidad de préstamos.
+
+    SALIDA:
+    Devuelve la tupla (alumnos, libros).
+    '''
+    return max(10, prestamos // PRESTAMOS_POR_ALUMNO), max(10, prestamos // PRESTAMOS_POR_LIBRO)
+
+def generarDatosSinteticos(directorio, prestamos=PRESTAMOS_SINTETICOS, semilla=SEMILLA_SINTETICA):
+    '''
+    Escribe Alumnos.json, Libros.json y Prestamos.json sintéticos en un directorio, de a un registro
+    (ni los préstamos ni los alumnos se arman enteros en memoria). Borra el diario, la base SQLite, las secuencias
+    y las copias o índices guardados que hubiera en el directorio, porque corresponderían a otros datos.
+
+    PARAMETROS:
+    directorio: directorio donde se escriben los archivos (se crea si no existe).
+    prestamos: cantidad de préstamos; la de alumnos y libros sale de tamañoSintetico.
+    semilla: semilla de los datos.
+
+    SALIDA:
+    Devuelve la tupla (alumnos, libros, préstamos) con las cantidades generadas.
+    '''
+    os.makedirs(directorio, exist_ok=True)
+    derivados = [DIARIO, BASE_SQLITE, BASE_SQLITE + "-wal", BASE_SQLITE + "-shm", ARCHIVO_SECUENCIAS, ARCHIVO_INDICE_CATALOGO,
+                 ARCHIVO_COLUMNAR_PRESTAMOS] + [archivoPosiciones(nombreArchivo) for nombreArchivo in ARCHIVOS_MAPEADOS]
+    for nombreArchivo in derivados:
+        try:
+            os.remove(os.path.join(directorio, nombreArchivo))
+        except FileNotFoundError:
+            pass
+    cantidadAlumnos, cantidadLibros = tamañoSintetico(prestamos)
+    libros = librosSinteticos(cantidadLibros, semilla)
+    idsAlumnos = [formatearId("Alumnos.json", FORMATOS_ID["Alumnos.json"]["primero"] + numero) for numero in range(cantidadAlumnos)]
+    reemplazarArchivoPorPartes(os.path.join(directorio, "Alumnos.json"),
+                               lambda Archivo: escribirRegistrosJson(Archivo, alumnosSinteticos(cantidadAlumnos, semilla)))
+    reemplazarArchivoPorPartes(os.path.join(directorio, "Libros.json"), lambda Archivo: escribirRegistrosJson(Archivo, libros.items()))
+    reemplazarArchivoPorPartes(os.path.join(directorio, "Prestamos.json"),
+                               lambda Archivo: escribirRegistrosJson(Archivo, prestamosSinteticos(prestamos, idsAlumnos, libros, semilla)))
+    return cantidadAlumnos, cantidadLibros, prestamos
+
+def resumenDuraciones(duraciones):
+    '''
+    Resume las duraciones de las repeticiones de una operación.
+
+    PARAMETROS:
+    duraciones: lista de duraciones en segundos, en el orden en que se midieron.
+
+    SALIDA:
+    Devuelve {"repeticiones", "primera" (incluye armar índices o leer archivos), "minima", "mediana", "p95", "maxima", "total"}.
+    '''
+    ordenadas = sorted(duraciones)
+    return {
+        "repeticiones": len(duraciones),
+        "primera": duraciones[0],
+        "minima": ordenadas[0],
+        "mediana": ordenadas[len(ordenadas) // 2],
+        "p95": ordenadas[max(0, math.ceil(len(ordenadas) * 0.95) - 1)],
+        "maxima": ordenadas[-1],
+        "total": sum(duraciones)
+    }
+
+def medirOperacionRendimiento(operaciones, nombre, funcion, argumentos):
+    '''
+    Ejecuta una operación una vez con cada juego de argumentos y guarda el resumen de sus duraciones.
+
+    PARAMETROS:
+    operaciones: diccionario donde se guarda el resumen.
+    nombre: nombre de la operación en los resultados.
+    funcion: función a medir.
+    argumentos: lista de tuplas de argumentos, una por repetición.
+
+    SALIDA:
+    Devuelve la lista de resultados de la función.
+    '''
+    duraciones = []
+    resultados = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        resultados.append(funcion(*argumento))
+        duraciones.append(time.perf_counter() - inicio)
+    operaciones[nombre] = resumenDuraciones(duraciones)
+    operaciones[nombre]["correctas"] = sum(1 for resultado in resultados if not isinstance(resultado, dict) or resultado.get("ok", True))
+    return resultados
+
+def operacionesRendimiento(operaciones, prestamos, semilla, repeticiones):
+    '''
+    Mide las operaciones sobre los datos sintéticos del directorio actual: la carga de los archivos, las búsquedas,
+    los informes y el registro y la devolución de préstamos. Los argumentos de cada repetición salen de la semilla.
+
+    PARAMETROS:
+    operaciones: diccionario donde se guarda el resumen de cada operación.
+    prestamos: cantidad de préstamos generados.
+    semilla: semilla de los datos.
+    repeticiones: veces que se repite cada operación (la carga de los archivos se mide una sola vez).
+
+    SALIDA:
+    '''
+    azar = random.Random(f"{semilla}-rendimiento")
+    cantidadAlumnos, cantidadLibros = tamañoSintetico(prestamos)
+    for nombreArchivo in ARCHIVOS_CON_DIARIO:
+        medirOperacionRendimiento(operaciones, "carga " + nombreArchivo, obtenerRegistro, [(nombreArchivo, "")])
+    años = [str(FECHA_REFERENCIA_SINTETICA.year - desplazamiento) for desplazamiento in range(AÑOS_HISTORIAL_SINTETICO + 1)]
+    medirOperacionRendimiento(operaciones, "consultaLibrosPorAutor", consultaLibrosPorAutor,
+                              [(azar.choice(APELLIDOS_SINTETICOS),) for repeticion in range(repeticiones)])
+    medirOperacionRendimiento(operaciones, "consultaLibrosPorCategoria", consultaLibrosPorCategoria,
+                              [(azar.choice(CATEGORIAS_SINTETICAS),) for repeticion in range(repeticiones)])
+    medirOperacionRendimiento(operaciones, "consultaCatalogo", consultaCatalogo,
+                              [(" ".join(azar.sample(PALABRAS_TITULOS, 2)),) for repeticion in range(repeticiones)])
+    medirOperacionRendimiento(operaciones, "consultaResumenAnual", consultaResumenAnual,
+                              [(azar.choice(años),) for repeticion in range(repeticiones)])
+    medirOperacionRendimiento(operaciones, "consultaPrestamosDelMes", consultaPrestamosDelMes,
+                              [(FECHA_REFERENCIA_SINTETICA - timedelta(days=azar.randrange(365)),) for repeticion in range(repeticiones)])
+    medirOperacionRendimiento(operaciones, "consultaPrestamosAtrasados", consultaPrestamosAtrasados,
+                              [(FECHA_REFERENCIA_SINTETICA,)] * repeticiones)
+    medirOperacionRendimiento(operaciones, "consultaIndicadores", consultaIndicadores, [(FECHA_REFERENCIA_SINTETICA,)] * repeticiones)
+
+    # Los préstamos nuevos eligen alumno y libro con la misma popularidad que el historial
+    idsAlumnos = [formatearId("Alumnos.json", FORMATOS_ID["Alumnos.json"]["primero"] + numero) for numero in range(cantidadAlumnos)]
+    idsLibros = [formatearId("Libros.json", FORMATOS_ID["Libros.json"]["primero"] + numero) for numero in range(cantidadLibros)]
+    pesosAlumnos = pesosZipf(cantidadAlumnos, EXPONENTE_ZIPF_ALUMNOS)
+    pesosLibros = pesosZipf(cantidadLibros, EXPONENTE_ZIPF_LIBROS)
+    nuevos = medirOperacionRendimiento(operaciones, "altaPrestamo", altaPrestamo,
+                                       [(azar.choices(idsAlumnos, cum_weights=pesosAlumnos)[0], azar.choices(idsLibros, cum_weights=pesosLibros)[0],
+                                         azar.randint(1, 3)) for repeticion in range(repeticiones)])
+    registrados = [(resultado["idPrestamo"],) for resultado in nuevos if resultado["ok"]]
+    if registrados:
+        medirOperacionRendimiento(operaciones, "devolucionPrestamo", devolucionPrestamo, registrados)
+
+def medirRendimiento(archivoResultados, prestamos=PRESTAMOS_SINTETICOS, semilla=SEMILLA_SINTETICA,
+                     repeticiones=REPETICIONES_RENDIMIENTO, directorio=None):
+    '''
+    Genera los datos sintéticos, mide cada operación y guarda los resultados en un archivo JSON.
+    Trabaja dentro del directorio de los datos sintéticos, así que debe llamarse en un programa que todavía
+    no leyó los archivos reales (por ejemplo, con --medir-rendimiento).
+
+    PARAMETROS:
+    archivoResultados: archivo JSON donde se guardan los resultados.
+    prestamos: cantidad de préstamos a generar.
+    semilla: semilla de los datos.
+    repeticiones: veces que se repite cada operación.
+    directorio: directorio para los datos sintéticos, que se conservan; por defecto, uno temporal que se borra al terminar.
+
+    SALIDA:
+    Devuelve el diccionario con los resultados.
+    '''
+    archivoResultados = os.path.abspath(archivoResultados)
+    directorioTemporal = None
+    if directorio is None:
+        directorioTemporal = tempfile.TemporaryDirectory(prefix="biblioteca-rendimiento-")
+        directorio = directorioTemporal.name
+    directorioAnterior = os.getcwd()
+    try:
+        inicio = time.perf_counter()
+        cantidadAlumnos, cantidadLibros, prestamos = generarDatosSinteticos(directorio, prestamos, semilla)
+        generacion = time.perf_counter() - inicio
+        os.chdir(directorio)
+        if ALMACENAMIENTO == "sqlite":
+            migrarJsonASqlite()
+        operaciones = {}
+        operacionesRendimiento(operaciones, prestamos, semilla, repeticiones)
+    finally:
+        os.chdir(directorioAnterior)
+        if directorioTemporal is not None:
+            directorioTemporal.cleanup()
+
+    resultados = {
+        "fecha": datetime.now().strftime("%Y.%m.%d %H.%M.%S"),
+        "datos": {"semilla": semilla, "alumnos": cantidadAlumnos, "libros": cantidadLibros, "prestamos": prestamos,
+                  "repeticiones": repeticiones, "segundosGeneracion": generacion},
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "procesador": platform.machine(),
+            "nucleos": os.cpu_count(),
+            "almacenamiento": ALMACENAMIENTO,
+            "accesoRegistros": ACCESO_REGISTROS,
+            "motorInformes": "columnar" if usarMotorColumnar() else "indices",
+            "numpy": numpy.__version__ if numpy is not None else None
+        },
+        "operaciones": operaciones
+    }
+    reemplazarArchivo(archivoResultados, json.dumps(resultados, ensure_ascii=False, indent=4).encode("utf-8"))
+    return resultados
+
+def compararRendimiento(actuales, anteriores, tolerancia=TOLERANCIA_RENDIMIENTO):
+    '''
+    Compara la mediana de cada operación con la de una medición anterior.
+
+    PARAMETROS:
+    actuales: resultados de medirRendimiento.
+    anteriores: resultados de una medición anterior (leídos de su archivo).
+    tolerancia: cuántas veces más lenta puede ser una operación antes de considerarla empeorada.
+
+    SALIDA:
+    Devuelve la lista de tuplas (operación, mediana anterior, mediana actual, empeoró) de las operaciones de ambas mediciones.
+    '''
+    comparacion = []
+    for operacion, actual in actuales["operaciones"].items():
+        anterior = anteriores["operaciones"].get(operacion)
+        if anterior is not None:
+            comparacion.append((operacion, anterior["mediana"], actual["mediana"], actual["mediana"] > anterior["mediana"] * tolerancia))
+    return comparacion
+
+def mostrarRendimiento(resultados, anteriores=None):
+    '''
+    Muestra los resultados de una medición y, si se indica, la comparación con una anterior.
+
+    PARAMETROS:
+    resultados: resultados de medirRendimiento.
+    anteriores: resultados de una medición anterior, o None.
+
+    SALIDA:
+    Devuelve True si alguna operación empeoró más de lo tolerado.
+    '''
+    datos = resultados["datos"]
+    print(f"Datos: {datos['alumnos']} alumnos, {datos['libros']} libros y {datos['prestamos']} préstamos "
+          f"(semilla {datos['semilla']}, generados en {datos['segundosGeneracion']:.1f} s)")
+    print(f"{'Operación':<30}{'Primera (ms)':>14}{'Mediana (ms)':>14}{'p95 (ms)':>12}{'Correctas':>11}")
+    for operacion, resumen in resultados["operaciones"].items():
+        print(f"{operacion:<30}{resumen['primera'] * 1000:>14.3f}{resumen['mediana'] * 1000:>14.3f}{resumen['p95'] * 1000:>12.3f}"
+              f"{resumen['correctas']:>6}/{resumen['repeticiones']:<4}")
+    if anteriores is None:
+        return False
+    if any(anteriores["datos"].get(campo) != datos[campo] for campo in ("semilla", "prestamos", "repeticiones")):
+        print("Atención: la medición anterior se hizo con otros datos (semilla, cantidades o repeticiones), la comparación es orientativa.")
+    empeoro = False
+    print()
+    print(f"{'Operación':<30}{'Anterior (ms)':>15}{'Actual (ms)':>13}{'Cambio':>9}")
+    for operacion, anterior, actual, empeorada in compararRendimiento(resultados, anteriores):
+        cambio = f"{actual / anterior:.2f}x" if anterior else "-"
+        print(f"{operacion:<30}{anterior * 1000:>15.3f}{actual * 1000:>13.3f}{cambio:>9}" + ("  EMPEORÓ" if empeorada else ""))
+        empeoro = empeoro or empeorada
+    return empeoro
+
+
 #----------------------------------------------------------------------------------------------
 # CUERPO PRINCIPAL
 #----------------------------------------------------------------------------------------------
@@ -1152,6 +6241,7 @@ def main():
         print()
 
         if opcionMenuPrincipal == "0": # Opción salir del programa
+            guardarIndicesModificados() # Así el próximo inicio no tiene que volver a armar los índices
             exit()
 
         elif opcionMenuPrincipal == "1":   # Opción 1 del menú principal, accede a la gestion de alumnos
@@ -1182,17 +6272,17 @@ def main():
                     break # No sale del programa, sino que vuelve al menú anterior
                 
                 elif opcionSubmenu == "1":   # Opción 1 del submenú, permite cargar un alumno
-                    ingresoAlumno()
+                    ejecutarOperacion("menu ingresoAlumno", ingresoAlumno)
                     
                 elif opcionSubmenu == "2":   # Opción 2 del submenú, permite modificar la informacion de un alumno
-                    modificarAlumno()
+                    ejecutarOperacion("menu modificarAlumno", modificarAlumno)
                 
                 elif opcionSubmenu == "3":   # Opción 3 del submenú, permite realizar un borrado logico de un alumno
                     
-                    eliminarAlumno()
+                    ejecutarOperacion("menu eliminarAlumno", eliminarAlumno)
                 
                 elif opcionSubmenu == "4":   # Opción 4 del submenú, muestra un listado de los alumnos activos
-                    listarAlumnos()
+                    ejecutarOperacion("menu listarAlumnos", listarAlumnos)
 
                 input("\nPresione ENTER para volver al menú.") # Pausa entre opciones
                 print("\n\n")
@@ -1201,7 +6291,7 @@ def main():
         elif opcionMenuPrincipal == "2":   # Opción 2 del menú principal, accede a la gestion de libros
             while True:
                 while True:
-                    opciones = 6
+                    opciones = 7
                     print()
                     print("---------------------------")
                     print("MENÚ PRINCIPAL > MENÚ DE LIBROS")
@@ -1212,6 +6302,7 @@ def main():
                     print("[4] Listado de Libros Activos")
                     print("[5] Listado de Libros por Autor")
                     print("[6] Listado de Libros por Categoría")
+                    print("[7] Buscar en el Catálogo")
                     print("---------------------------")
                     print("[0] Volver al menú anterior")
                     print("---------------------------")
@@ -1228,22 +6319,25 @@ def main():
                     break # No sale del programa, sino que vuelve al menú anterior
                 
                 elif opcionSubmenu == "1":   # Opción 1 del submenú, permite ingresar un nuevo libro
-                    ingresoLibros()
+                    ejecutarOperacion("menu ingresoLibros", ingresoLibros)
                     
                 elif opcionSubmenu == "2":   # Opción 2 del submenú, accede a modificar libro
-                    modificarLibro()
+                    ejecutarOperacion("menu modificarLibro", modificarLibro)
                 
                 elif opcionSubmenu == "3":   # Opción 3 del submenú, permite eliminar logicamente un libro
-                    eliminarLibro()
+                    ejecutarOperacion("menu eliminarLibro", eliminarLibro)
                 
                 elif opcionSubmenu == "4":   # Opción 4 del submenú, muestra un listado de los libros activos
-                    librosActivos()
+                    ejecutarOperacion("menu librosActivos", librosActivos)
                     
                 elif opcionSubmenu == "5":   # Opción 5 el submenú, muestra un listado de libros segun su autor
-                    buscarLibrosPorAutor()
+                    ejecutarOperacion("menu buscarLibrosPorAutor", buscarLibrosPorAutor)
                 
                 elif opcionSubmenu == "6":   # Opción 6 del submenú, muestra un listado de libros segun su categoria
-                    buscarLibrosPorCategoria()
+                    ejecutarOperacion("menu buscarLibrosPorCategoria", buscarLibrosPorCategoria)
+
+                elif opcionSubmenu == "7":   # Opción 7 del submenú, busca libros por nombre, autor, editorial o categoria
+                    ejecutarOperacion("menu buscarLibrosEnCatalogo", buscarLibrosEnCatalogo)
                     
 
                 input("\nPresione ENTER para volver al menú.") # Pausa entre opciones
@@ -1274,9 +6368,9 @@ def main():
                     break # No sale del programa, sino que vuelve al menú anterior
                 
                 elif opcionSubmenu == "1":   # Opción 1 del submenú
-                    registrarPrestamo()
+                    ejecutarOperacion("menu registrarPrestamo", registrarPrestamo)
                 elif opcionSubmenu == "2":   # Opción 2 del submenú
-                    devolverPrestamo()
+                    ejecutarOperacion("menu devolverPrestamo", devolverPrestamo)
                 
 
             if opcionSubmenu != "0": # Pausa entre opciones. No la realiza si se vuelve de un submenú
@@ -1286,7 +6380,7 @@ def main():
         elif opcionMenuPrincipal == "4":   # Opción 4 del menú principal, accede a los informes
             while True:
                 while True:
-                    opciones = 4
+                    opciones = 6
                     print()
                     print("---------------------------")
                     print("MENÚ PRINCIPAL > INFORMES")
@@ -1295,6 +6389,8 @@ def main():
                     print("[2] Resumen Anual de Préstamos por Libro (cantidades)")
                     print("[3] Resumen Anual de Préstamos por Libro (pesos)")
                     print("[4] Resumen de Préstamos Atrasados")
+                    print("[5] Indicadores de Préstamos")
+                    print("[6] Exportar Informe (CSV, JSONL o columnar)")
                     print("---------------------------")
                     print("[0] Volver al menú anterior")
                     print("---------------------------")
@@ -1310,7 +6406,7 @@ def main():
                     break # No sale del programa, sino que vuelve al menú anterior
                 
                 elif opcionSubmenu == "1":   # Opción 1 del submenú
-                    listarPrestamosMesActual()
+                    ejecutarOperacion("menu listarPrestamosMesActual", listarPrestamosMesActual)
                     
                 elif opcionSubmenu == "2":   # Opción 2 del submenú
                     año = int(input("Ingrese el año a realizar el resumen: "))
@@ -1318,7 +6414,7 @@ def main():
                         print("Error, ingrese un año entre el 2000 y el 2026")
                         año = int(input("Ingrese el año a realizar el resumen: "))
                     año=str(año)                       
-                    resumenAnualPrestamosCantidadTabla(año)
+                    ejecutarOperacion("menu resumenAnualPrestamosCantidadTabla", resumenAnualPrestamosCantidadTabla, año)
                 
                 elif opcionSubmenu == "3":   # Opción 3 del submenú
                     año = int(input("Ingrese el año a realizar el resumen: "))
@@ -1326,10 +6422,16 @@ def main():
                         print("Error, ingrese un año entre el 2000 y el 2026")
                         año = int(input("Ingrese el año a realizar el resumen: "))
                     año=str(año) 
-                    resumenAnualPrestamosPesosTabla(año)
+                    ejecutarOperacion("menu resumenAnualPrestamosPesosTabla", resumenAnualPrestamosPesosTabla, año)
                 
                 elif opcionSubmenu == "4":   # Opción 4 del submenú
-                    listarPrestamosAtrasados()
+                    ejecutarOperacion("menu listarPrestamosAtrasados", listarPrestamosAtrasados)
+
+                elif opcionSubmenu == "5":   # Opción 5 del submenú
+                    ejecutarOperacion("menu mostrarIndicadoresPrestamos", mostrarIndicadoresPrestamos)
+
+                elif opcionSubmenu == "6":   # Opción 6 del submenú
+                    ejecutarOperacion("menu exportarInformeMenu", exportarInformeMenu)
 
 
         if opcionSubmenu != "0": # Pausa entre opciones. No la realiza si se vuelve de un submenú
@@ -1381,5 +6483,96 @@ def main():
 }
     """
 # Punto de entrada al programa
-main()
+# Con --migrar-sqlite se copian los archivos JSON a la base SQLite en lugar de abrir el menú.
+# Con --exportar-columnar se crea la copia columnar de los préstamos y con
+# --columnar-a-json ORIGEN DESTINO se convierte un archivo columnar a JSON.
+# Con --importar TIPO ARCHIVO se importan alumnos, libros o prestamos desde un archivo CSV o JSONL y con
+# --validar-alumnos se verifican todos los alumnos guardados; ambos aceptan --procesos N (por defecto, uno por núcleo).
+# Con --servidor se atienden pedidos HTTP en lugar de abrir el menú (el puerto se puede indicar con --puerto N).
+# Con --exportar-informe INFORME FORMATO ARCHIVO se exporta un informe (el año del resumen anual se indica con --año AAAA)
+# y con --informe-a-jsonl ORIGEN DESTINO se convierte un informe exportado en formato columnar a JSONL.
+# Con --generar-datos DIRECTORIO se crean datos sintéticos y con --medir-rendimiento ARCHIVO se mide el rendimiento
+# de cada operación sobre ellos; ambos aceptan --prestamos N y --semilla S, y el segundo también --repeticiones N,
+# --datos DIRECTORIO (para conservar los datos generados) y --comparar ANTERIOR (termina con error si alguna operación empeoró).
+# Con --perfiles activar [OPERACION ...] o --perfiles desactivar se empiezan o terminan de perfilar las operaciones
+# de todos los programas que corren en este directorio, sin reiniciarlos (solo --perfiles muestra el estado).
+# En todos los casos, con la variable BIBLIOTECA_METRICAS=ARCHIVO se guardan al terminar las métricas de las operaciones.
+if __name__ == "__main__":
+    procesos = os.cpu_count() or 1
+    if "--procesos" in sys.argv[1:]:
+        procesos = int(sys.argv[sys.argv.index("--procesos") + 1])
+    if "--perfiles" in sys.argv[1:]:
+        posicion = sys.argv.index("--perfiles")
+        accion = sys.argv[posicion + 1] if len(sys.argv) > posicion + 1 else ""
+        if accion == "activar":
+            activarPerfiles(sys.argv[posicion + 2:])
+        elif accion == "desactivar":
+            desactivarPerfiles()
+        estado = consultaPerfiles()
+        if not estado["activos"]:
+            print("Los perfiles están desactivados.")
+        else:
+            print(f"Se perfilan {'las operaciones ' + ', '.join(estado['operaciones']) if estado['operaciones'] else 'todas las operaciones'}"
+                  f" y se guardan en {estado['directorio']}.")
+    elif "--migrar-sqlite" in sys.argv[1:]:
+        ejecutarOperacion("comando migrarJsonASqlite", migrarJsonASqlite)
+    elif "--exportar-columnar" in sys.argv[1:]:
+        ejecutarOperacion("comando exportarColumnarPrestamos", exportarColumnarPrestamos)
+    elif "--columnar-a-json" in sys.argv[1:]:
+        posicion = sys.argv.index("--columnar-a-json")
+        ejecutarOperacion("comando columnarAJson", columnarAJson, sys.argv[posicion + 1], sys.argv[posicion + 2])
+    elif "--importar" in sys.argv[1:]:
+        posicion = sys.argv.index("--importar")
+        try:
+            ejecutarOperacion("comando importarRegistros", importarRegistros, sys.argv[posicion + 1], sys.argv[posicion + 2], procesos)
+        except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error, RuntimeError) as detalle:
+            print("Error al importar:", detalle)
+    elif "--validar-alumnos" in sys.argv[1:]:
+        try:
+            ejecutarOperacion("comando mostrarValidacionAlumnos", mostrarValidacionAlumnos, procesos)
+        except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+            print("Error al intentar abrir archivo(s):", detalle)
+    elif "--exportar-informe" in sys.argv[1:]:
+        posicion = sys.argv.index("--exportar-informe")
+        año = sys.argv[sys.argv.index("--año") + 1] if "--año" in sys.argv[1:] else None
+        try:
+            cantidad = ejecutarOperacion("comando exportarInforme", exportarInforme, sys.argv[posicion + 1], sys.argv[posicion + 2], sys.argv[posicion + 3], año)
+            print(f"Se exportaron {cantidad} filas a {sys.argv[posicion + 3]}.")
+        except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error, ValueError) as detalle:
+            print("Error al exportar el informe:", detalle)
+    elif "--informe-a-jsonl" in sys.argv[1:]:
+        posicion = sys.argv.index("--informe-a-jsonl")
+        try:
+            ejecutarOperacion("comando informeColumnarAJsonl", informeColumnarAJsonl, sys.argv[posicion + 1], sys.argv[posicion + 2])
+        except (FileNotFoundError, OSError, json.JSONDecodeError, ValueError) as detalle:
+            print("Error al convertir el informe:", detalle)
+    elif "--generar-datos" in sys.argv[1:] or "--medir-rendimiento" in sys.argv[1:]:
+        prestamos = int(sys.argv[sys.argv.index("--prestamos") + 1]) if "--prestamos" in sys.argv[1:] else PRESTAMOS_SINTETICOS
+        semilla = int(sys.argv[sys.argv.index("--semilla") + 1]) if "--semilla" in sys.argv[1:] else SEMILLA_SINTETICA
+        try:
+            if "--generar-datos" in sys.argv[1:]:
+                directorio = sys.argv[sys.argv.index("--generar-datos") + 1]
+                alumnos, libros, prestamos = generarDatosSinteticos(directorio, prestamos, semilla)
+                print(f"Se generaron {alumnos} alumnos, {libros} libros y {prestamos} préstamos en {directorio}.")
+            else:
+                repeticiones = int(sys.argv[sys.argv.index("--repeticiones") + 1]) if "--repeticiones" in sys.argv[1:] else REPETICIONES_RENDIMIENTO
+                directorio = sys.argv[sys.argv.index("--datos") + 1] if "--datos" in sys.argv[1:] else None
+                anteriores = None
+                if "--comparar" in sys.argv[1:]:
+                    Archivo = open(sys.argv[sys.argv.index("--comparar") + 1], mode="r", encoding="utf-8")
+                    anteriores = json.load(Archivo)
+                    Archivo.close()
+                resultados = medirRendimiento(sys.argv[sys.argv.index("--medir-rendimiento") + 1], prestamos, semilla, repeticiones, directorio)
+                if mostrarRendimiento(resultados, anteriores):
+                    sys.exit(1)
+        except (FileNotFoundError, OSError, json.JSONDecodeError, sqlite3.Error) as detalle:
+            print("Error al intentar abrir archivo(s):", detalle)
+            sys.exit(1)
+    elif "--servidor" in sys.argv[1:]:
+        puerto = SERVIDOR_PUERTO
+        if "--puerto" in sys.argv[1:]:
+            puerto = int(sys.argv[sys.argv.index("--puerto") + 1])
+        iniciarServidor(puerto=puerto)
+    else:
+        main()
 
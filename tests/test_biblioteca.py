@@ -0,0 +1,199 @@
+'''
+Pruebas del almacenamiento en archivos JSON con diario.
+
+Cada prueba trabaja en un directorio temporal con una copia de Alumnos.json, Libros.json y Prestamos.json,
+y carga el programa de nuevo (como si fuera otra terminal) cada vez que necesita leer el estado desde el disco.
+'''
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+DIRECTORIO_PROGRAMA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMA = os.path.join(DIRECTORIO_PROGRAMA, "Equipo04TPOLibreria - ENTREGA FINAL - ARCHIVOS.py")
+ARCHIVOS_DATOS = ["Alumnos.json", "Libros.json", "Prestamos.json"]
+
+def cargarPrograma():
+    '''
+    Carga el programa como un módulo nuevo, sin memoria compartida con las cargas anteriores.
+
+    PARAMETROS:
+    SALIDA:
+    Devuelve el módulo.
+    '''
+    especificacion = importlib.util.spec_from_file_location("biblioteca", PROGRAMA)
+    modulo = importlib.util.module_from_spec(especificacion)
+    especificacion.loader.exec_module(modulo)
+    return modulo
+
+def leerJson(nombreArchivo):
+    Archivo = open(nombreArchivo, mode="r", encoding="utf-8")
+    try:
+        return json.load(Archivo)
+    finally:
+        Archivo.close()
+
+class PruebaConDatos(unittest.TestCase):
+    def setUp(self):
+        self.directorioAnterior = os.getcwd()
+        self.directorio = tempfile.mkdtemp()
+        for nombreArchivo in ARCHIVOS_DATOS:
+            shutil.copy(os.path.join(DIRECTORIO_PROGRAMA, nombreArchivo), self.directorio)
+        os.chdir(self.directorio)
+        self.programa = cargarPrograma()
+
+    def tearDown(self):
+        os.chdir(self.directorioAnterior)
+        shutil.rmtree(self.directorio)
+
+    def devolver(self, programa, idPrestamo):
+        prestamo = dict(programa.leerArchivo("Prestamos.json")[idPrestamo], Devuelto=True)
+        self.assertTrue(programa.confirmarCambios([("Prestamos.json", idPrestamo, prestamo)]))
+
+    def cambiarStock(self, programa, idLibro, stock):
+        libro = dict(programa.leerArchivo("Libros.json")[idLibro], stock=stock)
+        self.assertTrue(programa.confirmarCambios([("Libros.json", idLibro, libro)]))
+
+
+class PruebasDiario(PruebaConDatos):
+    def test_el_diario_se_aplica_al_volver_a_leer(self):
+        self.devolver(self.programa, "2025.06.02 14.30.00")
+        self.assertFalse(leerJson("Prestamos.json")["2025.06.02 14.30.00"]["Devuelto"]) # El archivo JSON todavía no cambió
+        self.assertTrue(cargarPrograma().leerArchivo("Prestamos.json")["2025.06.02 14.30.00"]["Devuelto"])
+
+    def test_compactar_es_idempotente(self):
+        self.devolver(self.programa, "2025.06.02 14.30.00")
+        self.devolver(self.programa, "2025.06.03 10.00.00")
+        Diario = open("Biblioteca.diario", mode="rb")
+        diarioAnterior = Diario.read()
+        Diario.close()
+
+        self.programa.compactarDiario()
+        prestamos = leerJson("Prestamos.json")
+        self.assertTrue(prestamos["2025.06.02 14.30.00"]["Devuelto"] and prestamos["2025.06.03 10.00.00"]["Devuelto"])
+        self.programa.compactarDiario()
+        self.assertEqual(leerJson("Prestamos.json"), prestamos)
+
+        # Un corte antes de reemplazar el diario deja el diario viejo sobre los archivos ya compactados
+        Diario = open("Biblioteca.diario", mode="wb")
+        Diario.write(diarioAnterior)
+        Diario.close()
+        programa = cargarPrograma()
+        self.assertEqual(programa.leerArchivo("Prestamos.json"), prestamos)
+        programa.compactarDiario()
+        self.assertEqual(leerJson("Prestamos.json"), prestamos)
+
+    def test_una_compactacion_fallida_no_anula_la_confirmacion(self):
+        def compactacionFallida():
+            raise OSError("disco lleno")
+        self.programa.diarioParaCompactar = lambda: True
+        self.programa.compactarDiario = compactacionFallida
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            self.devolver(self.programa, "2025.06.02 14.30.00")
+        self.assertIn("disco lleno", salida.getvalue())
+        self.assertTrue(cargarPrograma().leerArchivo("Prestamos.json")["2025.06.02 14.30.00"]["Devuelto"])
+
+
+class PruebasCopiaColumnar(PruebaConDatos):
+    def test_exportar_y_convertir_a_json(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.programa.exportarColumnarPrestamos()
+            self.programa.columnarAJson("Prestamos.col", "Copia.json")
+        original = leerJson("Prestamos.json")
+        copia = leerJson("Copia.json")
+        self.assertEqual(copia, original)
+        self.assertEqual(list(copia), list(original))
+
+    def test_compactar_sin_prestamos_nuevos_actualiza_la_version(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.programa.exportarColumnarPrestamos()
+        self.cambiarStock(self.programa, "L001", 99)
+        self.programa.compactarDiario()
+        copia = self.programa.abrirColumnarPrestamos()
+        version = copia["encabezado"]["version"]
+        copia["mapa"].close()
+        self.assertEqual(version, self.programa.ultimaVersionDiario())
+        self.assertIsNotNone(self.programa.cambiosDelDiario(version, self.programa.ultimaVersionDiario()))
+        self.assertEqual(self.programa.leerColumnarPrestamos(), leerJson("Prestamos.json"))
+
+
+class PruebasEscritorServidor(PruebaConDatos):
+    def altaPrestamos(self, cantidad):
+        return [lambda: self.programa.altaPrestamo("1001", "L008", 1) for numero in range(cantidad)]
+
+    def test_un_error_antes_de_confirmar_no_guarda_nada(self):
+        def operacionFallida():
+            raise OSError("no se pudo leer")
+        prestamos = len(self.programa.leerArchivo("Prestamos.json"))
+        with self.assertRaises(OSError):
+            self.programa.ejecutarEscriturasServidor(self.altaPrestamos(2) + [operacionFallida])
+        self.assertIsNone(self.programa._lote)
+        self.assertEqual(len(self.programa.leerArchivo("Prestamos.json")), prestamos)
+        self.assertEqual(len(cargarPrograma().leerArchivo("Prestamos.json")), prestamos)
+
+    def test_una_compactacion_fallida_no_descarta_el_lote(self):
+        def compactacionFallida():
+            raise OSError("disco lleno")
+        self.programa.diarioParaCompactar = lambda: True
+        self.programa.compactarDiario = compactacionFallida
+        prestamos = len(self.programa.leerArchivo("Prestamos.json"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultados = self.programa.ejecutarEscriturasServidor(self.altaPrestamos(3))
+        self.assertTrue(all(correcto and resultado["ok"] for correcto, resultado in resultados))
+        self.assertEqual(len(cargarPrograma().leerArchivo("Prestamos.json")), prestamos + 3)
+
+    def ejecutarEnEscritor(self, operaciones):
+        programa = self.programa
+
+        async def escribir():
+            programa._colaEscrituras = programa.asyncio.Queue()
+            programa._sinEscrituras = programa.asyncio.Event()
+            programa._sinEscrituras.set()
+            programa._sinLecturas = programa.asyncio.Event()
+            programa._sinLecturas.set()
+            futuros = []
+            for operacion in operaciones:
+                futuros.append(programa.asyncio.get_running_loop().create_future())
+                programa._colaEscrituras.put_nowait((operacion, futuros[-1]))
+            escritor = programa.asyncio.create_task(programa.escritorServidor())
+            try:
+                return await programa.asyncio.gather(*futuros)
+            finally:
+                escritor.cancel()
+
+        return programa.asyncio.run(escribir())
+
+    def test_el_escritor_reintenta_lo_que_no_se_guardo(self):
+        agregarAlDiario = self.programa.agregarAlDiario
+        fallas = []
+        def agregarFallandoUnaVez(lineas):
+            if not fallas:
+                fallas.append(lineas)
+                raise OSError("error de escritura")
+            agregarAlDiario(lineas)
+        self.programa.agregarAlDiario = agregarFallandoUnaVez
+        prestamos = len(self.programa.leerArchivo("Prestamos.json"))
+        resultados = self.ejecutarEnEscritor(self.altaPrestamos(3))
+        self.assertEqual(len(fallas), 1)
+        self.assertTrue(all(resultado["ok"] for resultado in resultados))
+        self.assertEqual(len(cargarPrograma().leerArchivo("Prestamos.json")), prestamos + 3)
+
+    def test_el_escritor_no_reintenta_lo_ya_guardado(self):
+        def compactacionFallida():
+            raise OSError("disco lleno")
+        self.programa.diarioParaCompactar = lambda: True
+        self.programa.compactarDiario = compactacionFallida
+        prestamos = len(self.programa.leerArchivo("Prestamos.json"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultados = self.ejecutarEnEscritor(self.altaPrestamos(3))
+        self.assertTrue(all(resultado["ok"] for resultado in resultados))
+        self.assertEqual(len(cargarPrograma().leerArchivo("Prestamos.json")), prestamos + 3)
+
+
+if __name__ == "__main__":
+    unittest.main()